@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Export the hand sign and finger gesture classifiers as one TensorFlow Lite graph.
+
+The fused model takes the raw pixel coordinates that calc_landmark_list()
+and the point history produce, does what pre_process_landmark() and
+pre_process_point_history() do in Python (wrist / first-point relative
+offsets, max-abs and image-size normalisation), runs both classifier heads
+and applies argmax and the finger gesture score threshold, so a frame needs
+a single invoke():
+
+    inputs:  landmarks [1, 21, 2], point_history [1, 16, 2], image_size [1, 2] (w, h)
+    outputs: hand_sign_id [1], hand_sign_score [1],
+             finger_gesture_id [1], finger_gesture_score [1]
+
+The heads are rebuilt from the weights in keypoint_classifier.tflite and
+point_history_classifier.tflite, so the fused model always matches the
+shipped classifiers. Run from the package directory after retraining either:
+    python model/fused_classifier/export_fused_classifier.py
+"""
+import argparse
+import os
+
+import tensorflow as tf
+
+here = os.path.dirname(os.path.abspath(__file__))
+model_dir = os.path.dirname(here)
+
+NUM_LANDMARKS = 21
+HISTORY_LENGTH = 16
+
+
+def read_dense_layers(path):
+    """Return [(kernel [in, out], bias, relu)] of a Dense-stack .tflite model."""
+    interpreter = tf.lite.Interpreter(model_path=path)
+    interpreter.allocate_tensors()
+    tensors = interpreter.get_tensor_details()
+    layers = []
+    for op in interpreter._get_ops_details():
+        if op['op_name'] != 'FULLY_CONNECTED':
+            continue
+        _, weights, bias = op['inputs']
+        output_name = tensors[op['outputs'][0]]['name']
+        layers.append((interpreter.get_tensor(weights).T.copy(),
+                       interpreter.get_tensor(bias).copy(),
+                       'Relu' in output_name))
+    if not layers:
+        raise ValueError('No fully connected layers in %s' % path)
+    return layers
+
+
+class FusedClassifierExport(tf.Module):
+    """Preprocessing and both classifier heads as one TensorFlow graph."""
+
+    def __init__(self, keypoint_layers, point_history_layers, score_th=0.5, invalid_value=0):
+        super().__init__()
+        self.keypoint_layers = [(tf.constant(k), tf.constant(b), r)
+                                for k, b, r in keypoint_layers]
+        self.point_history_layers = [(tf.constant(k), tf.constant(b), r)
+                                     for k, b, r in point_history_layers]
+        self.score_th = score_th
+        self.invalid_value = invalid_value
+
+    @staticmethod
+    def head(x, layers):
+        for kernel, bias, relu in layers:
+            x = tf.matmul(x, kernel) + bias
+            if relu:
+                x = tf.nn.relu(x)
+        return tf.nn.softmax(x)
+
+    @tf.function(input_signature=[
+        tf.TensorSpec([1, NUM_LANDMARKS, 2], tf.float32, name='landmarks'),
+        tf.TensorSpec([1, HISTORY_LENGTH, 2], tf.float32, name='point_history'),
+        tf.TensorSpec([1, 2], tf.float32, name='image_size'),
+    ])
+    def classify(self, landmarks, point_history, image_size):
+        # pre_process_landmark: relative to the wrist, max-abs normalised
+        relative = tf.reshape(landmarks - landmarks[:, :1], [1, NUM_LANDMARKS * 2])
+        features = relative / tf.reduce_max(tf.abs(relative), axis=1, keepdims=True)
+        hand_sign = self.head(features, self.keypoint_layers)
+
+        # pre_process_point_history: relative to the oldest point, over image size
+        relative = (point_history - point_history[:, :1]) / image_size[:, tf.newaxis, :]
+        finger_gesture = self.head(tf.reshape(relative, [1, HISTORY_LENGTH * 2]),
+                                   self.point_history_layers)
+
+        hand_sign_id = tf.argmax(hand_sign, axis=1, output_type=tf.int32)
+        finger_gesture_id = tf.argmax(finger_gesture, axis=1, output_type=tf.int32)
+        finger_gesture_score = tf.reduce_max(finger_gesture, axis=1)
+        finger_gesture_id = tf.where(finger_gesture_score < self.score_th,
+                                     tf.fill([1], self.invalid_value), finger_gesture_id)
+        return {
+            'hand_sign_id': hand_sign_id,
+            'hand_sign_score': tf.reduce_max(hand_sign, axis=1),
+            'finger_gesture_id': finger_gesture_id,
+            'finger_gesture_score': finger_gesture_score,
+        }
+
+
+def export(keypoint_model, point_history_model, path, score_th=0.5):
+    module = FusedClassifierExport(read_dense_layers(keypoint_model),
+                                   read_dense_layers(point_history_model),
+                                   score_th=score_th)
+    converter = tf.lite.TFLiteConverter.from_concrete_functions(
+        [module.classify.get_concrete_function()], module)
+    with open(path, 'wb') as f:
+        f.write(converter.convert())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--keypoint_model', default=os.path.join(
+        model_dir, 'keypoint_classifier', 'keypoint_classifier.tflite'))
+    parser.add_argument('--point_history_model', default=os.path.join(
+        model_dir, 'point_history_classifier', 'point_history_classifier.tflite'))
+    parser.add_argument('--output', default=os.path.join(here, 'fused_classifier.tflite'))
+    parser.add_argument('--score_th', type=float, default=0.5)
+    args = parser.parse_args()
+
+    export(args.keypoint_model, args.point_history_model, args.output, args.score_th)
+    print('Wrote %s' % args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Train the streaming point history classifier and export it to TensorFlow Lite.
+
+The model is a causal temporal convolution network over the fingertip
+displacements between consecutive frames: three kernel-3 convolutions with
+dilations 1, 2 and 4 see the last 15 displacements, i.e. exactly the 16-point
+window of point_history_classifier.tflite. Because the input is a sequence of
+displacements, the same weights can be run two ways:
+
+* point_history_tcn_window.tflite takes the usual [1, 32] window of
+  pre_process_point_history() and returns the class scores [1, 4].
+* point_history_tcn_stream.tflite takes one displacement [1, 2] per frame
+  plus the convolution buffers as explicit state tensors, and returns the
+  scores and the updated state. Its per-frame cost is one timestep.
+
+Run from the package directory:
+    python model/point_history_classifier/train_point_history_tcn.py
+"""
+import argparse
+import os
+
+import numpy as np
+import tensorflow as tf
+
+RANDOM_SEED = 42
+NUM_CLASSES = 4
+TIME_STEPS = 16
+DIMENSION = 2
+
+here = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_dataset(path):
+    """Return the [N, 32] windows and [N] labels of point_history.csv."""
+    x = np.loadtxt(path, delimiter=',', dtype='float32',
+                   usecols=list(range(1, (TIME_STEPS * DIMENSION) + 1)))
+    y = np.loadtxt(path, delimiter=',', dtype='int32', usecols=(0))
+    return x, y
+
+
+def window_to_deltas(x):
+    """Convert [N, 32] windows to [N, 15, 2] displacements between frames."""
+    points = x.reshape(-1, TIME_STEPS, DIMENSION)
+    return points[:, 1:] - points[:, :-1]
+
+
+def split(x, y, train_size=0.75, seed=RANDOM_SEED):
+    order = np.random.default_rng(seed).permutation(len(x))
+    n_train = int(len(x) * train_size)
+    train, test = order[:n_train], order[n_train:]
+    return x[train], x[test], y[train], y[test]
+
+
+def build_model(filters=16, dilations=(1, 2, 4), kernel_size=3):
+    """Causal TCN over displacements; the receptive field is the whole input."""
+    steps = 1 + (kernel_size - 1) * sum(dilations)
+    inputs = tf.keras.layers.Input(shape=(steps, DIMENSION))
+    x = inputs
+    for dilation in dilations:
+        x = tf.keras.layers.Conv1D(filters, kernel_size, dilation_rate=dilation,
+                                   padding='valid', activation='relu')(x)
+    x = tf.keras.layers.Flatten()(x)
+    x = tf.keras.layers.Dropout(0.3)(x)
+    outputs = tf.keras.layers.Dense(NUM_CLASSES, activation='softmax')(x)
+    return tf.keras.models.Model(inputs, outputs)
+
+
+class TCNExport(tf.Module):
+    """
+    Window and one-timestep forms of a trained :func:`build_model`.
+
+    Both use the same constant weights. In the streaming form each
+    convolution keeps the last ``(kernel_size - 1) * dilation`` inputs as
+    state; a step appends the new input, takes the taps ``dilation`` apart
+    and applies the kernel as one matrix product.
+    """
+
+    def __init__(self, model):
+        super().__init__()
+        self.convs = []
+        for layer in model.layers:
+            if isinstance(layer, tf.keras.layers.Conv1D):
+                kernel, bias = layer.get_weights()
+                self.convs.append((tf.constant(kernel), tf.constant(bias),
+                                   layer.dilation_rate[0]))
+            elif isinstance(layer, tf.keras.layers.Dense):
+                kernel, bias = layer.get_weights()
+                self.dense = (tf.constant(kernel), tf.constant(bias))
+        self.state_shapes = []
+        channels = DIMENSION
+        for kernel, _, dilation in self.convs:
+            self.state_shapes.append([1, (kernel.shape[0] - 1) * dilation, channels])
+            channels = kernel.shape[-1]
+
+    def classify(self, x):
+        kernel, bias = self.dense
+        return tf.nn.softmax(tf.matmul(x, kernel) + bias)
+
+    def window(self, point_history):
+        points = tf.reshape(point_history, [1, TIME_STEPS, DIMENSION])
+        x = points[:, 1:] - points[:, :-1]
+        for kernel, bias, dilation in self.convs:
+            x = tf.nn.relu(tf.nn.conv1d(x, kernel, 1, 'VALID', dilations=dilation) + bias)
+        return self.classify(tf.reshape(x, [1, -1]))
+
+    def step(self, delta, *states):
+        x = delta
+        new_states = []
+        for (kernel, bias, dilation), state in zip(self.convs, states):
+            buf = tf.concat([state, x[:, tf.newaxis, :]], axis=1)
+            new_states.append(buf[:, 1:])
+            taps = tf.reshape(buf[:, ::dilation], [1, -1])
+            x = tf.nn.relu(tf.matmul(taps, tf.reshape(kernel, [-1, kernel.shape[-1]])) + bias)
+        return [self.classify(x)] + new_states
+
+
+def convert(function, module, path):
+    converter = tf.lite.TFLiteConverter.from_concrete_functions(
+        [function.get_concrete_function()], module)
+    with open(path, 'wb') as f:
+        f.write(converter.convert())
+
+
+def export_window(module, path):
+    @tf.function(input_signature=[tf.TensorSpec([1, TIME_STEPS * DIMENSION], tf.float32,
+                                                name='point_history')])
+    def window(point_history):
+        return {'scores': module.window(point_history)}
+
+    convert(window, module, path)
+
+
+def export_stream(module, path):
+    specs = [tf.TensorSpec([1, DIMENSION], tf.float32, name='delta')]
+    specs += [tf.TensorSpec(shape, tf.float32, name='state%d' % i)
+              for i, shape in enumerate(module.state_shapes)]
+
+    @tf.function(input_signature=specs)
+    def stream(delta, *states):
+        outputs = module.step(delta, *states)
+        named = {'scores': outputs[0]}
+        named.update(('new_state%d' % i, s) for i, s in enumerate(outputs[1:]))
+        return named
+
+    convert(stream, module, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--dataset', default=os.path.join(here, 'point_history.csv'))
+    parser.add_argument('--out_dir', default=here)
+    parser.add_argument('--epochs', type=int, default=1000)
+    parser.add_argument('--filters', type=int, default=16)
+    args = parser.parse_args()
+
+    tf.keras.utils.set_random_seed(RANDOM_SEED)
+    x, y = load_dataset(args.dataset)
+    x_train, x_test, y_train, y_test = split(window_to_deltas(x), y)
+
+    model = build_model(args.filters)
+    model.summary()
+    model.compile(optimizer='adam', loss='sparse_categorical_crossentropy',
+                  metrics=['accuracy'])
+    es_callback = tf.keras.callbacks.EarlyStopping(patience=20, restore_best_weights=True,
+                                                   verbose=1)
+    model.fit(x_train, y_train, epochs=args.epochs, batch_size=128,
+              validation_data=(x_test, y_test), callbacks=[es_callback])
+    _, accuracy = model.evaluate(x_test, y_test, verbose=0)
+    print('Test accuracy: %.4f' % accuracy)
+
+    module = TCNExport(model)
+    export_window(module, os.path.join(args.out_dir, 'point_history_tcn_window.tflite'))
+    export_stream(module, os.path.join(args.out_dir, 'point_history_tcn_stream.tflite'))
+
+
+if __name__ == '__main__':
+    main()
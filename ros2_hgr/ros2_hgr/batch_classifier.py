@@ -0,0 +1,105 @@
+"""
+Batch classification of recorded landmarks and point histories.
+
+For analytics tools and test rigs that classify many samples outside the
+camera loop: a batch is one resized interpreter invoke instead of one
+invoke per sample.
+
+    from ros2_hgr.batch_classifier import make_batch_classifiers
+    classifiers = make_batch_classifiers(model_path_prefix)
+    result = classifiers['keypoint'].classify(features)        # [N, 42]
+    result.class_ids, result.labels, result.scores
+"""
+from collections import namedtuple
+
+import numpy as np
+import tensorflow as tf
+
+from ros2_hgr.classifiers import read_labels
+from ros2_hgr.landmarks import pre_process_landmark_batch
+from ros2_hgr.landmarks import pre_process_point_history_batch
+
+BatchResult = namedtuple('BatchResult', ['class_ids', 'labels', 'scores'])
+
+
+class BatchClassifier(object):
+    """
+    A classifier .tflite model whose batch dimension follows the request.
+
+    The input is resized only when the batch size changes. ``score_th``
+    and ``invalid_value`` give the same ids as PointHistoryClassifier:
+    samples whose best score is below the threshold get ``invalid_value``.
+    """
+
+    def __init__(self, model_path, labels, score_th=None, invalid_value=0, num_threads=1):
+        self.interpreter = tf.lite.Interpreter(model_path=model_path,
+                                               num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.input_index = self.interpreter.get_input_details()[0]['index']
+        self.output_index = self.interpreter.get_output_details()[0]['index']
+        self.feature_size = int(self.interpreter.get_input_details()[0]['shape'][1])
+        self.num_classes = int(self.interpreter.get_output_details()[0]['shape'][1])
+        self.batch_size = 1
+
+        self.labels = labels
+        self.score_th = score_th
+        self.invalid_value = invalid_value
+
+    def scores(self, features):
+        """Return the [N, num_classes] probabilities of [N, feature_size] features."""
+        features = np.asarray(features, dtype=np.float32).reshape(-1, self.feature_size)
+        if len(features) == 0:
+            return np.zeros((0, self.num_classes), dtype=np.float32)
+        if len(features) != self.batch_size:
+            self.interpreter.resize_tensor_input(self.input_index,
+                                                 [len(features), self.feature_size])
+            self.interpreter.allocate_tensors()
+            self.batch_size = len(features)
+        self.interpreter.set_tensor(self.input_index, features)
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(self.output_index)
+
+    def classify(self, features):
+        """Return the :class:`BatchResult` of [N, feature_size] features."""
+        scores = self.scores(features)
+        class_ids = np.argmax(scores, axis=1).astype(np.int32)
+        if self.score_th is not None:
+            below = scores[np.arange(len(scores)), class_ids] < self.score_th
+            class_ids[below] = self.invalid_value
+        return BatchResult(class_ids, [self.labels[i] for i in class_ids], scores)
+
+
+class KeyPointBatchClassifier(BatchClassifier):
+    def __init__(self, model_path_prefix, num_threads=1):
+        super().__init__(
+            model_path_prefix + 'model/keypoint_classifier/keypoint_classifier.tflite',
+            read_labels(model_path_prefix +
+                        'model/keypoint_classifier/keypoint_classifier_label.csv'),
+            num_threads=num_threads)
+
+    def classify_raw(self, landmarks):
+        """Classify [N, 21, 2] pixel landmarks as returned by calc_landmark_list()."""
+        return self.classify(pre_process_landmark_batch(landmarks))
+
+
+class PointHistoryBatchClassifier(BatchClassifier):
+    def __init__(self, model_path_prefix, score_th=0.5, invalid_value=0, num_threads=1):
+        super().__init__(
+            model_path_prefix + 'model/point_history_classifier/point_history_classifier.tflite',
+            read_labels(model_path_prefix +
+                        'model/point_history_classifier/point_history_classifier_label.csv'),
+            score_th=score_th, invalid_value=invalid_value, num_threads=num_threads)
+
+    def classify_raw(self, point_histories, image_width, image_height):
+        """Classify [N, 16, 2] pixel fingertip histories of an image of the given size."""
+        return self.classify(
+            pre_process_point_history_batch(point_histories, image_width, image_height))
+
+
+def make_batch_classifiers(model_path_prefix, num_threads=1):
+    """Return {'keypoint': ..., 'point_history': ...} batch classifiers."""
+    return {
+        'keypoint': KeyPointBatchClassifier(model_path_prefix, num_threads=num_threads),
+        'point_history': PointHistoryBatchClassifier(model_path_prefix,
+                                                     num_threads=num_threads),
+    }
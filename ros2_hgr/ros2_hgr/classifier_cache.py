@@ -0,0 +1,101 @@
+"""
+Motion-gated memoization of the hand sign classifier.
+
+While a gesture is held the normalised landmarks barely change from frame
+to frame, so the classifier keeps returning the same answer. The gate
+reuses the last result while the landmark vector stays within
+``threshold`` of the vector that was last classified, and a small LRU
+cache keyed on the quantised vector catches gestures that are returned to.
+"""
+from collections import OrderedDict
+
+import numpy as np
+
+NORMS = ('linf', 'l2')
+
+
+class CachedClassifier(object):
+    """
+    Wrap a classifier with a ``scores(features)`` method, e.g. KeyPointClassifier.
+
+    Calling it returns the argmax class like the wrapped classifier; the
+    probabilities of the last result are in ``last_scores``. A
+    ``threshold`` of 0 disables the motion gate and a ``cache_size`` or
+    ``quantum`` of 0 the LRU cache. The gate state belongs to one hand
+    track, so use one wrapper per stream around a shared classifier.
+
+    Both return the result of a vector that is close to, not equal to, the
+    one classified, so a hand sign near a class boundary can differ from
+    what the classifier alone would return.
+    """
+
+    def __init__(self, classifier, threshold=0.02, norm='linf', cache_size=64, quantum=0.05):
+        if norm not in NORMS:
+            raise ValueError('Unknown norm %r, expected one of %s' % (norm, ', '.join(NORMS)))
+        self.classifier = classifier
+        self.threshold = threshold
+        self.norm = norm
+        # Without a grid there is no key: every vector would share one entry
+        self.cache_size = cache_size if quantum > 0 else 0
+        self.quantum = quantum
+
+        self._cache = OrderedDict()
+        self._last_features = None
+        self.last_id = None
+        self.last_scores = None
+
+        self.gate_hits = 0
+        self.cache_hits = 0
+        self.misses = 0
+
+    def __call__(self, features):
+        features = np.asarray(features, dtype=np.float32)
+
+        if self.threshold > 0 and self._last_features is not None:
+            delta = np.abs(features - self._last_features)
+            distance = delta.max() if self.norm == 'linf' else np.sqrt(np.dot(delta, delta))
+            if distance < self.threshold:
+                # Compared with the last classified vector, so drift adds up
+                self.gate_hits += 1
+                return self.last_id
+
+        key = None
+        if self.cache_size > 0:
+            key = np.rint(features / self.quantum).astype(np.int16).tobytes()
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return self._remember(features, *cached)
+
+        scores = self.classifier.scores(features)
+        result = (int(np.argmax(scores)), scores)
+        self.misses += 1
+        if key is not None:
+            self._cache[key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return self._remember(features, *result)
+
+    def _remember(self, features, result_id, scores):
+        self._last_features = features
+        self.last_id = result_id
+        self.last_scores = scores
+        return result_id
+
+    def reset(self):
+        """Forget the gate state, e.g. when the hand is lost."""
+        self._last_features = None
+
+    @property
+    def calls(self):
+        return self.gate_hits + self.cache_hits + self.misses
+
+    def hit_rate(self):
+        calls = self.calls
+        return (self.gate_hits + self.cache_hits) / calls if calls else 0.0
+
+    def format_stats(self):
+        return ('calls=%d gate_hits=%d cache_hits=%d misses=%d hit_rate=%.1f%%'
+                % (self.calls, self.gate_hits, self.cache_hits, self.misses,
+                   100.0 * self.hit_rate()))
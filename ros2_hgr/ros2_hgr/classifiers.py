@@ -0,0 +1,290 @@
+"""TensorFlow Lite hand sign and finger gesture classifiers."""
+import csv
+
+import numpy as np
+import tensorflow as tf
+
+
+class KeyPointClassifier(object):
+    def __init__(
+        self,
+        model_path_prefix,
+        num_threads=1,
+    ):
+        model_path = model_path_prefix + 'model/keypoint_classifier/keypoint_classifier.tflite'
+
+        self.model_path = model_path
+        self.interpreter = tf.lite.Interpreter(model_path=model_path,
+                                               num_threads=num_threads)
+
+        self.interpreter.allocate_tensors()
+        self.input_details = self.interpreter.get_input_details()
+        self.output_details = self.interpreter.get_output_details()
+
+    def __call__(
+        self,
+        landmark_list,
+    ):
+        result_index = np.argmax(self.scores(landmark_list))
+
+        return result_index
+
+    def scores(
+        self,
+        landmark_list,
+    ):
+        """Return the class probabilities for one preprocessed landmark list."""
+        input_details_tensor_index = self.input_details[0]['index']
+        self.interpreter.set_tensor(
+            input_details_tensor_index,
+            np.array([landmark_list], dtype=np.float32))
+        self.interpreter.invoke()
+
+        output_details_tensor_index = self.output_details[0]['index']
+
+        result = self.interpreter.get_tensor(output_details_tensor_index)
+
+        return np.squeeze(result)
+
+
+class PointHistoryClassifier(object):
+    def __init__(
+        self,
+        model_path_prefix,
+        score_th=0.5,
+        invalid_value=0,
+        num_threads=1,
+    ):
+        model_path = (model_path_prefix +
+                      'model/point_history_classifier/point_history_classifier.tflite')
+
+        self.model_path = model_path
+        self.interpreter = tf.lite.Interpreter(model_path=model_path,
+                                               num_threads=num_threads)
+
+        self.interpreter.allocate_tensors()
+        self.input_details = self.interpreter.get_input_details()
+        self.output_details = self.interpreter.get_output_details()
+
+        self.score_th = score_th
+        self.invalid_value = invalid_value
+
+    def __call__(
+        self,
+        point_history,
+    ):
+        result = self.scores(point_history)
+
+        result_index = np.argmax(result)
+
+        if result[result_index] < self.score_th:
+            result_index = self.invalid_value
+
+        return result_index
+
+    def scores(
+        self,
+        point_history,
+    ):
+        """Return the class probabilities for one preprocessed point history."""
+        input_details_tensor_index = self.input_details[0]['index']
+        self.interpreter.set_tensor(
+            input_details_tensor_index,
+            np.array([point_history], dtype=np.float32))
+        self.interpreter.invoke()
+
+        output_details_tensor_index = self.output_details[0]['index']
+
+        result = self.interpreter.get_tensor(output_details_tensor_index)
+
+        return np.squeeze(result)
+
+
+class StreamingPointHistoryClassifier(object):
+    """
+    Finger gesture classifier that consumes one fingertip displacement per frame.
+
+    Runs point_history_tcn_stream.tflite (see train_point_history_tcn.py), a
+    causal temporal convolution whose buffers are explicit state tensors, so
+    a frame costs one timestep instead of re-classifying the whole window.
+    The state is owned by the caller, which lets several streams share one
+    interpreter: ``__call__(delta, state)`` returns the class index and the
+    new state. After ``window - 1`` steps the result only depends on the
+    last ``window`` points, and matches point_history_tcn_window.tflite.
+    """
+
+    streaming = True
+
+    def __init__(
+        self,
+        model_path_prefix,
+        score_th=0.5,
+        invalid_value=0,
+        num_threads=1,
+    ):
+        model_path = (model_path_prefix +
+                      'model/point_history_classifier/point_history_tcn_stream.tflite')
+
+        self.model_path = model_path
+        self.interpreter = tf.lite.Interpreter(model_path=model_path,
+                                               num_threads=num_threads)
+
+        self.interpreter.allocate_tensors()
+        runner = self.interpreter.get_signature_runner()
+        inputs = runner.get_input_details()
+        outputs = runner.get_output_details()
+        del runner  # holds a reference that blocks invoke()
+        self.delta_index = inputs['delta']['index']
+        self.scores_index = outputs['scores']['index']
+        names = sorted(n for n in inputs if n.startswith('state'))
+        self.state_indices = [inputs[n]['index'] for n in names]
+        self.new_state_indices = [outputs['new_' + n]['index'] for n in names]
+        self.state_shapes = [inputs[n]['shape'] for n in names]
+        # Points seen by one output: the buffered inputs plus the new delta
+        # cover window - 1 displacements
+        self.window = 2 + int(sum(shape[1] for shape in self.state_shapes))
+
+        self.score_th = score_th
+        self.invalid_value = invalid_value
+
+        # State and result after a window of [0, 0] placeholders, which all
+        # streams return to whenever no fingertip has been tracked for a window
+        state = [np.zeros(shape, dtype=np.float32) for shape in self.state_shapes]
+        for _ in range(self.window - 1):
+            self.empty_id, state = self(np.zeros(2, dtype=np.float32), state)
+        self.empty_state = state
+
+    def __call__(
+        self,
+        delta,
+        state,
+    ):
+        self.interpreter.set_tensor(self.delta_index,
+                                    np.array([delta], dtype=np.float32))
+        for index, value in zip(self.state_indices, state):
+            self.interpreter.set_tensor(index, value)
+        self.interpreter.invoke()
+
+        result = np.squeeze(self.interpreter.get_tensor(self.scores_index))
+        new_state = [self.interpreter.get_tensor(i) for i in self.new_state_indices]
+
+        result_index = np.argmax(result)
+
+        if result[result_index] < self.score_th:
+            result_index = self.invalid_value
+
+        return result_index, new_state
+
+
+class FusedClassifier(object):
+    """
+    Hand sign and finger gesture classification in one TFLite invoke.
+
+    Runs fused_classifier.tflite (see export_fused_classifier.py), which takes
+    the raw pixel landmarks, the raw point history and the image size, does
+    the preprocessing of pre_process_landmark() and
+    pre_process_point_history() in the graph and runs both classifiers.
+    ``__call__`` returns (hand_sign_id, finger_gesture_id, hand_sign_score,
+    finger_gesture_score); a point history shorter than ``history_length``
+    is padded with its first point and its finger gesture is meaningless.
+    """
+
+    def __init__(
+        self,
+        model_path_prefix,
+        num_threads=1,
+    ):
+        model_path = model_path_prefix + 'model/fused_classifier/fused_classifier.tflite'
+
+        self.model_path = model_path
+        self.interpreter = tf.lite.Interpreter(model_path=model_path,
+                                               num_threads=num_threads)
+
+        self.interpreter.allocate_tensors()
+        runner = self.interpreter.get_signature_runner()
+        inputs = runner.get_input_details()
+        outputs = runner.get_output_details()
+        del runner  # holds a reference that blocks invoke()
+        self.landmarks_index = inputs['landmarks']['index']
+        self.point_history_index = inputs['point_history']['index']
+        self.image_size_index = inputs['image_size']['index']
+        self.output_indices = [outputs[name]['index'] for name in (
+            'hand_sign_id', 'finger_gesture_id', 'hand_sign_score', 'finger_gesture_score')]
+        self.history_length = int(inputs['point_history']['shape'][1])
+
+        self._point_history = np.zeros((1, self.history_length, 2), dtype=np.float32)
+        self._image_size = np.zeros((1, 2), dtype=np.float32)
+
+    def __call__(
+        self,
+        landmark_list,
+        point_history,
+        image_size,
+    ):
+        self.interpreter.set_tensor(self.landmarks_index,
+                                    np.array([landmark_list], dtype=np.float32))
+        history = self._point_history
+        if len(point_history):
+            history[0, -len(point_history):] = point_history
+            history[0, :-len(point_history)] = point_history[0]
+        else:
+            history[:] = 0
+        self.interpreter.set_tensor(self.point_history_index, history)
+        self._image_size[0] = image_size
+        self.interpreter.set_tensor(self.image_size_index, self._image_size)
+        self.interpreter.invoke()
+
+        hand_sign_id, finger_gesture_id, hand_sign_score, finger_gesture_score = (
+            self.interpreter.get_tensor(i)[0] for i in self.output_indices)
+
+        return hand_sign_id, finger_gesture_id, hand_sign_score, finger_gesture_score
+
+
+POINT_HISTORY_MODELS = ('window', 'streaming')
+
+
+def make_point_history_classifier(kind, model_path_prefix, num_threads=1):
+    """Create the finger gesture classifier named by ``kind`` (one of ``POINT_HISTORY_MODELS``)."""
+    if kind == 'window':
+        return PointHistoryClassifier(model_path_prefix=model_path_prefix,
+                                      num_threads=num_threads)
+    if kind == 'streaming':
+        return StreamingPointHistoryClassifier(model_path_prefix=model_path_prefix,
+                                               num_threads=num_threads)
+    raise ValueError('Unknown point history model %r, expected one of %s'
+                     % (kind, ', '.join(POINT_HISTORY_MODELS)))
+
+
+CLASSIFIER_BACKENDS = ('tflite', 'fused')
+
+
+def make_classifiers(backend, point_history_model, model_path_prefix, num_threads=1):
+    """
+    Return the classifier keyword arguments of ``RecognitionEngine``.
+
+    ``backend`` is 'tflite' (the two classifiers, preprocessing in Python)
+    or 'fused' (preprocessing and both classifiers in one invoke, which
+    contains the window point history model). ``num_threads`` is the thread
+    count of each interpreter.
+    """
+    if backend == 'fused':
+        if point_history_model != 'window':
+            raise ValueError('The fused classifier contains the window point history '
+                             'model, not %r' % point_history_model)
+        return dict(keypoint_classifier=None, point_history_classifier=None,
+                    fused_classifier=FusedClassifier(model_path_prefix,
+                                                     num_threads=num_threads))
+    if backend == 'tflite':
+        return dict(
+            keypoint_classifier=KeyPointClassifier(model_path_prefix=model_path_prefix,
+                                                   num_threads=num_threads),
+            point_history_classifier=make_point_history_classifier(
+                point_history_model, model_path_prefix, num_threads),
+        )
+    raise ValueError('Unknown classifier backend %r, expected one of %s'
+                     % (backend, ', '.join(CLASSIFIER_BACKENDS)))
+
+
+def read_labels(path):
+    with open(path, encoding='utf-8-sig') as f:
+        return [row[0] for row in csv.reader(f)]
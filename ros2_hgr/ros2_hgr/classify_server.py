@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Batch gesture classification service.
+
+Serves hgr_interfaces/srv/ClassifyBatch on ``service_name`` (default
+/hgr/classify_batch) so offline and remote clients can classify recorded
+landmark vectors or point-history windows without a camera loop. Each
+request is one interpreter invoke; see ros2_hgr.batch_classifier for the
+same thing as a plain Python API.
+"""
+# hide TF logger messages for NVidia GPU libraries
+import os
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
+
+import numpy as np
+
+import rclpy
+from rclpy.node import Node
+
+from hgr_interfaces.srv import ClassifyBatch
+
+from ros2_hgr.batch_classifier import make_batch_classifiers
+
+RAW_SHAPES = {
+    ClassifyBatch.Request.KEYPOINT: (21, 2),
+    ClassifyBatch.Request.POINT_HISTORY: (16, 2),
+}
+
+
+class ClassifyServer(Node):
+    """
+    Classifies batches of samples on request.
+
+    Services:
+    - <service_name> (hgr_interfaces/ClassifyBatch)
+    """
+
+    def __init__(self):
+        super().__init__('hgr_classify_server')
+
+        self.declare_parameter('path_prefix1', '')
+        self.declare_parameter('service_name', '/hgr/classify_batch')
+        self.declare_parameter('num_threads', 1)
+
+        classifiers = make_batch_classifiers(
+            self.get_parameter('path_prefix1').value,
+            num_threads=self.get_parameter('num_threads').value)
+        self.classifiers = {
+            ClassifyBatch.Request.KEYPOINT: classifiers['keypoint'],
+            ClassifyBatch.Request.POINT_HISTORY: classifiers['point_history'],
+        }
+
+        self.srv = self.create_service(
+            ClassifyBatch, self.get_parameter('service_name').value, self.classify_callback)
+
+    def classify_callback(self, request, response):
+        classifier = self.classifiers.get(request.classifier)
+        if classifier is None:
+            response.success = False
+            response.message = 'Unknown classifier %d' % request.classifier
+            return response
+
+        samples = np.asarray(request.samples, dtype=np.float32)
+        size = (int(np.prod(RAW_SHAPES[request.classifier])) if request.preprocess
+                else classifier.feature_size)
+        if request.count * size != len(samples):
+            response.success = False
+            response.message = ('Expected %d x %d values, got %d'
+                                % (request.count, size, len(samples)))
+            return response
+
+        if not request.preprocess:
+            result = classifier.classify(samples.reshape(request.count, size))
+        elif request.classifier == ClassifyBatch.Request.KEYPOINT:
+            result = classifier.classify_raw(
+                samples.reshape((request.count,) + RAW_SHAPES[request.classifier]))
+        else:
+            if not request.image_width or not request.image_height:
+                response.success = False
+                response.message = 'Raw point histories need image_width and image_height'
+                return response
+            result = classifier.classify_raw(
+                samples.reshape((request.count,) + RAW_SHAPES[request.classifier]),
+                request.image_width, request.image_height)
+
+        response.success = True
+        response.class_ids = result.class_ids.tolist()
+        response.labels = result.labels
+        response.scores = result.scores.ravel().tolist()
+        response.num_classes = classifier.num_classes
+        return response
+
+
+def main(args=None):
+    rclpy.init(args=args)
+    node = ClassifyServer()
+    try:
+        rclpy.spin(node)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        node.destroy_node()
+        if rclpy.ok():
+            rclpy.shutdown()
+
+
+if __name__ == '__main__':
+    main()
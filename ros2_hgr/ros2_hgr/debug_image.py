@@ -0,0 +1,79 @@
+"""
+Annotated debug view rendered and encoded off the recognition thread.
+
+The recognition loop only hands over a snapshot of the frame (a copy of
+the image and the per-hand results); a worker thread draws the overlay,
+JPEG-encodes it and publishes it. Frames are offered at most ``rate``
+times per second and only while ``has_subscribers()`` is true, so the
+view costs nothing when nobody watches it.
+"""
+import copy
+import threading
+import time
+
+import cv2 as cv
+
+from ros2_hgr.metrics import LatencyStats
+from ros2_hgr.pipeline import DropOldestQueue
+
+
+class DebugImageWorker(object):
+    """
+    Render ``render(frame)`` and publish ``publish(frame, jpeg_bytes)`` on a thread.
+
+    ``render`` returns a BGR image (RecognitionEngine.render). If the worker
+    is still busy, the next snapshot replaces the waiting one. Like a
+    pipeline stage, ``on_start('debug_image')`` runs first on the thread.
+    """
+
+    def __init__(self, render, publish, has_subscribers, rate=5.0, quality=80,
+                 on_start=None):
+        self.render = render
+        self.publish = publish
+        self.has_subscribers = has_subscribers
+        self.period = 1.0 / rate if rate > 0 else 0.0
+        self.params = [int(cv.IMWRITE_JPEG_QUALITY), int(quality)]
+        self.on_start = on_start
+
+        self.latency = LatencyStats()
+        self.published = 0
+        self.errors = 0
+        self._next = 0.0
+        self._queue = DropOldestQueue(1, 'debug_image')
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='hgr-debug-image', daemon=True)
+        self._thread.start()
+
+    def submit(self, frame):
+        """Offer a classified frame; called on the recognition thread before drawing."""
+        now = time.monotonic()
+        if now < self._next or not self.has_subscribers():
+            return False
+        self._next = now + self.period
+        snapshot = copy.copy(frame)
+        # Drawing happens in place, so the worker needs its own pixels
+        snapshot.image = frame.image.copy()
+        self._queue.put(snapshot)
+        return True
+
+    def _run(self):
+        if self.on_start is not None:
+            self.on_start('debug_image')
+        while not self._stop_event.is_set():
+            frame = self._queue.get(timeout=0.1)
+            if frame is None:
+                continue
+            start = time.perf_counter()
+            try:
+                ok, jpeg = cv.imencode('.jpg', self.render(frame), self.params)
+                if ok:
+                    self.publish(frame, jpeg.tobytes())
+                    self.published += 1
+            except Exception:
+                self.errors += 1
+            self.latency.add(time.perf_counter() - start)
+
+    def stop(self, timeout=1.0):
+        self._stop_event.set()
+        self._queue.close()
+        self._thread.join(timeout)
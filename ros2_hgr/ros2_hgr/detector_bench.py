@@ -0,0 +1,111 @@
+"""
+Compare latency and throughput of the hand detector backends.
+
+Frames are read up front from a camera index, video file or image so that
+capture cost is excluded, then pushed through each backend as fast as it
+accepts them. Latency is submit-to-result time per frame; throughput is
+results per second over the whole run.
+
+    ros2 run ros2_hgr hgr_detector_bench --input hand.mp4 --frames 300 \\
+        --backends legacy tasks --model model/hand_landmarker/hand_landmarker.task
+"""
+import argparse
+import os
+import time
+
+import cv2 as cv
+
+from ros2_hgr.detectors import BACKENDS
+from ros2_hgr.detectors import make_detector
+from ros2_hgr.metrics import LatencyStats
+
+
+def load_frames(source, count, width, height):
+    """Read ``count`` RGB frames from a camera index, video or image path."""
+    cap = cv.VideoCapture(int(source) if source.isdigit() else source)
+    cap.set(cv.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv.CAP_PROP_FRAME_HEIGHT, height)
+    frames = []
+    while len(frames) < count:
+        ret, image = cap.read()
+        if not ret:
+            if not frames:
+                break
+            # Loop short clips and single images
+            frames.extend(frames[:count - len(frames)])
+            continue
+        frames.append(cv.cvtColor(cv.flip(image, 1), cv.COLOR_BGR2RGB))
+    cap.release()
+    if not frames:
+        raise RuntimeError('Could not read any frame from %r' % source)
+    return frames
+
+
+def _counts(detector):
+    return [getattr(detector, name, 0) for name in ('submitted', 'completed', 'dropped')]
+
+
+def run_backend(detector, frames, drain_timeout=2.0):
+    """Push ``frames`` through ``detector`` and return its result statistics."""
+    submitted0, completed0, dropped0 = _counts(detector)
+    detector.latency = LatencyStats()
+    results = 0
+    start = time.perf_counter()
+    for image in frames:
+        out = detector.process(image.copy(), timestamp_ms=int(time.monotonic() * 1000))
+        if out is not None:
+            results += 1
+    if detector.asynchronous:
+        # Let in-flight frames complete before stopping the clock
+        deadline = time.perf_counter() + drain_timeout
+        while time.perf_counter() < deadline:
+            submitted, completed, dropped = _counts(detector)
+            if completed + dropped >= submitted:
+                break
+            time.sleep(0.001)
+        results = detector.completed - completed0
+    elapsed = time.perf_counter() - start
+    return {
+        'frames': len(frames),
+        'results': results,
+        'dropped': _counts(detector)[2] - dropped0,
+        'elapsed': elapsed,
+        'throughput': results / elapsed if elapsed > 0 else 0.0,
+        'latency': detector.latency.format(),
+    }
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--input', default='0',
+                        help='camera index, video file or image (default: 0)')
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--width', type=int, default=960)
+    parser.add_argument('--height', type=int, default=540)
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument('--model', default='model/hand_landmarker/hand_landmarker.task',
+                        help='HandLandmarker .task file for the tasks backend')
+    parser.add_argument('--warmup', type=int, default=10)
+    args = parser.parse_args(args)
+
+    frames = load_frames(args.input, args.frames, args.width, args.height)
+    print('Loaded %d frames of %dx%d' % (len(frames), frames[0].shape[1], frames[0].shape[0]))
+
+    for backend in args.backends:
+        if backend == 'tasks' and not os.path.exists(args.model):
+            print('%-8s skipped: no HandLandmarker model at %s (see --model)'
+                  % (backend, args.model))
+            continue
+        detector = make_detector(backend, model_path=args.model)
+        try:
+            run_backend(detector, frames[:args.warmup])
+            stats = run_backend(detector, frames)
+        finally:
+            detector.close()
+        print('%-8s %6.1f results/s  %d/%d results (%d dropped)  latency %s'
+              % (backend, stats['throughput'], stats['results'], stats['frames'],
+                 stats['dropped'], stats['latency']))
+
+
+if __name__ == '__main__':
+    main()
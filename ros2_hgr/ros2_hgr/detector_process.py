@@ -0,0 +1,277 @@
+"""
+Out-of-process ``mp.solutions.hands`` detector.
+
+MediaPipe runs in a spawned worker process so it does not contend for the
+GIL with the node's Python preprocessing and drawing. Frames are written
+into a ring of preallocated ``multiprocessing.shared_memory`` slots and only
+the slot index goes over the pipe; the worker sends back the (n, 21, 3)
+landmark array and the handedness of each hand.
+
+The worker is started when the detector is created, restarted if it dies
+or stops answering, and stopped (and the shared memory unlinked) by
+``close()``, which the nodes call from ``destroy_node``.
+"""
+import multiprocessing
+from multiprocessing import shared_memory
+import time
+import weakref
+
+import numpy as np
+
+from ros2_hgr.detectors import AsyncResults
+from ros2_hgr.detectors import make_hand_results
+from ros2_hgr.metrics import LatencyStats
+
+
+def _worker_main(conn, options):
+    """Worker process entry point: attach to the ring and detect on request."""
+    import mediapipe as mp
+
+    hands = mp.solutions.hands.Hands(**options)
+    shm = None
+    slot_size = 0
+    conn.send(('ready',))
+    try:
+        while True:
+            try:
+                msg = conn.recv()
+            except EOFError:
+                break  # parent went away
+            if msg is None:
+                break
+            if msg[0] == 'ring':
+                if shm is not None:
+                    shm.close()
+                shm = shared_memory.SharedMemory(name=msg[1])
+                slot_size = msg[2]
+                continue
+
+            _, slot, height, width, timestamp_ms = msg
+            try:
+                image = np.ndarray((height, width, 3), dtype=np.uint8,
+                                   buffer=shm.buf, offset=slot * slot_size)
+                image.flags.writeable = False
+                results = hands.process(image)
+                del image
+                if results.multi_hand_landmarks is None:
+                    landmarks = np.empty((0, 21, 3), dtype=np.float32)
+                    labels, scores = [], []
+                else:
+                    landmarks = np.array(
+                        [[(lm.x, lm.y, lm.z) for lm in hand.landmark]
+                         for hand in results.multi_hand_landmarks], dtype=np.float32)
+                    labels = [h.classification[0].label for h in results.multi_handedness]
+                    scores = [h.classification[0].score for h in results.multi_handedness]
+                conn.send(('result', slot, timestamp_ms, landmarks, labels, scores))
+            except Exception as e:
+                conn.send(('error', slot, timestamp_ms, repr(e)))
+    finally:
+        hands.close()
+        if shm is not None:
+            shm.close()
+
+
+def _release(state):
+    """Stop the worker and free the ring; also runs on garbage collection/exit."""
+    conn, process, shm = state.get('conn'), state.get('process'), state.get('shm')
+    if conn is not None:
+        try:
+            conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+    if process is not None:
+        process.join(1.0)
+        if process.is_alive():
+            process.terminate()
+            process.join(1.0)
+    if conn is not None:
+        conn.close()
+    if shm is not None:
+        shm.close()
+        shm.unlink()
+    state.clear()
+
+
+class ProcessHandsDetector(AsyncResults):
+    """
+    ``mp.solutions.hands.Hands`` in a worker process fed through shared memory.
+
+    In blocking mode (the default) ``process()`` waits for the result of the
+    frame it submitted; the wait releases the GIL, so other pipeline stages
+    keep running while MediaPipe works on another core. With
+    ``blocking=False`` up to ``slots - 1`` frames can be in flight;
+    ``process()`` returns ``None`` and finished results are delivered with
+    their frames (see :class:`~ros2_hgr.detectors.AsyncResults`) whenever a
+    later frame is submitted. A frame that finds every slot busy is dropped.
+    """
+
+    asynchronous = False
+
+    def __init__(
+        self,
+        static_image_mode=False,
+        max_num_hands=1,
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.5,
+        slots=3,
+        blocking=True,
+        timeout=2.0,
+        startup_timeout=60.0,
+        max_restarts=5,
+        on_result=None,
+    ):
+        self.options = dict(
+            static_image_mode=static_image_mode,
+            max_num_hands=max_num_hands,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+        )
+        self.slots = slots
+        self.blocking = blocking
+        self.asynchronous = not blocking
+        self._init_results(on_result)
+        self.timeout = timeout
+        self.startup_timeout = startup_timeout
+        self.max_restarts = max_restarts
+
+        self.latency = LatencyStats()
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0
+        self.restarts = 0
+        self.last_error = None
+
+        self._ctx = multiprocessing.get_context('spawn')
+        self._state = {}
+        self._finalizer = weakref.finalize(self, _release, self._state)
+        self._slot_size = 0
+        self._next_slot = 0
+        self._in_flight = {}    # slot -> (submit time, frame)
+        self._start_worker()
+
+    # Worker lifecycle ########################################################
+    def _start_worker(self):
+        parent_conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(target=_worker_main, args=(child_conn, self.options),
+                                    name='hgr-detector', daemon=True)
+        process.start()
+        child_conn.close()
+        if not parent_conn.poll(self.startup_timeout):
+            process.terminate()
+            raise RuntimeError('Detector worker did not start within %.0fs'
+                               % self.startup_timeout)
+        parent_conn.recv()
+        self._state['conn'] = parent_conn
+        self._state['process'] = process
+        if 'shm' in self._state:
+            parent_conn.send(('ring', self._state['shm'].name, self._slot_size))
+        self._in_flight.clear()
+
+    def _restart_worker(self, reason):
+        self.last_error = reason
+        if self.restarts >= self.max_restarts:
+            raise RuntimeError('Detector worker failed %d times, last error: %s'
+                               % (self.restarts + 1, reason))
+        self.restarts += 1
+        process = self._state.pop('process', None)
+        conn = self._state.pop('conn', None)
+        if process is not None and process.is_alive():
+            process.terminate()
+            process.join(1.0)
+        if conn is not None:
+            conn.close()
+        self.dropped += len(self._in_flight)
+        self._start_worker()
+
+    @property
+    def alive(self):
+        process = self._state.get('process')
+        return process is not None and process.is_alive()
+
+    def _ensure_ring(self, image):
+        size = image.nbytes
+        if size <= self._slot_size:
+            return
+        # (Re)allocate the ring for the largest frame seen so far
+        old = self._state.pop('shm', None)
+        shm = shared_memory.SharedMemory(create=True, size=size * self.slots)
+        self._state['shm'] = shm
+        self._slot_size = size
+        self._state['conn'].send(('ring', shm.name, size))
+        if old is not None:
+            old.close()
+            old.unlink()
+
+    # Detection ###############################################################
+    def process(self, image, timestamp_ms=None, frame=None):
+        if not self.alive:
+            self._restart_worker('worker exited with code %s'
+                                 % getattr(self._state.get('process'), 'exitcode', None))
+        if timestamp_ms is None:
+            timestamp_ms = int(time.monotonic() * 1000)
+        image = np.ascontiguousarray(image, dtype=np.uint8)
+        self._ensure_ring(image)
+
+        latest = self._collect(wait=False)
+        if len(self._in_flight) >= self.slots - 1:
+            self.dropped += 1
+            return None if not self.blocking else latest
+
+        slot = self._next_slot
+        self._next_slot = (slot + 1) % self.slots
+        shm = self._state['shm']
+        view = np.ndarray(image.shape, dtype=np.uint8, buffer=shm.buf,
+                          offset=slot * self._slot_size)
+        view[...] = image
+        del view
+        self._in_flight[slot] = (time.perf_counter(), frame)
+        self.submitted += 1
+        try:
+            self._state['conn'].send(('frame', slot, image.shape[0], image.shape[1],
+                                      timestamp_ms))
+        except (BrokenPipeError, OSError) as e:
+            self._restart_worker(repr(e))
+            return None
+
+        if not self.blocking:
+            return None
+        return self._collect(wait=True, slot=slot)
+
+    def _collect(self, wait, slot=None):
+        """Drain finished results; when ``wait`` block until ``slot`` is done."""
+        conn = self._state['conn']
+        latest = None
+        deadline = time.perf_counter() + self.timeout
+        while True:
+            timeout = max(0.0, deadline - time.perf_counter()) if wait else 0.0
+            try:
+                ready = conn.poll(timeout)
+            except (EOFError, OSError):
+                ready = False
+            if not ready:
+                if wait:
+                    self._restart_worker('no result within %.1fs' % self.timeout)
+                return latest
+            try:
+                msg = conn.recv()
+            except (EOFError, OSError) as e:
+                self._restart_worker(repr(e))
+                return None
+            done = msg[1]
+            submitted, frame = self._in_flight.pop(done, (None, None))
+            if msg[0] == 'error':
+                self.last_error = msg[3]
+                self.dropped += 1
+            else:
+                if submitted is not None:
+                    self.latency.add(time.perf_counter() - submitted)
+                self.completed += 1
+                latest = make_hand_results(msg[3], msg[4], msg[5])
+                if not self.blocking:
+                    self._deliver(latest, frame)
+            if not wait or done == slot:
+                if wait or not conn.poll(0):
+                    return latest
+
+    def close(self):
+        self._finalizer()
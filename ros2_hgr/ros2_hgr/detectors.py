@@ -0,0 +1,275 @@
+"""
+Hand detector backends.
+
+Every backend exposes ``process(image, timestamp_ms)`` taking an RGB frame
+and returning an object with the same ``multi_hand_landmarks`` and
+``multi_handedness`` attributes as ``mp.solutions.hands.Hands.process()``,
+so the existing preprocessing (``calc_landmark_list``, ``draw_info_text``,
+...) works unchanged whichever backend produced the landmarks.
+
+Asynchronous backends (``asynchronous = True``) take the frame the image
+belongs to as well, ``process(image, timestamp_ms, frame)``, and return
+``None``. Each result comes later together with its frame, from ``poll()``
+or passed to the ``on_result(results, frame)`` callback, so it is never
+attached to a newer frame.
+"""
+from collections import deque
+from collections import namedtuple
+import threading
+import time
+
+import mediapipe as mp
+import numpy as np
+
+from ros2_hgr.metrics import LatencyStats
+
+BACKENDS = ('legacy', 'tasks', 'process', 'synthetic')
+
+# Minimal stand-ins for the legacy protobuf results
+HandResults = namedtuple('HandResults', ['multi_hand_landmarks', 'multi_handedness'])
+Landmark = namedtuple('Landmark', ['x', 'y', 'z'])
+LandmarkList = namedtuple('LandmarkList', ['landmark'])
+Category = namedtuple('Category', ['label', 'score'])
+Handedness = namedtuple('Handedness', ['classification'])
+
+NO_HANDS = HandResults(None, None)
+
+
+def make_hand_results(landmarks, labels, scores=None):
+    """
+    Build a legacy-compatible result from per-hand landmark arrays.
+
+    ``landmarks`` is a sequence of (21, 3) normalized x/y/z arrays and
+    ``labels`` the matching handedness labels ('Left'/'Right').
+    """
+    if len(landmarks) == 0:
+        return NO_HANDS
+    if scores is None:
+        scores = [1.0] * len(labels)
+    multi_hand_landmarks = [
+        LandmarkList([Landmark(float(x), float(y), float(z)) for x, y, z in hand])
+        for hand in landmarks
+    ]
+    multi_handedness = [
+        Handedness([Category(label, float(score))])
+        for label, score in zip(labels, scores)
+    ]
+    return HandResults(multi_hand_landmarks, multi_handedness)
+
+
+class AsyncResults(object):
+    """
+    Results of an asynchronous backend, paired with the frames they belong to.
+
+    A finished result goes to ``on_result(results, frame)`` if it is set,
+    else to a queue of the last ``backlog`` results read by poll(). Results
+    of images submitted without a frame (warm-up, benchmarks) only count.
+    """
+
+    def _init_results(self, on_result=None, backlog=4):
+        self.on_result = on_result
+        self._ready = deque(maxlen=backlog)
+
+    def poll(self):
+        """Return the oldest finished (results, frame) pair, or None."""
+        try:
+            return self._ready.popleft()
+        except IndexError:
+            return None
+
+    def _deliver(self, results, frame):
+        if frame is None:
+            return
+        if self.on_result is not None:
+            self.on_result(results, frame)
+        else:
+            self._ready.append((results, frame))
+
+
+class LegacyHandsDetector(object):
+    """Blocking ``mp.solutions.hands.Hands`` detector (the original path)."""
+
+    asynchronous = False
+
+    def __init__(
+        self,
+        static_image_mode=False,
+        max_num_hands=1,
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.5,
+    ):
+        self.hands = mp.solutions.hands.Hands(
+            static_image_mode=static_image_mode,
+            max_num_hands=max_num_hands,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+        )
+        self.latency = LatencyStats()
+
+    def process(self, image, timestamp_ms=None):
+        start = time.perf_counter()
+        image.flags.writeable = False
+        results = self.hands.process(image)
+        image.flags.writeable = True
+        self.latency.add(time.perf_counter() - start)
+        return results
+
+    def close(self):
+        self.hands.close()
+
+
+class TasksHandDetector(AsyncResults):
+    """
+    MediaPipe Tasks ``HandLandmarker`` in ``LIVE_STREAM`` mode.
+
+    ``process()`` only submits the image with ``detect_async`` and returns
+    immediately; the frame is kept under the timestamp it was submitted
+    with. MediaPipe runs the graph on its own threads and hands the result
+    to ``_on_result``, which delivers it with the frame of that timestamp
+    (see :class:`AsyncResults`). MediaPipe drops input frames while the
+    graph is busy; their frames are forgotten and counted in ``dropped``.
+    """
+
+    asynchronous = True
+
+    def __init__(
+        self,
+        model_path,
+        max_num_hands=1,
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.5,
+        on_result=None,
+    ):
+        from mediapipe.tasks.python import BaseOptions
+        from mediapipe.tasks.python import vision
+
+        self._init_results(on_result)
+        self.latency = LatencyStats()
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0
+
+        self._lock = threading.Lock()
+        self._pending = {}      # timestamp -> (submit time, frame)
+        self._last_timestamp = -1
+
+        options = vision.HandLandmarkerOptions(
+            base_options=BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            num_hands=max_num_hands,
+            min_hand_detection_confidence=min_detection_confidence,
+            min_hand_presence_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            result_callback=self._on_result,
+        )
+        self.landmarker = vision.HandLandmarker.create_from_options(options)
+
+    def process(self, image, timestamp_ms=None, frame=None):
+        if timestamp_ms is None:
+            timestamp_ms = int(time.monotonic() * 1000)
+        # LIVE_STREAM requires strictly increasing timestamps
+        timestamp_ms = max(int(timestamp_ms), self._last_timestamp + 1)
+        self._last_timestamp = timestamp_ms
+
+        with self._lock:
+            self._pending[timestamp_ms] = (time.perf_counter(), frame)
+        self.submitted += 1
+        self.landmarker.detect_async(
+            mp.Image(image_format=mp.ImageFormat.SRGB, data=image), timestamp_ms)
+        return None
+
+    def _on_result(self, result, output_image, timestamp_ms):
+        results = make_hand_results(
+            [[(lm.x, lm.y, lm.z) for lm in hand] for hand in result.hand_landmarks],
+            [hand[0].category_name for hand in result.handedness],
+            [hand[0].score for hand in result.handedness],
+        )
+        now = time.perf_counter()
+        with self._lock:
+            submitted, frame = self._pending.pop(timestamp_ms, (None, None))
+            # Frames older than this one were dropped by the graph
+            stale = [t for t in self._pending if t < timestamp_ms]
+            for t in stale:
+                del self._pending[t]
+            self.dropped += len(stale)
+        if submitted is not None:
+            self.latency.add(now - submitted)
+        self.completed += 1
+        self._deliver(results, frame)
+
+    def close(self):
+        self.landmarker.close()
+
+
+def make_detector(
+    backend,
+    model_path='',
+    static_image_mode=False,
+    max_num_hands=1,
+    min_detection_confidence=0.7,
+    min_tracking_confidence=0.5,
+    on_result=None,
+    noise=0.01,
+):
+    """
+    Create the detector named by ``backend`` (one of ``BACKENDS``).
+
+    ``noise`` is the landmark jitter of the synthetic backend, as a
+    fraction of the hand length.
+    """
+    if backend == 'legacy':
+        return LegacyHandsDetector(
+            static_image_mode=static_image_mode,
+            max_num_hands=max_num_hands,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+        )
+    if backend == 'tasks':
+        return TasksHandDetector(
+            model_path,
+            max_num_hands=max_num_hands,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            on_result=on_result,
+        )
+    if backend == 'process':
+        from ros2_hgr.detector_process import ProcessHandsDetector
+        return ProcessHandsDetector(
+            static_image_mode=static_image_mode,
+            max_num_hands=max_num_hands,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+        )
+    if backend == 'synthetic':
+        from ros2_hgr.synthetic_hands import SyntheticHandsDetector
+        return SyntheticHandsDetector(max_num_hands=max_num_hands, noise=noise)
+    raise ValueError('Unknown detector backend %r, expected one of %s'
+                     % (backend, ', '.join(BACKENDS)))
+
+
+def warm_up(detector, width, height, frames=3, timeout=5.0):
+    """
+    Run ``frames`` synthetic frames through ``detector`` before real ones.
+
+    The first calls of a MediaPipe graph pay for lazy initialisation and
+    buffer allocation; doing them here keeps that cost off the first real
+    frame. Waits for the results of asynchronous backends, up to
+    ``timeout`` seconds, and clears the latency statistics afterwards.
+    Returns the number of warm-up results received.
+    """
+    image = np.zeros((height, width, 3), dtype=np.uint8)
+    if not detector.asynchronous:
+        for _ in range(frames):
+            detector.process(image.copy())
+        detector.latency = LatencyStats()
+        return frames
+
+    # Submitted without frames, so no result is delivered
+
+    target = detector.completed + frames
+    deadline = time.monotonic() + timeout
+    while detector.completed < target and time.monotonic() < deadline:
+        detector.process(image.copy())
+        time.sleep(0.01)
+    detector.latency = LatencyStats()
+    return frames - max(0, target - detector.completed)
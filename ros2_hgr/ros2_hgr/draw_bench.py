@@ -0,0 +1,103 @@
+"""
+Measure the per-frame cost of drawing the annotated debug view.
+
+Hands are drawn from a fixed open-hand pose, moved and scaled across the
+image, so the run covers both far (touching joints) and near hands. Each
+drawing step is timed separately over the same frames.
+
+    ros2 run ros2_hgr hgr_draw_bench --frames 2000 --hands 2
+"""
+import argparse
+from collections import namedtuple
+import time
+
+import numpy as np
+
+from ros2_hgr.drawing import draw_bounding_rect
+from ros2_hgr.drawing import draw_info
+from ros2_hgr.drawing import draw_info_text
+from ros2_hgr.drawing import draw_landmarks
+from ros2_hgr.drawing import draw_point_history
+from ros2_hgr.metrics import LatencyStats
+
+Category = namedtuple('Category', ['label', 'score'])
+Handedness = namedtuple('Handedness', ['classification'])
+
+# Open right hand, wrist at the origin, about 230 px tall
+OPEN_HAND = np.array([
+    [0, 0], [-32, -20], [-54, -38], [-75, -58], [-93, -80], [-27, -81], [-34, -109],
+    [-39, -137], [-42, -165], [3, -85], [5, -114], [9, -142], [17, -169], [32, -79],
+    [46, -104], [61, -128], [78, -151], [54, -66], [75, -86], [98, -102], [124, -115],
+])
+LABELS = ['Open', 'Close', 'Pointer', 'OK']
+
+
+def make_hands(count, width, height, seed=0):
+    """Return ``count`` (landmarks, brect, label) tuples spread over the image."""
+    rng = np.random.default_rng(seed)
+    hands = []
+    for index in range(count):
+        scale = rng.uniform(0.2, 1.2)
+        angle = rng.uniform(-0.6, 0.6)
+        rotation = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+        wrist = rng.uniform([0.2 * width, 0.5 * height], [0.8 * width, height])
+        points = OPEN_HAND @ rotation.T * scale + wrist + rng.normal(0, 2, OPEN_HAND.shape)
+        landmarks = points.astype(int).tolist()
+        x_min, y_min = points.min(axis=0).astype(int)
+        x_max, y_max = points.max(axis=0).astype(int)
+        hands.append((landmarks, [x_min, y_min, x_max, y_max], LABELS[index % len(LABELS)]))
+    return hands
+
+
+def run(background, frames, hands, hands_per_frame):
+    """Draw ``frames`` frames and return the LatencyStats of each drawing step."""
+    stats = {name: LatencyStats(window=frames * hands_per_frame)
+             for name in ('landmarks', 'info_text', 'info', 'frame')}
+    point_history = [[0, 0]] * 16
+    clock = time.perf_counter
+    for index in range(frames):
+        # Copied outside the timed part so only drawing is measured
+        image = background.copy()
+        frame_start = clock()
+        for offset in range(hands_per_frame):
+            landmarks, brect, label = hands[(index * hands_per_frame + offset) % len(hands)]
+            handedness = Handedness([Category('Right' if offset % 2 else 'Left', 0.9)])
+            draw_bounding_rect(True, image, brect)
+            start = clock()
+            draw_landmarks(image, landmarks)
+            stats['landmarks'].add(clock() - start)
+            start = clock()
+            draw_info_text(image, brect, handedness, label, '')
+            stats['info_text'].add(clock() - start)
+        draw_point_history(image, point_history)
+        start = clock()
+        draw_info(image, 30.0 - index % 7 * 0.01, 0, -1)
+        stats['info'].add(clock() - start)
+        stats['frame'].add(clock() - frame_start)
+    return stats
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--frames', type=int, default=2000)
+    parser.add_argument('--hands', type=int, default=2, help='hands drawn per frame')
+    parser.add_argument('--width', type=int, default=960)
+    parser.add_argument('--height', type=int, default=540)
+    parser.add_argument('--warmup', type=int, default=50)
+    args = parser.parse_args(args)
+
+    background = np.random.default_rng(1).integers(
+        0, 256, (args.height, args.width, 3), dtype=np.uint8)
+    hands = make_hands(256, args.width, args.height)
+
+    run(background, args.warmup, hands, args.hands)
+    stats = run(background, args.frames, hands, args.hands)
+
+    print('%d frames of %dx%d, %d hands per frame'
+          % (args.frames, args.width, args.height, args.hands))
+    for name, latency in stats.items():
+        print('%-10s %s' % (name, latency.format()))
+
+
+if __name__ == '__main__':
+    main()
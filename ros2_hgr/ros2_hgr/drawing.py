@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""Drawing helpers for the annotated debug view."""
+import functools
+
+import cv2 as cv
+import numpy as np
+
+
+# Skeleton edges in drawing order: thumb, index, middle, ring, little, palm.
+# Each edge is drawn black then white before the next one, so a later edge
+# covers the white core of an earlier one where they meet.
+HAND_EDGES = (
+    (2, 3), (3, 4),
+    (5, 6), (6, 7), (7, 8),
+    (9, 10), (10, 11), (11, 12),
+    (13, 14), (14, 15), (15, 16),
+    (17, 18), (18, 19), (19, 20),
+    (0, 1), (1, 2), (2, 5), (5, 9), (9, 13), (13, 17), (17, 0),
+)
+
+# Joint circle radius per landmark; fingertips are drawn larger
+FINGERTIPS = (4, 8, 12, 16, 20)
+LANDMARK_RADII = tuple(8 if index in FINGERTIPS else 5 for index in range(21))
+
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+
+
+def draw_landmarks(image, landmark_point):
+    points = [(int(x), int(y)) for x, y in landmark_point]
+
+    if len(points) > 0:
+        for start, end in HAND_EDGES:
+            cv.line(image, points[start], points[end], BLACK, 6)
+            cv.line(image, points[start], points[end], WHITE, 2)
+
+    # Key Points
+    for point, radius in zip(points, LANDMARK_RADII):
+        cv.circle(image, point, radius, WHITE, -1)
+        cv.circle(image, point, radius, BLACK, 1)
+
+    return image
+
+
+def draw_bounding_rect(use_brect, image, brect):
+    if use_brect:
+        # Outer rectangle
+        cv.rectangle(image, (brect[0], brect[1]), (brect[2], brect[3]),
+                     (0, 0, 0), 1)
+
+    return image
+
+
+@functools.lru_cache(maxsize=64)
+def _label_patch(text):
+    """Return (pixels, dx, dy) of ``text`` drawn on black, relative to its origin."""
+    (width, height), baseline = cv.getTextSize(text, cv.FONT_HERSHEY_SIMPLEX, 0.6, 1)
+    margin = 4
+    canvas = np.zeros((height + baseline + 2 * margin, width + 2 * margin, 3), np.uint8)
+    cv.putText(canvas, text, (margin, margin + height), cv.FONT_HERSHEY_SIMPLEX, 0.6,
+               WHITE, 1, cv.LINE_AA)
+    ys, xs = np.nonzero(canvas.any(axis=2))
+    if len(xs) == 0:
+        return canvas[:0, :0], 0, 0
+    patch = canvas[ys.min():ys.max() + 1, xs.min():xs.max() + 1].copy()
+    patch.flags.writeable = False
+    return patch, xs.min() - margin, ys.min() - margin - height
+
+
+def draw_info_text(image, brect, handedness, hand_sign_text,
+                   finger_gesture_text):
+    cv.rectangle(image, (brect[0], brect[1]), (brect[2], brect[1] - 22),
+                 BLACK, -1)
+
+    info_text = handedness.classification[0].label[0:]
+    if hand_sign_text != "":
+        info_text = info_text + ':' + hand_sign_text
+    origin = (brect[0] + 5, brect[1] - 4)
+
+    # The label sits on the black box, so the anti-aliased text only ever
+    # blends with black and can be rendered once and copied in. Fall back
+    # to putText when it sticks out of the box or the image.
+    patch, dx, dy = _label_patch(info_text)
+    x, y = origin[0] + dx, origin[1] + dy
+    height, width = patch.shape[:2]
+    top, right = max(brect[1] - 22, 0), min(brect[2], image.shape[1] - 1)
+    if (x >= max(brect[0], 0) and x + width - 1 <= right and
+            y >= top and y + height - 1 <= min(brect[1], image.shape[0] - 1)):
+        image[y:y + height, x:x + width] = patch
+    else:
+        cv.putText(image, info_text, origin, cv.FONT_HERSHEY_SIMPLEX, 0.6, WHITE, 1,
+                   cv.LINE_AA)
+
+    # if finger_gesture_text != "":
+    #     cv.putText(image, "Finger Gesture:" + finger_gesture_text, (10, 60),
+    #                cv.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 0), 4, cv.LINE_AA)
+    #     cv.putText(image, "Finger Gesture:" + finger_gesture_text, (10, 60),
+    #                cv.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2,
+    #                cv.LINE_AA)
+
+    return image
+
+
+def draw_point_history(image, point_history):
+    for index, point in enumerate(point_history):
+        if point[0] != 0 and point[1] != 0:
+            cv.circle(image, (point[0], point[1]), 1 + int(index / 2),
+                      (152, 251, 152), 2)
+
+    return image
+
+
+def draw_info(image, fps, mode, number):
+    cv.putText(image, "FPS:" + str(fps), (10, 30), cv.FONT_HERSHEY_SIMPLEX,
+               1.0, (0, 0, 0), 4, cv.LINE_AA)
+    cv.putText(image, "FPS:" + str(fps), (10, 30), cv.FONT_HERSHEY_SIMPLEX,
+               1.0, (255, 255, 255), 2, cv.LINE_AA)
+
+    mode_string = ['Logging Key Point', 'Logging Point History']
+    if 1 <= mode <= 2:
+        cv.putText(image, "MODE:" + mode_string[mode - 1], (10, 90),
+                   cv.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1,
+                   cv.LINE_AA)
+        if 0 <= number <= 9:
+            cv.putText(image, "NUM:" + str(number), (10, 110),
+                       cv.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1,
+                       cv.LINE_AA)
+    return image
@@ -0,0 +1,364 @@
+"""
+Recognition engine shared by all HGR nodes and tools.
+
+The engine holds the hand detector, the two classifiers and the per-stream
+histories, and runs one frame through the stages detect -> classify ->
+render. It knows nothing about ROS; the nodes feed it frames from a
+:mod:`ros2_hgr.frame_sources` source and publish what it returns.
+"""
+from collections import Counter
+from collections import deque
+import time
+
+import cv2 as cv
+import numpy as np
+
+from ros2_hgr.drawing import draw_bounding_rect
+from ros2_hgr.drawing import draw_info
+from ros2_hgr.drawing import draw_info_text
+from ros2_hgr.drawing import draw_landmarks
+from ros2_hgr.drawing import draw_point_history
+from ros2_hgr.frame_sources import BGR
+from ros2_hgr.landmarks import calc_bounding_rect
+from ros2_hgr.landmarks import calc_landmark_list
+from ros2_hgr.landmarks import logging_csv
+from ros2_hgr.landmarks import pre_process_landmark
+from ros2_hgr.landmarks import pre_process_point_history
+
+
+class FrameResult(object):
+    """Per-frame data handed from one stage to the next."""
+
+    def __init__(self, image, stamp_ms, color_order=BGR, stamp=None):
+        self.image = image          # mirrored frame, also used for drawing
+        self.created = time.perf_counter()
+        self.detected = None        # perf_counter() when detection and classification ended
+        self.classified = None
+        self.color_order = color_order
+        self.stamp_ms = stamp_ms
+        self.stamp = stamp          # builtin_interfaces/Time of a ROS image, else None
+        self.results = None         # detector output
+        self.hands = []             # (brect, landmarks, handedness, sign id, finger id)
+        self.hand_scores = []       # (sign score, sign probabilities or None) per hand
+        self.hand_sign_id = -1      # -1 means no hand gesture detected
+        self.point_history = []
+        self.number = -1
+        self.mode = 0
+        self.fps = 0.0
+
+    @classmethod
+    def from_frame(cls, frame):
+        return cls(frame.image, frame.stamp_ms, frame.color_order, frame.stamp)
+
+
+class RecognitionEngine(object):
+    """
+    Detector, classifiers and gesture histories for one video stream.
+
+    Classifiers and label tables can be shared between engines (one per
+    stream); pass the same ``classifier_lock`` to serialise their use, since
+    TFLite interpreters are not thread-safe.
+
+    ``point_history_sign_id`` is the hand sign whose index fingertip is
+    tracked for finger gesture classification (-1 disables tracking).
+    """
+
+    def __init__(
+        self,
+        detector,
+        keypoint_classifier,
+        point_history_classifier,
+        keypoint_classifier_labels,
+        point_history_classifier_labels,
+        history_length=16,
+        point_history_sign_id=-1,
+        path_prefix='',
+        use_brect=True,
+        classifier_lock=None,
+        fused_classifier=None,
+    ):
+        self.detector = detector
+        self.keypoint_classifier = keypoint_classifier
+        self.point_history_classifier = point_history_classifier
+        self.keypoint_classifier_labels = keypoint_classifier_labels
+        self.point_history_classifier_labels = point_history_classifier_labels
+        self.point_history_sign_id = point_history_sign_id
+        self.path_prefix = path_prefix
+        self.use_brect = use_brect
+        self.classifier_lock = classifier_lock
+        self.fused_classifier = fused_classifier
+
+        # Coordinate history #################################################################
+        # (a streaming classifier fixes the window through its receptive field)
+        self.history_length = getattr(point_history_classifier, 'window', history_length)
+        self.point_history = deque(maxlen=self.history_length)
+        self.real_samples = 0       # fingertip samples in point_history that are not [0, 0]
+
+        self.point_history_invokes = 0
+        self.point_history_skips = 0
+        self._reset_point_history_result()
+
+        # Models handed over by swap_models(), applied before the next frame
+        self._pending_models = None
+        self.model_swaps = 0
+
+        # Finger gesture history ################################################
+        self.finger_gesture_history = deque(maxlen=self.history_length)
+
+    def _reset_point_history_result(self):
+        # Finger gesture result for the last window, reused while it is unchanged
+        self._point_history_key = None
+        self._point_history_id = 0
+        self._empty_history_id = None
+
+        # A streaming classifier is stepped once per appended point instead;
+        # its state belongs to this stream
+        self.streaming = getattr(self.point_history_classifier, 'streaming', False)
+        if self.streaming:
+            self._stream_state = self.point_history_classifier.empty_state
+            self._point_history_id = self.point_history_classifier.empty_id
+
+    def swap_models(self, **models):
+        """
+        Replace classifiers and label tables from another thread.
+
+        Takes the keyword arguments of the constructor's classifier and label
+        parameters. They are applied together at the start of the next
+        classify() call, so a frame never sees a mix of old and new models.
+        """
+        self._pending_models = models
+
+    def _apply_pending_models(self):
+        models, self._pending_models = self._pending_models, None
+        for name, value in models.items():
+            setattr(self, name, value)
+        if 'point_history_classifier' in models:
+            # A streaming state only means something to the model that made it
+            self._reset_point_history_result()
+            if self.streaming:
+                self.point_history.clear()
+                self.real_samples = 0
+        self.model_swaps += 1
+
+    def detect(self, frame, scale=1.0):
+        """
+        Run the hand detector on ``frame``; return the detected frame or None.
+
+        The detector gets an RGB image, downscaled by ``scale``; the frame
+        itself keeps its full size and colour order for drawing. An
+        asynchronous detector returns the oldest earlier frame whose result
+        has arrived instead, or None; with its ``on_result`` set, results go
+        to that callback and this always returns None.
+        """
+        image = frame.image
+        if scale < 1.0:
+            image = cv.resize(image, None, fx=scale, fy=scale, interpolation=cv.INTER_AREA)
+        if frame.color_order == BGR:
+            image = cv.cvtColor(image, cv.COLOR_BGR2RGB)
+
+        if self.detector.asynchronous:
+            self.detector.process(image, frame.stamp_ms, frame)
+            ready = self.detector.poll()
+            if ready is None:
+                return None
+            results, frame = ready
+        else:
+            results = self.detector.process(image, frame.stamp_ms)
+            if results is None:
+                return None
+        return self.attach_results(frame, results)
+
+    def attach_results(self, frame, results):
+        """Store the detector ``results`` of ``frame``, e.g. from an on_result callback."""
+        frame.results = results
+        frame.detected = time.perf_counter()
+        return frame
+
+    def classify(self, frame, number=-1, mode=0):
+        """Featurize and classify every detected hand, updating the histories."""
+        if self._pending_models is not None:
+            self._apply_pending_models()
+        frame.number = number
+        frame.mode = mode
+        results = frame.results
+
+        if results.multi_hand_landmarks is not None:
+            for hand_landmarks, handedness in zip(results.multi_hand_landmarks,
+                                                  results.multi_handedness):
+                # Bounding box calculation
+                brect = calc_bounding_rect(frame.image, hand_landmarks)
+                # Landmark calculation
+                landmark_list = calc_landmark_list(frame.image, hand_landmarks)
+
+                # Conversion to relative coordinates / normalized coordinates
+                # (the fused classifier does this in its graph)
+                pre_processed_landmark_list = []
+                if self.fused_classifier is None or (mode == 1 and 0 <= number <= 9):
+                    pre_processed_landmark_list = pre_process_landmark(
+                        landmark_list)
+                # Write to the dataset file; the point history is only
+                # featurized here when it is being recorded
+                pre_processed_point_history_list = []
+                if mode == 2 and 0 <= number <= 9:
+                    pre_processed_point_history_list = pre_process_point_history(
+                        frame.image, self.point_history)
+                logging_csv(number, mode, pre_processed_landmark_list,
+                            pre_processed_point_history_list, self.path_prefix)
+
+                if self.fused_classifier is not None:
+                    # Preprocessing and both classifiers in one invoke
+                    hand_sign_id, finger_gesture_id, hand_sign_score = self.classify_fused(
+                        landmark_list, frame.image)
+                    hand_sign_scores = None
+                else:
+                    # Hand sign classification
+                    hand_sign_id, hand_sign_scores = self.classify_hand_sign(
+                        pre_processed_landmark_list)
+                    hand_sign_score = float(hand_sign_scores[hand_sign_id])
+
+                    # Finger gesture classification, on the history before this frame
+                    finger_gesture_id = self.classify_point_history(frame.image)
+
+                if hand_sign_id == self.point_history_sign_id:
+                    self.append_point(landmark_list[8], frame.image)
+                else:
+                    self.append_point([0, 0], frame.image)
+
+                # Calculates the gesture IDs in the latest detection
+                self.finger_gesture_history.append(finger_gesture_id)
+                most_common_fg_id = Counter(
+                    self.finger_gesture_history).most_common()
+
+                frame.hands.append(
+                    (brect, landmark_list, handedness, hand_sign_id, most_common_fg_id[0][0]))
+                frame.hand_scores.append((hand_sign_score, hand_sign_scores))
+                frame.hand_sign_id = hand_sign_id
+        else:
+            self.append_point([0, 0], frame.image)
+            if hasattr(self.keypoint_classifier, 'reset'):
+                # A new hand must not hit the motion gate of the old one
+                self.keypoint_classifier.reset()
+
+        frame.point_history = list(self.point_history)
+        frame.classified = time.perf_counter()
+        return frame
+
+    def append_point(self, point, image):
+        """Append a fingertip sample ([0, 0] for none) to the point history."""
+        previous = self.point_history[-1] if self.point_history else None
+        if len(self.point_history) == self.history_length and self.point_history[0] != [0, 0]:
+            self.real_samples -= 1
+        if point != [0, 0]:
+            self.real_samples += 1
+        self.point_history.append(point)
+
+        if self.streaming and previous is not None:
+            self.step_point_history(previous, point, image)
+
+    def step_point_history(self, previous, point, image):
+        """Feed the displacement to the streaming classifier."""
+        classifier = self.point_history_classifier
+        if self.real_samples == 0:
+            # Same state as after any window of placeholders
+            self._stream_state = classifier.empty_state
+            self._point_history_id = classifier.empty_id
+            self.point_history_skips += 1
+            return
+        delta = ((point[0] - previous[0]) / image.shape[1],
+                 (point[1] - previous[1]) / image.shape[0])
+        if self.classifier_lock is None:
+            self._point_history_id, self._stream_state = classifier(delta, self._stream_state)
+        else:
+            with self.classifier_lock:
+                self._point_history_id, self._stream_state = classifier(
+                    delta, self._stream_state)
+        self.point_history_invokes += 1
+
+    def classify_point_history(self, image):
+        """
+        Return the finger gesture id for the current point history.
+
+        The history is only featurized and classified when it is full and
+        contains a real fingertip sample; a window of placeholders always
+        gives the same result, and an unchanged window reuses the last one.
+        A streaming classifier has already consumed the window point by point.
+        """
+        if len(self.point_history) < self.history_length:
+            return 0
+        if self.streaming:
+            # Already stepped when the last point was appended
+            return self._point_history_id
+        if self.real_samples == 0:
+            if self._empty_history_id is None:
+                self._empty_history_id = self._invoke(
+                    self.point_history_classifier, [0.0] * (self.history_length * 2))
+            self.point_history_skips += 1
+            return self._empty_history_id
+
+        key = (image.shape[1], image.shape[0], tuple(map(tuple, self.point_history)))
+        if key != self._point_history_key:
+            self._point_history_id = self._invoke(
+                self.point_history_classifier,
+                pre_process_point_history(image, self.point_history))
+            self._point_history_key = key
+            self.point_history_invokes += 1
+        else:
+            self.point_history_skips += 1
+        return self._point_history_id
+
+    def classify_hand_sign(self, features):
+        """Return the hand sign id and the class probabilities of preprocessed landmarks."""
+        if self.classifier_lock is None:
+            return self._hand_sign(features)
+        with self.classifier_lock:
+            return self._hand_sign(features)
+
+    def _hand_sign(self, features):
+        classifier = self.keypoint_classifier
+        if hasattr(classifier, 'last_scores'):
+            # CachedClassifier: the scores of a reused result are kept with it
+            return classifier(features), classifier.last_scores
+        scores = classifier.scores(features)
+        return int(np.argmax(scores)), scores
+
+    def classify_fused(self, landmark_list, image):
+        """Return (hand sign id, finger gesture id, hand sign score) from the fused classifier."""
+        image_size = (image.shape[1], image.shape[0])
+        if self.classifier_lock is None:
+            outputs = self.fused_classifier(landmark_list, self.point_history, image_size)
+        else:
+            with self.classifier_lock:
+                outputs = self.fused_classifier(landmark_list, self.point_history, image_size)
+        hand_sign_id, finger_gesture_id, hand_sign_score = outputs[:3]
+        if len(self.point_history) < self.history_length:
+            finger_gesture_id = 0
+        return hand_sign_id, finger_gesture_id, float(hand_sign_score)
+
+    def _invoke(self, classifier, features):
+        if self.classifier_lock is None:
+            return classifier(features)
+        with self.classifier_lock:
+            return classifier(features)
+
+    def render(self, frame):
+        """Draw the annotated view on the frame and return it as a BGR image."""
+        debug_image = frame.image
+        for brect, landmark_list, handedness, hand_sign_id, finger_gesture_id in frame.hands:
+            debug_image = draw_bounding_rect(self.use_brect, debug_image, brect)
+            debug_image = draw_landmarks(debug_image, landmark_list)
+            debug_image = draw_info_text(
+                debug_image,
+                brect,
+                handedness,
+                self.keypoint_classifier_labels[hand_sign_id],
+                self.point_history_classifier_labels[finger_gesture_id],
+            )
+
+        debug_image = draw_point_history(debug_image, frame.point_history)
+        debug_image = draw_info(debug_image, frame.fps, frame.mode, frame.number)
+
+        # The drawing colours are symmetric in B and R, so only the finished
+        # view needs converting for display
+        if frame.color_order != BGR:
+            debug_image = cv.cvtColor(debug_image, cv.COLOR_RGB2BGR)
+        return debug_image
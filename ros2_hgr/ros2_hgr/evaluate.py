@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Offline evaluation of the deployed classifiers.
+
+Runs a .tflite classifier over a labelled dataset in large batches and
+reports accuracy, the confusion matrix, per-class precision and recall,
+the calibration of the scores (expected calibration error over
+confidence bins) and the throughput. With --min_accuracy the exit code is
+1 when the accuracy is lower, so model swaps can be gated on it:
+
+    ros2 run ros2_hgr hgr_evaluate --classifier point_history --min_accuracy 0.95
+
+Datasets are the logging CSVs (label, then the preprocessed features) or
+.npz files with arrays ``x`` [N, features] and ``y`` [N].
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+CLASSIFIERS = {
+    'keypoint': ('model/keypoint_classifier/keypoint_classifier.tflite',
+                 'model/keypoint_classifier/keypoint_classifier_label.csv',
+                 'model/keypoint_classifier/keypoint.csv'),
+    'point_history': ('model/point_history_classifier/point_history_classifier.tflite',
+                      'model/point_history_classifier/point_history_classifier_label.csv',
+                      'model/point_history_classifier/point_history.csv'),
+}
+
+
+def load_dataset(path):
+    """Return (x [N, F] float32, y [N] int) from a CSV or .npz dataset."""
+    if path.endswith('.npz'):
+        data = np.load(path)
+        return data['x'].astype(np.float32), data['y'].astype(np.int64)
+    table = np.loadtxt(path, delimiter=',', dtype=np.float32, ndmin=2)
+    return table[:, 1:], table[:, 0].astype(np.int64)
+
+
+def confusion_matrix(y_true, y_pred, num_classes):
+    matrix = np.zeros((num_classes, num_classes), dtype=np.int64)
+    np.add.at(matrix, (y_true, y_pred), 1)
+    return matrix
+
+
+def calibration(confidence, correct, bins=10):
+    """Return the expected calibration error and [(low, high, count, confidence, accuracy)]."""
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    index = np.clip(np.digitize(confidence, edges[1:-1], right=True), 0, bins - 1)
+    table = []
+    ece = 0.0
+    for b in range(bins):
+        mask = index == b
+        count = int(mask.sum())
+        if count == 0:
+            table.append((edges[b], edges[b + 1], 0, 0.0, 0.0))
+            continue
+        mean_confidence = float(confidence[mask].mean())
+        accuracy = float(correct[mask].mean())
+        ece += count / len(confidence) * abs(mean_confidence - accuracy)
+        table.append((edges[b], edges[b + 1], count, mean_confidence, accuracy))
+    return ece, table
+
+
+_worker_classifier = None
+
+
+def _init_worker(model_path, num_threads):
+    global _worker_classifier
+    from ros2_hgr.batch_classifier import BatchClassifier
+    _worker_classifier = BatchClassifier(model_path, labels=[], num_threads=num_threads)
+
+
+def _score_shard(x):
+    return _worker_classifier.scores(x).copy()
+
+
+def score(model_path, x, batch_size=4096, workers=1, num_threads=1):
+    """Return the [N, C] scores of ``x``, in batches, optionally on a process pool."""
+    batches = [x[i:i + batch_size] for i in range(0, len(x), batch_size)]
+    if workers > 1:
+        # spawn: a forked TensorFlow runtime is not safe to use
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                                 initargs=(model_path, num_threads)) as pool:
+            return np.concatenate(list(pool.map(_score_shard, batches)))
+    _init_worker(model_path, num_threads)
+    return np.concatenate([_score_shard(batch) for batch in batches])
+
+
+def evaluate(scores, y, labels, bins=10, score_th=None, invalid_value=0):
+    """Return the metrics of ``scores`` against the true labels ``y``."""
+    num_classes = scores.shape[1]
+    y_pred = scores.argmax(axis=1)
+    confidence = scores.max(axis=1)
+    if score_th is not None:
+        y_pred = np.where(confidence < score_th, invalid_value, y_pred)
+    correct = y_pred == y
+    matrix = confusion_matrix(y, y_pred, num_classes)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        precision = np.diag(matrix) / matrix.sum(axis=0)
+        recall = np.diag(matrix) / matrix.sum(axis=1)
+    ece, table = calibration(confidence, scores.argmax(axis=1) == y, bins)
+    return {
+        'samples': len(y),
+        'accuracy': float(correct.mean()) if len(y) else 0.0,
+        'confusion_matrix': matrix,
+        'precision': precision,
+        'recall': recall,
+        'ece': ece,
+        'calibration': table,
+        'labels': list(labels) + [str(i) for i in range(len(labels), num_classes)],
+    }
+
+
+def format_report(metrics):
+    labels = metrics['labels']
+    width = max(8, max(len(label) for label in labels) + 1)
+    lines = ['samples: %d' % metrics['samples'],
+             'accuracy: %.4f' % metrics['accuracy'],
+             '',
+             'confusion matrix (rows: true, columns: predicted)',
+             ' ' * width + ''.join('%8d' % i for i in range(len(labels)))]
+    for i, row in enumerate(metrics['confusion_matrix']):
+        lines.append(('%-' + str(width) + 's') % labels[i][:width - 1] +
+                     ''.join('%8d' % n for n in row))
+    lines += ['', ('%-' + str(width) + 's%10s%10s') % ('class', 'precision', 'recall')]
+    for label, p, r in zip(labels, metrics['precision'], metrics['recall']):
+        lines.append(('%-' + str(width) + 's%10.4f%10.4f') % (label[:width - 1], p, r))
+    lines += ['', 'expected calibration error: %.4f' % metrics['ece'],
+              '%-13s%8s%12s%10s' % ('confidence', 'count', 'mean conf', 'accuracy')]
+    for low, high, count, confidence, accuracy in metrics['calibration']:
+        if count:
+            lines.append('%.2f - %.2f  %8d%12.4f%10.4f'
+                         % (low, high, count, confidence, accuracy))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--classifier', choices=sorted(CLASSIFIERS), default='point_history',
+                        help='which shipped classifier to evaluate (default paths); '
+                             'keypoint needs a logged keypoint.csv or --dataset')
+    parser.add_argument('--model', help='.tflite model (default: the shipped one)')
+    parser.add_argument('--labels', help='label CSV (default: the shipped one)')
+    parser.add_argument('--dataset', help='CSV or .npz dataset (default: the logging CSV)')
+    parser.add_argument('--path_prefix', default='', help='package directory of the defaults')
+    parser.add_argument('--batch_size', type=int, default=4096)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='processes to shard the batches across; each imports '
+                             'TensorFlow, so this only pays off for millions of rows')
+    parser.add_argument('--num_threads', type=int, default=1, help='threads per interpreter')
+    parser.add_argument('--bins', type=int, default=10, help='calibration bins')
+    parser.add_argument('--score_th', type=float, default=None,
+                        help='predict class 0 below this score, like the node does for '
+                             'finger gestures')
+    parser.add_argument('--min_accuracy', type=float, default=None,
+                        help='exit with status 1 if the accuracy is lower')
+    args = parser.parse_args(argv)
+
+    from ros2_hgr.classifiers import read_labels
+
+    model_path, labels_path, dataset_path = (os.path.join(args.path_prefix, p)
+                                             for p in CLASSIFIERS[args.classifier])
+    model_path = args.model or model_path
+    dataset_path = args.dataset or dataset_path
+    if not os.path.exists(dataset_path):
+        parser.error('dataset %s does not exist; log one with the node or pass --dataset'
+                     % dataset_path)
+    labels = read_labels(args.labels or labels_path)
+    x, y = load_dataset(dataset_path)
+
+    start = time.perf_counter()
+    scores = score(model_path, x, args.batch_size, args.workers, args.num_threads)
+    elapsed = time.perf_counter() - start
+
+    metrics = evaluate(scores, y, labels, args.bins, args.score_th)
+    print('model: %s' % model_path)
+    print(format_report(metrics))
+    print('\nthroughput: %.0f samples/s (%.3f s)' % (len(x) / elapsed, elapsed))
+
+    if args.min_accuracy is not None and metrics['accuracy'] < args.min_accuracy:
+        print('FAILED: accuracy %.4f < %.4f' % (metrics['accuracy'], args.min_accuracy))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,345 @@
+"""
+Frame sources for the recognition engine.
+
+Every source returns :class:`Frame` objects from ``read(timeout)`` and
+declares the colour order of its images (``'bgr'`` or ``'rgb'``), so the
+engine only converts when the detector or the display actually needs it.
+Timestamps are in milliseconds: capture time for cameras, the message
+header stamp for ROS topics and the media position for files. Frames from
+ROS topics also keep the header stamp itself in ``stamp``, so that results
+can be published with exactly the stamp of their image.
+"""
+from collections import namedtuple
+import glob
+import os
+import sys
+import threading
+import time
+
+import cv2 as cv
+import numpy as np
+
+BGR = 'bgr'
+RGB = 'rgb'
+
+SOURCES = ('v4l2', 'ros', 'video', 'images', 'synthetic')
+
+Frame = namedtuple('Frame', ['image', 'color_order', 'stamp_ms', 'stamp'],
+                   defaults=(None,))
+
+# Buffer timestamps further than this from _now_ms() are on another clock
+CAPTURE_CLOCK_TOLERANCE_MS = 10000
+
+
+def _now_ms():
+    return int(time.monotonic() * 1000)
+
+
+class FrameSource(object):
+    """
+    Base class for frame sources.
+
+    ``push`` sources deliver frames as they arrive; when ``on_frame`` is set
+    they call it directly instead of queueing the frame for ``read()``.
+    """
+
+    color_order = BGR
+    push = False
+
+    def __init__(self, mirror=True):
+        self.mirror = mirror
+
+    def read(self, timeout=None):
+        """Return the next :class:`Frame`, or None if none is available."""
+        raise NotImplementedError
+
+    def release(self):
+        pass
+
+    def _frame(self, image, stamp_ms):
+        if self.mirror:
+            image = cv.flip(image, 1)  # Mirror display
+        return Frame(image, self.color_order, stamp_ms)
+
+
+def fourcc_to_str(code):
+    """Decode a ``CAP_PROP_FOURCC`` value such as 1196444237.0 to 'MJPG'."""
+    code = int(code)
+    return ''.join(chr((code >> (8 * i)) & 0xFF) for i in range(4)).strip('\x00')
+
+
+class V4L2Source(FrameSource):
+    """
+    Camera opened through ``cv.VideoCapture``, tuned for low latency.
+
+    ``fourcc`` ('MJPG', 'YUYV' or '' for the driver default) is requested
+    before the frame size, because many UVC webcams only offer their full
+    frame rate at larger sizes in MJPG. ``buffer_size`` is the driver queue
+    depth (0 leaves the default, which is often four frames) and ``fps`` the
+    requested frame rate (0 leaves the default).
+
+    With ``drain`` set, ``read()`` drops frames whose buffer timestamp
+    (``CAP_PROP_POS_MSEC``, the monotonic V4L2 capture time) is more than one
+    frame period old without decoding them, and keeps the first fresh one:
+    a newer frame is then already queued or about to arrive. Frames are
+    stamped with their capture time. Drivers whose timestamps are missing or
+    on another clock are never drained and are stamped when read.
+    ``probe()`` reports what the driver actually negotiated.
+    """
+
+    def __init__(self, device=0, width=960, height=540, mirror=True, fourcc='MJPG',
+                 fps=30.0, buffer_size=1, drain=True, max_drain=4):
+        super().__init__(mirror)
+        api = cv.CAP_V4L2 if sys.platform.startswith('linux') else cv.CAP_ANY
+        self.cap = cv.VideoCapture(device, api)
+        if not self.cap.isOpened() and api != cv.CAP_ANY:
+            self.cap = cv.VideoCapture(device)
+        if fourcc:
+            self.cap.set(cv.CAP_PROP_FOURCC, cv.VideoWriter_fourcc(*fourcc))
+        self.cap.set(cv.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv.CAP_PROP_FRAME_HEIGHT, height)
+        if fps > 0:
+            self.cap.set(cv.CAP_PROP_FPS, fps)
+        if buffer_size > 0:
+            self.cap.set(cv.CAP_PROP_BUFFERSIZE, buffer_size)
+
+        self.drain = drain
+        self.max_drain = max_drain
+        negotiated_fps = self.cap.get(cv.CAP_PROP_FPS)
+        self.fps = negotiated_fps if negotiated_fps > 0 else (fps or 30.0)
+        # A frame captured longer ago than this has a newer one behind it
+        self.max_age_ms = 1000.0 / self.fps
+        self.grabbed = 0
+        self.drained = 0
+
+    def probe(self):
+        """Return the negotiated capture mode, or None if the camera did not open."""
+        if not self.cap.isOpened():
+            return None
+        return {
+            'backend': self.cap.getBackendName(),
+            'fourcc': fourcc_to_str(self.cap.get(cv.CAP_PROP_FOURCC)),
+            'width': int(self.cap.get(cv.CAP_PROP_FRAME_WIDTH)),
+            'height': int(self.cap.get(cv.CAP_PROP_FRAME_HEIGHT)),
+            'fps': self.cap.get(cv.CAP_PROP_FPS),
+            'buffer_size': int(self.cap.get(cv.CAP_PROP_BUFFERSIZE)),
+        }
+
+    def format_probe(self):
+        p = self.probe()
+        if p is None:
+            return 'camera not opened'
+        return ('%(backend)s %(fourcc)s %(width)dx%(height)d @ %(fps).1f fps, '
+                'buffer %(buffer_size)d' % p)
+
+    def capture_ms(self):
+        """Return the capture time of the grabbed frame on the _now_ms() clock, or None."""
+        stamp = self.cap.get(cv.CAP_PROP_POS_MSEC)
+        now = _now_ms()
+        if stamp <= 0 or abs(now - stamp) > CAPTURE_CLOCK_TOLERANCE_MS:
+            return None
+        return int(stamp)
+
+    def read(self, timeout=None):
+        grabs = self.max_drain + 1 if self.drain else 1
+        for attempt in range(grabs):
+            if not self.cap.grab():
+                return None
+            self.grabbed += 1
+            stamp_ms = self.capture_ms()
+            if (stamp_ms is None or _now_ms() - stamp_ms <= self.max_age_ms or
+                    attempt == grabs - 1):
+                break
+            # Stale: drop it undecoded and grab the next one
+            self.drained += 1
+        ret, image = self.cap.retrieve()
+        if not ret:
+            return None
+        return self._frame(image, _now_ms() if stamp_ms is None else stamp_ms)
+
+    def release(self):
+        self.cap.release()
+
+
+def frame_from_image_msg(bridge, msg, mirror=True):
+    """Convert a ``sensor_msgs/Image`` to a :class:`Frame` in its native colour order."""
+    image = bridge.imgmsg_to_cv2(msg)
+    color_order = RGB if msg.encoding in ('rgb8', 'rgba8') else BGR
+    if image.ndim == 2:
+        image = cv.cvtColor(image, cv.COLOR_GRAY2BGR)
+    elif image.shape[2] == 4:
+        image = cv.cvtColor(image, cv.COLOR_RGBA2RGB if color_order == RGB
+                            else cv.COLOR_BGRA2BGR)
+    if mirror:
+        image = cv.flip(image, 1)  # Mirror display
+    stamp = msg.header.stamp
+    return Frame(image, color_order, stamp.sec * 1000 + stamp.nanosec // 1000000, stamp)
+
+
+class RosImageSource(FrameSource):
+    """
+    ``sensor_msgs/Image`` subscription on ``node``.
+
+    The colour order follows the message encoding, so ``rgb8`` images (e.g.
+    the RealSense driver) go to the detector without conversion. ``gate`` is
+    checked before a message is converted; returning False drops it cheaply
+    (used by the idle mode).
+    """
+
+    push = True
+
+    def __init__(self, node, topic, mirror=True, gate=None, qos=10):
+        from cv_bridge import CvBridge
+        from sensor_msgs.msg import Image
+
+        super().__init__(mirror)
+        self.bridge = CvBridge()
+        self.gate = gate
+        self.on_frame = None
+        self.skipped = 0
+        self.color_order = None
+        self._latest = None
+        self._cond = threading.Condition()
+        self.subscription = node.create_subscription(Image, topic, self._callback, qos)
+        self.node = node
+
+    def _callback(self, msg):
+        if self.gate is not None and not self.gate():
+            self.skipped += 1
+            return
+        frame = frame_from_image_msg(self.bridge, msg, self.mirror)
+        self.color_order = frame.color_order
+
+        if self.on_frame is not None:
+            self.on_frame(frame)
+            return
+        with self._cond:
+            self._latest = frame
+            self._cond.notify()
+
+    def read(self, timeout=None):
+        with self._cond:
+            if self._latest is None:
+                self._cond.wait(timeout)
+            frame, self._latest = self._latest, None
+        return frame
+
+    def release(self):
+        self.node.destroy_subscription(self.subscription)
+
+
+class VideoFileSource(FrameSource):
+    """Video file decoded with ``cv.VideoCapture``; optionally looped and paced."""
+
+    def __init__(self, path, loop=False, realtime=False, mirror=True):
+        super().__init__(mirror)
+        self.path = path
+        self.loop = loop
+        self.realtime = realtime
+        self.cap = cv.VideoCapture(path)
+        self.fps = self.cap.get(cv.CAP_PROP_FPS) or 30.0
+        self._offset_ms = 0
+        self._next = None
+
+    def read(self, timeout=None):
+        ret, image = self.cap.read()
+        if not ret and self.loop:
+            self._offset_ms += int(self.cap.get(cv.CAP_PROP_POS_MSEC))
+            self.cap.set(cv.CAP_PROP_POS_FRAMES, 0)
+            ret, image = self.cap.read()
+        if not ret:
+            return None
+        if self.realtime:
+            now = time.monotonic()
+            if self._next is not None and self._next > now:
+                time.sleep(self._next - now)
+            self._next = max(now, self._next or now) + 1.0 / self.fps
+        stamp_ms = self._offset_ms + int(self.cap.get(cv.CAP_PROP_POS_MSEC))
+        return self._frame(image, stamp_ms)
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirectorySource(FrameSource):
+    """Still images from a directory, in name order, stamped at ``rate`` Hz."""
+
+    def __init__(self, path, rate=30.0, loop=False, mirror=True,
+                 patterns=('*.png', '*.jpg', '*.jpeg', '*.bmp')):
+        super().__init__(mirror)
+        self.files = sorted(f for p in patterns for f in glob.glob(os.path.join(path, p)))
+        if not self.files:
+            raise ValueError('No images found in %r' % path)
+        self.rate = rate
+        self.loop = loop
+        self.index = 0
+
+    def read(self, timeout=None):
+        if self.index >= len(self.files):
+            if not self.loop:
+                return None
+            self.index = 0
+        image = cv.imread(self.files[self.index % len(self.files)])
+        stamp_ms = int(self.index * 1000 / self.rate)
+        self.index += 1
+        if image is None:
+            return None
+        return self._frame(image, stamp_ms)
+
+
+class SyntheticSource(FrameSource):
+    """
+    Generated frames for exercising the pipeline without a camera.
+
+    ``pattern`` is 'noise' (random pixels), 'gradient' (a moving colour
+    gradient) or 'black'. The frames contain no hands; they load the
+    detector and everything around it at ``rate`` Hz (0 means unpaced).
+    """
+
+    def __init__(self, width=960, height=540, rate=30.0, pattern='gradient',
+                 color_order=BGR, seed=0):
+        super().__init__(mirror=False)
+        self.width = width
+        self.height = height
+        self.rate = rate
+        self.pattern = pattern
+        self.color_order = color_order
+        self._rng = np.random.default_rng(seed)
+        self._base = np.tile(np.linspace(0, 255, width, dtype=np.float32), (height, 1))
+        self._count = 0
+        self._next = None
+
+    def read(self, timeout=None):
+        if self.rate > 0:
+            now = time.monotonic()
+            if self._next is not None and self._next > now:
+                time.sleep(self._next - now)
+            self._next = max(now, self._next or now) + 1.0 / self.rate
+        if self.pattern == 'noise':
+            image = self._rng.integers(0, 256, (self.height, self.width, 3), dtype=np.uint8)
+        elif self.pattern == 'black':
+            image = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        else:
+            shifted = np.roll(self._base, self._count * 4, axis=1).astype(np.uint8)
+            image = cv.merge([shifted, shifted[::-1], 255 - shifted])
+        self._count += 1
+        return Frame(image, self.color_order, _now_ms())
+
+
+def make_frame_source(kind, node=None, device=0, width=960, height=540, topic='',
+                      path='', rate=30.0, loop=False, mirror=True, fourcc='MJPG',
+                      fps=30.0, buffer_size=1, drain=True):
+    """Create the frame source named by ``kind`` (one of ``SOURCES``)."""
+    if kind == 'v4l2':
+        return V4L2Source(device, width, height, mirror=mirror, fourcc=fourcc, fps=fps,
+                          buffer_size=buffer_size, drain=drain)
+    if kind == 'ros':
+        return RosImageSource(node, topic, mirror=mirror)
+    if kind == 'video':
+        return VideoFileSource(path, loop=loop, realtime=rate > 0, mirror=mirror)
+    if kind == 'images':
+        return ImageDirectorySource(path, rate=rate, loop=loop, mirror=mirror)
+    if kind == 'synthetic':
+        return SyntheticSource(width, height, rate=rate)
+    raise ValueError('Unknown frame source %r, expected one of %s'
+                     % (kind, ', '.join(SOURCES)))
@@ -0,0 +1,39 @@
+"""Conversion of engine results to hgr_interfaces/HandGestureArray messages."""
+from geometry_msgs.msg import Point
+from sensor_msgs.msg import RegionOfInterest
+from std_msgs.msg import Header
+
+from hgr_interfaces.msg import HandGesture
+from hgr_interfaces.msg import HandGestureArray
+
+
+def make_gesture_array(frame, keypoint_labels, point_history_labels, stamp):
+    """Return the HandGestureArray of a classified FrameResult."""
+    image_height, image_width = frame.image.shape[:2]
+    msg = HandGestureArray(header=Header(stamp=stamp),
+                           image_width=image_width, image_height=image_height)
+
+    multi_hand_landmarks = frame.results.multi_hand_landmarks or []
+    for hand, (score, scores), hand_landmarks in zip(
+            frame.hands, frame.hand_scores, multi_hand_landmarks):
+        brect, landmark_list, handedness, hand_sign_id, finger_gesture_id = hand
+        x_min, y_min = max(brect[0], 0), max(brect[1], 0)
+        category = handedness.classification[0]
+        msg.hands.append(HandGesture(
+            hand_sign_id=int(hand_sign_id),
+            hand_sign_label=keypoint_labels[hand_sign_id],
+            hand_sign_score=score,
+            hand_sign_scores=[] if scores is None else [float(p) for p in scores],
+            finger_gesture_id=int(finger_gesture_id),
+            finger_gesture_label=point_history_labels[finger_gesture_id],
+            handedness=category.label,
+            handedness_score=float(category.score),
+            bounding_box=RegionOfInterest(x_offset=x_min, y_offset=y_min,
+                                          width=max(brect[2] - x_min, 0),
+                                          height=max(brect[3] - y_min, 0)),
+            landmarks=[Point(x=float(x), y=float(y), z=float(landmark.z))
+                       for (x, y), landmark in zip(landmark_list, hand_landmarks.landmark)],
+        ))
+
+    msg.point_history = [Point(x=float(x), y=float(y)) for x, y in frame.point_history]
+    return msg
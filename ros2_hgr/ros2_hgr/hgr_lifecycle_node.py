@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Hand gesture recognition as a managed (lifecycle) node.
+
+The same node as hgr_node, but the expensive parts follow the lifecycle
+state instead of the process:
+
+- configure: load and warm up the detector and classifiers
+- activate: open the frame source and start processing frames
+- deactivate: stop processing and release the camera (no CPU use)
+- cleanup: close the detector and free the classifiers
+
+With ``autostart:=true`` the node configures and activates itself.
+
+    ros2 lifecycle set /hgr_node configure
+    ros2 lifecycle set /hgr_node activate
+"""
+import gc
+
+import rclpy
+from rclpy.lifecycle import Node as LifecycleNode
+from rclpy.lifecycle import TransitionCallbackReturn
+
+from ros2_hgr.hgr_node import HGR
+from ros2_hgr.hgr_node import spin
+
+
+class HGRLifecycle(HGR, LifecycleNode):
+    """HGR node whose models and frame source follow the lifecycle state."""
+
+    managed = True
+
+    def __init__(self, node_name='hgr_node', **defaults):
+        super().__init__(node_name, **defaults)
+        self.autostart = self.param('autostart', False)
+
+    def on_configure(self, state):
+        try:
+            self.load(open_source=False)
+        except Exception as e:
+            self.get_logger().error('Configure failed: %r' % e)
+            self.unload()
+            return TransitionCallbackReturn.FAILURE
+        return TransitionCallbackReturn.SUCCESS
+
+    def on_activate(self, state):
+        try:
+            self.start()
+        except Exception as e:
+            self.get_logger().error('Activate failed: %r' % e)
+            self.stop()
+            return TransitionCallbackReturn.FAILURE
+        return super().on_activate(state)
+
+    def on_deactivate(self, state):
+        self.stop()
+        return super().on_deactivate(state)
+
+    def on_cleanup(self, state):
+        self.unload()
+        gc.collect()
+        return TransitionCallbackReturn.SUCCESS
+
+    def on_shutdown(self, state):
+        if self.running:
+            self.stop()
+        self.unload()
+        return TransitionCallbackReturn.SUCCESS
+
+    def on_error(self, state):
+        if self.running:
+            self.stop()
+        self.unload()
+        return TransitionCallbackReturn.SUCCESS
+
+
+def main(args=None):
+    rclpy.init(args=args)
+    node = HGRLifecycle(frame_source='v4l2', frequency=200.0)
+    if node.autostart:
+        node.trigger_configure()
+        node.trigger_activate()
+    try:
+        spin(node)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        node.destroy_node()
+        if rclpy.ok():
+            rclpy.shutdown()
+
+
+if __name__ == '__main__':
+    main()
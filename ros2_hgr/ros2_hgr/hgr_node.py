@@ -1,121 +1,70 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-import csv
-import copy
+"""
+Hand gesture recognition node.
+
+One node class serves every camera: the frame comes from a pluggable
+source (``frame_source`` parameter) and the rest is the shared
+:class:`~ros2_hgr.engine.RecognitionEngine`. The console entry points
+``hgr_node``, ``hgr_node_cam`` and ``hgr_node_dogcam`` are configurations
+of this node that differ only in their parameter defaults.
+"""
 import argparse
-import itertools
-from collections import Counter
-from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import threading
+import time
 
 # hide TF logger messages for NVidia GPU libraries
 import os
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
 
 import cv2 as cv
-import numpy as np
-import mediapipe as mp
-import tensorflow as tf
-from tensorflow import keras
 
 import rclpy
+from rclpy.callback_groups import MutuallyExclusiveCallbackGroup
+from rclpy.duration import Duration
+from rclpy.executors import ExternalShutdownException
+from rclpy.executors import MultiThreadedExecutor
+from rclpy.executors import SingleThreadedExecutor
 from rclpy.node import Node
+from rclpy.qos import DurabilityPolicy
+from rclpy.qos import QoSProfile
+from sensor_msgs.msg import CompressedImage
+from std_msgs.msg import Bool
 from std_msgs.msg import Int32
+from std_srvs.srv import Trigger
+
+from hgr_interfaces.msg import HandGestureArray
+from hgr_interfaces.srv import DumpTrace
+from hgr_interfaces.srv import Profile
+
+from ros2_hgr.classifiers import make_classifiers
+from ros2_hgr.classifiers import read_labels
+from ros2_hgr.debug_image import DebugImageWorker
+from ros2_hgr.detectors import make_detector
+from ros2_hgr.detectors import warm_up
+from ros2_hgr.engine import FrameResult
+from ros2_hgr.engine import RecognitionEngine
+from ros2_hgr.frame_sources import make_frame_source
+from ros2_hgr.gesture_msgs import make_gesture_array
+from ros2_hgr.idle import IdleGovernor
+from ros2_hgr.low_jitter import GcMonitor
+from ros2_hgr.low_jitter import LowJitter
+from ros2_hgr.metrics import CvFpsCalc
+from ros2_hgr.metrics import LatencyStats
+from ros2_hgr.model_reload import ModelReloader
+from ros2_hgr.model_reload import validate_models
+from ros2_hgr.node_params import HGRParameters
+from ros2_hgr.pipeline import DropOldestQueue
+from ros2_hgr.pipeline import Pipeline
+from ros2_hgr.profiling import CallbackProfiler
+from ros2_hgr.profiling import py_spy_record
+from ros2_hgr.profiling import top_collapsed
+from ros2_hgr.profiling import top_pstats
+from ros2_hgr.thread_budget import ThreadBudget
+from ros2_hgr.trace_recorder import TraceRecorder
 
-# need absolute path of package location for logging new data to train
-logging_prefix = '/home/avaz/courses/w23/winter-project/hgr_go1_ws/src/go1_hgr_ros2/ros2_hgr/'
-
-class KeyPointClassifier(object):
-    def __init__(
-        self,
-        model_path_prefix,
-        num_threads=1,
-    ):
-        model_path=model_path_prefix+'model/keypoint_classifier/keypoint_classifier.tflite'
-
-        self.interpreter = tf.lite.Interpreter(model_path=model_path,
-                                               num_threads=num_threads)
-
-        self.interpreter.allocate_tensors()
-        self.input_details = self.interpreter.get_input_details()
-        self.output_details = self.interpreter.get_output_details()
-
-    def __call__(
-        self,
-        landmark_list,
-    ):
-        input_details_tensor_index = self.input_details[0]['index']
-        self.interpreter.set_tensor(
-            input_details_tensor_index,
-            np.array([landmark_list], dtype=np.float32))
-        self.interpreter.invoke()
-
-        output_details_tensor_index = self.output_details[0]['index']
-
-        result = self.interpreter.get_tensor(output_details_tensor_index)
-
-        result_index = np.argmax(np.squeeze(result))
-
-        return result_index
-
-
-class PointHistoryClassifier(object):
-    def __init__(
-        self,
-        model_path_prefix,
-        score_th=0.5,
-        invalid_value=0,
-        num_threads=1,
-    ):
-        model_path=model_path_prefix+'model/point_history_classifier/point_history_classifier.tflite'
-
-        self.interpreter = tf.lite.Interpreter(model_path=model_path,
-                                               num_threads=num_threads)
-
-        self.interpreter.allocate_tensors()
-        self.input_details = self.interpreter.get_input_details()
-        self.output_details = self.interpreter.get_output_details()
-
-        self.score_th = score_th
-        self.invalid_value = invalid_value
-
-    def __call__(
-        self,
-        point_history,
-    ):
-        input_details_tensor_index = self.input_details[0]['index']
-        self.interpreter.set_tensor(
-            input_details_tensor_index,
-            np.array([point_history], dtype=np.float32))
-        self.interpreter.invoke()
-
-        output_details_tensor_index = self.output_details[0]['index']
-
-        result = self.interpreter.get_tensor(output_details_tensor_index)
-
-        result_index = np.argmax(np.squeeze(result))
-
-        if np.squeeze(result)[result_index] < self.score_th:
-            result_index = self.invalid_value
-
-        return result_index
-
-class CvFpsCalc(object):
-    def __init__(self, buffer_len=1):
-        self._start_tick = cv.getTickCount()
-        self._freq = 1000.0 / cv.getTickFrequency()
-        self._difftimes = deque(maxlen=buffer_len)
-
-    def get(self):
-        current_tick = cv.getTickCount()
-        different_time = (current_tick - self._start_tick) * self._freq
-        self._start_tick = current_tick
-
-        self._difftimes.append(different_time)
-
-        fps = 1000.0 / (sum(self._difftimes) / len(self._difftimes))
-        fps_rounded = round(fps, 2)
-
-        return fps_rounded
 
 def get_args():
     parser = argparse.ArgumentParser()
@@ -139,181 +88,728 @@ def get_args():
     return args
 
 
-class HGR(Node):
+class HGR(HGRParameters, Node):
     """
     Detects and recognizes hand gestures to be published on /hgr_topic topic.
 
+    The node loads its models and starts processing in __init__; subclasses
+    that set ``managed`` call load(), start(), stop() and unload() themselves.
+
     Publishers:
     - self.hgr_pub (Int32): publishes to /hgr_topic.
+    - self.gestures_pub (HandGestureArray): publishes to /hgr_gestures.
+    - self.debug_image_pub (CompressedImage): /hgr_debug_image/compressed.
+    - self.ready_pub (Bool): /hgr_ready, latched; true once warmed up.
+
+    Services:
+    - ~/reload_models (std_srvs/Trigger): reload the classifiers and labels.
     """
 
-    def __init__(self):
+    managed = False
+
+    def __init__(self, node_name='hgr_node', **defaults):
         """
         Init for HGR node class.
 
-        Initialize publisher and timer.
+        Initialize the frame source, the recognition engine, the publisher and
+        the timer. Keyword arguments override the default of the parameter of
+        the same name, which is how the per-camera entry points configure it.
         """
-        super().__init__('hgr_node')
-        self.frequency = 200
+        super().__init__(node_name)
+        self.defaults = defaults
+        args = get_args()
+
+        self.frequency = self.param('frequency', 200.0)
         self.period = 1/self.frequency
         self.count = 0
 
-        self.declare_parameter('path_prefix1', '')
-        self.path_prefix = self.get_parameter('path_prefix1').get_parameter_value().string_value
+        self.path_prefix = self.param('path_prefix1', '')
+
+        # Frame source: 'v4l2' (cv.VideoCapture), 'ros' (sensor_msgs/Image
+        # topic), 'video' (file), 'images' (directory) or 'synthetic'
+        self.source_kind = self.param('frame_source', 'v4l2')
+        self.image_topic = self.param('image_topic', '/camera/color/image_raw')
+        self.source_path = self.param('source_path', '')
+        self.source_rate = self.param('source_rate', 30.0)
+        self.source_loop = self.param('source_loop', False)
+        self.mirror = self.param('mirror', True)
+        self.cap_device = self.param('device', args.device)
+        self.cap_width = self.param('width', args.width)
+        self.cap_height = self.param('height', args.height)
+        # V4L2 capture mode: pixel format ('MJPG', 'YUYV', '' = driver default),
+        # frame rate and driver queue depth (0 = driver default); capture_drain
+        # drops frames captured over a frame period ago without decoding them
+        self.cap_fourcc = self.param('capture_fourcc', 'MJPG')
+        self.cap_fps = self.param('capture_fps', 30.0)
+        self.cap_buffer_size = self.param('capture_buffer_size', 1)
+        self.cap_drain = self.param('capture_drain', True)
+
+        # Classifiers, hand sign cache and hand detector, as in hgr_node_multi
+        self.declare_model_params()
+        # Hands per frame, and the landmark jitter of the synthetic detector
+        self.max_num_hands = self.param('max_num_hands', 1)
+        self.synthetic_noise = self.param('synthetic_noise', 0.01)
+
+        # Idle low-power mode: probe at idle_rate Hz and idle_scale resolution
+        # once no hand has been seen for idle_timeout seconds
+        self.idle = IdleGovernor(
+            self.frequency,
+            idle_rate=self.param('idle_rate', 2.0),
+            idle_timeout=self.param('idle_timeout', 5.0),
+            idle_scale=self.param('idle_scale', 0.5),
+            enabled=self.param('idle_enabled', True),
+        )
+
+        # Staged execution: run capture, detection, classification, publishing
+        # and rendering on separate threads instead of one timer callback
+        self.pipelined = self.param('pipelined', False)
+        self.queue_size = self.param('queue_size', 1)
+        self.render_enabled = self.param('render', True)
+        self.metrics_period = self.param('metrics_period', 5.0)
+        # Annotated view as a JPEG CompressedImage, rendered on a worker thread
+        # at up to debug_image_rate Hz (0 disables) while it has subscribers
+        self.debug_image_rate = self.param('debug_image_rate', 5.0)
+        self.debug_image_quality = self.param('debug_image_quality', 80)
+
+        # Thread budget: threads per TFLite interpreter, cv.setNumThreads
+        # (negative: OpenCV's default), ROS executor threads and optional
+        # CPUs per stage, e.g. 'detect=2-3;classify=1;executor=0'. The detector
+        # and classifiers are created on the CPUs of the stage that runs them,
+        # so the library threads they start stay there too
+        self.threads = ThreadBudget(
+            tflite_threads=self.param('tflite_threads', 1),
+            opencv_threads=self.param('opencv_threads', -1),
+            executor_threads=self.param('executor_threads', 1),
+            affinity=self.param('stage_affinity', ''),
+        )
+        self.threads.apply_process()
+        # With executor_threads > 1, reloads and metrics run beside the frames
+        self.housekeeping_group = MutuallyExclusiveCallbackGroup()
+
+        # Low-jitter mode: once started, freeze start-up objects and run the
+        # garbage collector only after a frame is published (youngest
+        # generation past gc_gen0_threshold allocations, a full collection
+        # every gc_full_period seconds); recognition threads get SCHED_FIFO
+        # at realtime_priority (0 disables) or else niceness realtime_nice
+        self.jitter = LowJitter(
+            enabled=self.param('low_jitter', False),
+            gen0_threshold=self.param('gc_gen0_threshold', 700),
+            full_period=self.param('gc_full_period', 10.0),
+            priority=self.param('realtime_priority', 10),
+            nice=self.param('realtime_nice', -5),
+            logger=self.get_logger(),
+        )
+        # Frame time (FrameResult creation to publish) and GC pauses, logged
+        # with the metrics to compare the mode on and off
+        self.frame_times = LatencyStats(window=10000)
+        self.gc_monitor = GcMonitor()
+        self.gc_monitor.install()
 
         self.hgr_pub = self.create_publisher(Int32, "/hgr_topic", 10)
+        # Scores, handedness, landmarks and the finger gesture of every hand;
+        # only built while someone subscribes
+        self.gestures_pub = self.create_publisher(HandGestureArray, '/hgr_gestures', 10)
+        self.debug_image_pub = self.create_publisher(CompressedImage,
+                                                     '/hgr_debug_image/compressed', 1)
         self.gesture = 0
         self.hgr_sign = Int32()
         self.hgr_sign.data = -1     # -1 means no hand gesture detected
 
         self.mode = 0
 
-        # Argument parsing #################################################################
-        args = get_args()
-
-        cap_device = args.device
-        cap_width = args.width
-        cap_height = args.height
-
-        use_static_image_mode = args.use_static_image_mode
-        min_detection_confidence = args.min_detection_confidence
-        min_tracking_confidence = args.min_tracking_confidence
-
-        self.use_brect = True
-
-        # Camera preparation ###############################################################
-        self.cap = cv.VideoCapture(cap_device)
-        self.cap.set(cv.CAP_PROP_FRAME_WIDTH, cap_width)
-        self.cap.set(cv.CAP_PROP_FRAME_HEIGHT, cap_height)
-
-        # Model load #############################################################
-        mp_hands = mp.solutions.hands
-        self.hands = mp_hands.Hands(
-            static_image_mode=use_static_image_mode,
-            max_num_hands=1,
-            min_detection_confidence=min_detection_confidence,
-            min_tracking_confidence=min_tracking_confidence,
-        )
-
-        self.keypoint_classifier = KeyPointClassifier(model_path_prefix=self.path_prefix)
-
-        self.point_history_classifier = PointHistoryClassifier(model_path_prefix=self.path_prefix)
-
-        # Read labels ###########################################################
-        with open(self.path_prefix+'model/keypoint_classifier/keypoint_classifier_label.csv',
-                encoding='utf-8-sig') as f:
-            self.keypoint_classifier_labels = csv.reader(f)
-            self.keypoint_classifier_labels = [
-                row[0] for row in self.keypoint_classifier_labels
-            ]
-
-        with open(self.path_prefix+'model/point_history_classifier/point_history_classifier_label.csv',
-                encoding='utf-8-sig') as f:
-            self.point_history_classifier_labels = csv.reader(f)
-            self.point_history_classifier_labels = [
-                row[0] for row in self.point_history_classifier_labels
-            ]
+        # Startup: MediaPipe and the classifiers load and warm up on worker
+        # threads while the frame source opens on this one (parallel_init),
+        # then /hgr_ready (latched) turns true
+        self.warmup_frames = self.param('warmup_frames', 3)
+        self.parallel_init = self.param('parallel_init', True)
+        self.reload_poll_period = self.param('reload_poll_period', 2.0)
+        self.args = args
+        ready_qos = QoSProfile(depth=1, durability=DurabilityPolicy.TRANSIENT_LOCAL)
+        self.ready_pub = self.create_publisher(Bool, '/hgr_ready', ready_qos)
+        self.ready_pub.publish(Bool(data=False))
+
+        # Model hot-reload: load, warm up and validate on a background thread,
+        # then swap in between frames. Triggered by the ~/reload_models service
+        # or, every reload_poll_period seconds (0 disables), by the model and
+        # label files changing on disk
+        self.reload_srv = self.create_service(Trigger, '~/reload_models',
+                                              self.reload_callback,
+                                              callback_group=self.housekeeping_group)
+
+        # On-demand profiling: the ~/profile service runs the frame callbacks
+        # under cProfile (or samples the process with py-spy) for a number of
+        # frames or seconds, at most profile_timeout, and writes the result to
+        # profile_dir. The callbacks are only wrapped while a profile runs
+        self.profile_dir = self.param('profile_dir', '/tmp/hgr_profiles')
+        self.profile_timeout = self.param('profile_timeout', 60.0)
+        self.profiler = None
+        self.profile_thread = None
+        self.profile_srv = self.create_service(Profile, '~/profile', self.profile_callback,
+                                               callback_group=self.housekeeping_group)
+
+        # Frame trace: the last trace_capacity published frames (0 disables)
+        # in a ring buffer; ~/dump_trace writes them to trace_dir, as do a
+        # shutdown and a crash (the last trace_dump_seconds)
+        self.trace_capacity = self.param('trace_capacity', 3600)
+        self.trace_dir = self.param('trace_dir', '/tmp/hgr_traces')
+        self.trace_dump_seconds = self.param('trace_dump_seconds', 30.0)
+        self.trace = None
+        self.crashed = False
+        self.dump_trace_srv = self.create_service(DumpTrace, '~/dump_trace',
+                                                  self.dump_trace_callback,
+                                                  callback_group=self.housekeeping_group)
 
         # FPS Measurement ########################################################
         self.cvFpsCalc = CvFpsCalc(buffer_len=10)
 
-        # Coordinate history #################################################################
-        self.history_length = 16
-        self.point_history = deque(maxlen=self.history_length)
+        self.number = -1
+        self.engine = None
+        self.source = None
+        self.reloader = None
+        self.reload_tmr = None
+        self.keypoint_cache = None
+        self.tmr = None
+        self.metrics_tmr = None
+        self.pipeline = None
+        # Frames classified on an asynchronous detector's callback, to draw
+        self.render_inbox = DropOldestQueue(1, name='render')
+        self.debug_image = None
+        self.running = False
+        self._startup = None
+        if not self.managed:
+            self.load()
+            self.start()
+
+    def load(self, open_source=True):
+        """
+        Load and warm up the detector and classifiers, and build the engine.
 
-        # Finger gesture history ################################################
-        self.finger_gesture_history = deque(maxlen=self.history_length)
+        With ``open_source`` the frame source is opened at the same time;
+        otherwise start() opens it.
+        """
+        self.startup_times = {}
+        self._startup = time.perf_counter()
 
-        # CREATE TIMER
-        self.tmr = self.create_timer(self.period, self.timer_callback)
+        # Model load #############################################################
+        def load_detector():
+            with self.threads.pinned('detect'):
+                detector = self.timed(
+                    'detector', make_detector,
+                    self.detector_backend,
+                    model_path=self.hand_landmarker_model,
+                    static_image_mode=self.args.use_static_image_mode,
+                    max_num_hands=self.max_num_hands,
+                    min_detection_confidence=self.args.min_detection_confidence,
+                    min_tracking_confidence=self.args.min_tracking_confidence,
+                    noise=self.synthetic_noise)
+                self.timed('detector warm-up', warm_up, detector,
+                           self.cap_width, self.cap_height, self.warmup_frames)
+            return detector
+
+        def load_classifiers():
+            models = self.timed('classifiers', self.load_models)
+            history_length = getattr(models.get('point_history_classifier'), 'window', 16)
+            with self.threads.pinned('classify'):
+                self.timed('classifier warm-up', validate_models, models, history_length)
+            return models
+
+        if self.parallel_init:
+            with ThreadPoolExecutor(2, thread_name_prefix='hgr-init') as pool:
+                detector_job = pool.submit(load_detector)
+                models_job = pool.submit(load_classifiers)
+                if open_source:
+                    self.source = self.timed('frame source', self.open_source)
+                detector = detector_job.result()
+                models = models_job.result()
+        else:
+            detector = load_detector()
+            models = load_classifiers()
+            if open_source:
+                self.source = self.timed('frame source', self.open_source)
+
+        paths = self.model_files(models)
+        self.wrap_keypoint_classifier(models)
+        self.engine = RecognitionEngine(
+            detector,
+            point_history_sign_id=self.point_history_sign_id,
+            path_prefix=self.path_prefix,
+            **models,
+        )
+        if self.trace_capacity > 0 and self.trace is None:
+            self.trace = TraceRecorder(
+                self.trace_capacity, max_hands=self.max_num_hands,
+                sign_labels=self.engine.keypoint_classifier_labels,
+                finger_labels=self.engine.point_history_classifier_labels)
+
+        self.reloader = ModelReloader(
+            self.load_models,
+            lambda models: validate_models(models, self.engine.history_length),
+            self.apply_models,
+            paths=paths,
+            logger=self.get_logger(),
+        )
+        if self.reload_poll_period > 0:
+            self.reload_tmr = self.create_timer(self.reload_poll_period, self.reloader.watch,
+                                                callback_group=self.housekeeping_group)
+
+    def start(self):
+        """Open the frame source if needed and start processing frames."""
+        if self.source is None:
+            self.source = self.timed('frame source', self.open_source)
+        if hasattr(self.source, 'probe'):
+            self.get_logger().info('Capture mode: %s' % self.source.format_probe())
+
+        if self.source.push:
+            # While idle only probe messages get converted
+            self.source.gate = self.idle.should_process
+
+        if self.engine.detector.asynchronous:
+            # Each result is classified on the detector's callback, with its own frame
+            self.engine.detector.on_result = self.detector_result
+
+        if self.pipelined:
+            # Stages on their own threads, connected by drop-oldest queues
+            self.start_pipeline()
+        elif self.source.push:
+            # Process every message in the subscription callback
+            self.source.on_frame = self.frame_callback
+        else:
+            # CREATE TIMER
+            self.tmr = self.create_timer(self.period, self.timer_callback)
+
+        if self.debug_image_rate > 0:
+            self.debug_image = DebugImageWorker(
+                self.engine.render, self.publish_debug_image,
+                lambda: self.debug_image_pub.get_subscription_count() > 0,
+                rate=self.debug_image_rate, quality=self.debug_image_quality,
+                on_start=self.stage_started)
+
+        if self.metrics_period > 0:
+            self.metrics_tmr = self.create_timer(self.metrics_period, self.metrics_callback,
+                                                 callback_group=self.housekeeping_group)
+        self.running = True
+
+        if self._startup is not None:
+            total = time.perf_counter() - self._startup
+            self.get_logger().info('Ready in %.0f ms (%s init): %s; threads %s' % (
+                total * 1000, 'parallel' if self.parallel_init else 'serial',
+                ', '.join('%s %.0f ms' % (name, seconds * 1000)
+                          for name, seconds in self.startup_times.items()),
+                self.threads.format()))
+            self._startup = None
+        self.jitter.engage()
+        self.ready_pub.publish(Bool(data=True))
+
+    def stop(self):
+        """Stop processing and release the frame source; the models stay loaded."""
+        self.ready_pub.publish(Bool(data=False))
+        self.running = False
+        self.jitter.release()
+        if self.profiler is not None:
+            self.profiler.done.set()
+        if self.pipeline is not None:
+            self.pipeline.stop()
+            self.pipeline = None
+        if self.debug_image is not None:
+            self.debug_image.stop()
+            self.debug_image = None
+        for timer in (self.tmr, self.metrics_tmr):
+            if timer is not None:
+                self.destroy_timer(timer)
+        self.tmr = None
+        self.metrics_tmr = None
+        if self.source is not None:
+            self.source.release()
+            self.source = None
+        if self.render_enabled:
+            cv.destroyAllWindows()
 
+    def unload(self):
+        """Close the detector and drop the engine and classifiers."""
+        if self.reload_tmr is not None:
+            self.destroy_timer(self.reload_tmr)
+            self.reload_tmr = None
+        if self.reloader is not None:
+            self.reloader.join()
+            self.reloader = None
+        if self.engine is not None:
+            self.engine.detector.close()
+            self.engine = None
+        self.keypoint_cache = None
+
+    def stage_started(self, stage):
+        """Runs first on every stage thread: CPU affinity and scheduling policy."""
+        self.threads.pin(stage)
+        self.jitter.apply_thread(stage)
+
+    def timed(self, name, function, *args, **kwargs):
+        """Call ``function`` and record its duration in ``startup_times[name]``."""
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        self.startup_times[name] = time.perf_counter() - start
+        return result
+
+    def open_source(self):
+        """Camera preparation: open the frame source and take its first frame."""
+        source = make_frame_source(
+            self.source_kind,
+            node=self,
+            device=self.cap_device,
+            width=self.cap_width,
+            height=self.cap_height,
+            topic=self.image_topic,
+            path=self.source_path,
+            rate=self.source_rate,
+            loop=self.source_loop,
+            mirror=self.mirror,
+            fourcc=self.cap_fourcc,
+            fps=self.cap_fps,
+            buffer_size=self.cap_buffer_size,
+            drain=self.cap_drain,
+        )
+        if hasattr(source, 'probe'):
+            # A camera's first frame includes starting the stream
+            source.read(1.0)
+        return source
 
     def timer_callback(self):
-        fps = self.cvFpsCalc.get()
-
+        """Run all stages in series for one frame."""
         # Process Key (ESC: end) #################################################
-        key = cv.waitKey(10)
+        self.handle_key(cv.waitKey(10))
+
+        frame = self.acquire()
+        if frame is None:
+            return
+        self.process(frame)
+
+    def frame_callback(self, frame):
+        """Run all stages in series for a frame pushed by the source."""
+        self.handle_key(cv.waitKey(1))
+        self.process(FrameResult.from_frame(frame))
+
+    def process(self, frame):
+        frame = self.detect(frame)
+        if frame is not None:
+            frame = self.publish(self.classify(frame))
+        elif self.render_enabled:
+            # Frames of an asynchronous detector are drawn here, on the thread of the window
+            frame = self.render_inbox.get(0)
+        if frame is not None and self.render_enabled:
+            self.render(frame)
+
+    def detector_result(self, results, frame):
+        """on_result callback of an asynchronous detector: classify the frame of the result."""
+        if not self.running:
+            return
+        try:
+            frame = self.detected(self.engine.attach_results(frame, results))
+            if self.pipeline is not None:
+                self.pipeline.put('classify', frame)
+                return
+            frame = self.publish(self.classify(frame))
+            if self.render_enabled:
+                self.render_inbox.put(frame)
+        except Exception as e:
+            self.get_logger().error('Detector result: %r' % e)
+
+    def handle_key(self, key):
         if key == 27:  # ESC
-            self.cap.release()
+            self.source.release()
             cv.destroyAllWindows()
         number, self.mode = select_mode(key, self.mode)
-
-        # Camera capture #####################################################
-        ret, image = self.cap.read()
-        if not ret:
-            self.cap.release()
-            cv.destroyAllWindows()
-        image = cv.flip(image, 1)  # Mirror display
-        debug_image = copy.deepcopy(image)
-
-        # Detection implementation #############################################################
-        image = cv.cvtColor(image, cv.COLOR_BGR2RGB)
-
-        image.flags.writeable = False
-        results = self.hands.process(image)
-        image.flags.writeable = True
-
-        #  ####################################################################
-        if results.multi_hand_landmarks is not None:
-            for hand_landmarks, handedness in zip(results.multi_hand_landmarks,
-                                                results.multi_handedness):
-                # Bounding box calculation
-                brect = calc_bounding_rect(debug_image, hand_landmarks)
-                # Landmark calculation
-                landmark_list = calc_landmark_list(debug_image, hand_landmarks)
-
-                # Conversion to relative coordinates / normalized coordinates
-                pre_processed_landmark_list = pre_process_landmark(
-                    landmark_list)
-                pre_processed_point_history_list = pre_process_point_history(
-                debug_image, self.point_history)
-                # Write to the dataset file
-                logging_csv(number, self.mode, pre_processed_landmark_list,
-                            pre_processed_point_history_list, self.path_prefix)
-
-                # Hand sign classification
-                hand_sign_id = self.keypoint_classifier(pre_processed_landmark_list)
-                # if hand_sign_id == 2:  # Point gesture  # AVA: changed from 2 to "N/A"
-                if hand_sign_id == "N/A":
-                    self.point_history.append(landmark_list[8])
-                else:
-                    self.point_history.append([0, 0])
-
-                # Finger gesture classification
-                finger_gesture_id = 0
-                point_history_len = len(pre_processed_point_history_list)
-                if point_history_len == (self.history_length * 2):
-                    finger_gesture_id = self.point_history_classifier(
-                        pre_processed_point_history_list)
-
-                # Calculates the gesture IDs in the latest detection
-                self.finger_gesture_history.append(finger_gesture_id)
-                most_common_fg_id = Counter(
-                    self.finger_gesture_history).most_common()
-
-                # Drawing part
-                debug_image = draw_bounding_rect(self.use_brect, debug_image, brect)
-                debug_image = draw_landmarks(debug_image, landmark_list)
-                debug_image = draw_info_text(
-                    debug_image,
-                    brect,
-                    handedness,
-                    self.keypoint_classifier_labels[hand_sign_id],
-                    self.point_history_classifier_labels[most_common_fg_id[0][0]],
-                )
-        else:
-            self.point_history.append([0, 0])
-            hand_sign_id = -1
-
-        debug_image = draw_point_history(debug_image, self.point_history)
-        debug_image = draw_info(debug_image, fps, self.mode, number)
+        if number != -1:
+            self.number = number
+
+    def acquire(self, timeout=None):
+        """Capture stage: read the next frame from the source."""
+        frame = self.source.read(timeout)
+        if frame is None:
+            return None
+        return FrameResult.from_frame(frame)
+
+    def acquire_paced(self):
+        """Capture stage for the pipeline; honours the idle probe rate."""
+        # Push sources are gated before conversion instead
+        while not self.source.push and not self.idle.should_process():
+            time.sleep(0.005)
+        frame = self.acquire(timeout=0.1)
+        if frame is None and not self.source.push:
+            time.sleep(0.01)
+        return frame
+
+    def detect(self, frame):
+        """Detection stage: run the hand detector (downscaled while idle)."""
+        frame = self.engine.detect(frame, scale=self.idle.scale)
+        if frame is None:
+            # Submitted to an asynchronous detector, see detector_result()
+            return None
+        return self.detected(frame)
+
+    def detected(self, frame):
+        """Follow the idle mode with the detection result of ``frame``."""
+        if self.idle.update(frame.results.multi_hand_landmarks is not None):
+            if self.tmr is not None:
+                self.tmr.timer_period_ns = int(self.idle.period * 1e9)
+            self.get_logger().info('Switched to %s mode: %s'
+                                   % (self.idle.state, self.idle.format_report()))
+        return frame
+
+    def classify(self, frame):
+        """Featurize and classify every detected hand, updating the histories."""
+        number, self.number = self.number, -1
+        return self.engine.classify(frame, number, self.mode)
+
+    def publish(self, frame):
+        """Publish stage: send the hand sign of the frame on /hgr_topic."""
+        frame.fps = self.cvFpsCalc.get()
+        self.hgr_sign.data = int(frame.hand_sign_id)
+        self.hgr_pub.publish(self.hgr_sign)
+        if self.trace is not None:
+            self.trace.record(frame, self.hgr_sign.data)
+        if self.gestures_pub.get_subscription_count() > 0:
+            self.gestures_pub.publish(make_gesture_array(
+                frame, self.engine.keypoint_classifier_labels,
+                self.engine.point_history_classifier_labels, self.frame_stamp(frame)))
+        if self.debug_image is not None:
+            # Snapshot before the render stage draws on the image
+            self.debug_image.submit(frame)
+        self.count += 1
+        self.frame_times.add(time.perf_counter() - frame.created)
+        self.jitter.between_frames()
+        return frame
+
+    def publish_debug_image(self, frame, jpeg):
+        """Debug image worker: publish an encoded annotated view."""
+        msg = CompressedImage(format='jpeg', data=jpeg)
+        msg.header.stamp = self.frame_stamp(frame)
+        self.debug_image_pub.publish(msg)
+
+    def frame_stamp(self, frame):
+        """Return the ROS time of the frame: its image header stamp or its capture time."""
+        if frame.stamp is not None:
+            return frame.stamp
+        now = self.get_clock().now()
+        if self.source_kind in ('v4l2', 'synthetic'):
+            # Stamped with the monotonic clock when captured
+            age_ms = max(time.monotonic() * 1000 - frame.stamp_ms, 0)
+            now -= Duration(nanoseconds=int(age_ms * 1e6))
+        return now.to_msg()
+
+    def render(self, frame):
+        """Render stage: draw the annotated view and show it."""
+        debug_image = self.engine.render(frame)
 
         # Screen reflection #############################################################
         cv.imshow('Hand Gesture Recognition', debug_image)
 
-        self.hgr_sign.data = int(hand_sign_id)
-        self.hgr_pub.publish(self.hgr_sign)
-        self.count += 1
+    def render_pipelined(self, frame):
+        """Render stage for the pipeline; also owns the window's key events."""
+        self.render(frame)
+        self.handle_key(cv.waitKey(1))
+
+    def start_pipeline(self):
+        """Run acquire, detect, classify, publish and render on their own threads."""
+        self.pipeline = Pipeline(on_start=self.stage_started)
+        self.pipeline.add_stage('acquire', self.acquire_paced)
+        self.pipeline.add_stage('detect', self.detect, self.queue_size)
+        self.pipeline.add_stage('classify', self.classify, self.queue_size)
+        self.pipeline.add_stage('publish', self.publish, self.queue_size)
+        if self.render_enabled:
+            self.pipeline.add_stage('render', self.render_pipelined, self.queue_size)
+        self.pipeline.start()
+
+    def load_models(self):
+        """Load the classifiers and label tables as RecognitionEngine keyword arguments."""
+        with self.threads.pinned('classify'):
+            models = make_classifiers(self.classifier_backend, self.point_history_model,
+                                      self.path_prefix, self.threads.tflite_threads)
+        models['keypoint_classifier_labels'] = read_labels(
+            self.path_prefix + 'model/keypoint_classifier/keypoint_classifier_label.csv')
+        models['point_history_classifier_labels'] = read_labels(
+            self.path_prefix +
+            'model/point_history_classifier/point_history_classifier_label.csv')
+        return models
+
+    def model_files(self, models):
+        """Return the model and label files the loaded models come from."""
+        paths = [model.model_path for model in models.values()
+                 if getattr(model, 'model_path', None)]
+        return paths + [
+            self.path_prefix + 'model/keypoint_classifier/keypoint_classifier_label.csv',
+            self.path_prefix +
+            'model/point_history_classifier/point_history_classifier_label.csv',
+        ]
+
+    def wrap_keypoint_classifier(self, models):
+        """Put a fresh CachedClassifier around the hand sign classifier, if enabled."""
+        cache = self.make_keypoint_cache(models.get('keypoint_classifier'))
+        if cache is not None:
+            self.keypoint_cache = models['keypoint_classifier'] = cache
+
+    def apply_models(self, models):
+        """Hand validated models to the engine; it swaps them before the next frame."""
+        # Cached results belong to the old model
+        self.wrap_keypoint_classifier(models)
+        self.engine.swap_models(**models)
+        if self.trace is not None:
+            self.trace.sign_labels = list(models['keypoint_classifier_labels'])
+            self.trace.finger_labels = list(models['point_history_classifier_labels'])
+
+    def reload_callback(self, request, response):
+        """Start a model reload; the result is logged once it finishes."""
+        if self.reloader is None:
+            response.success = False
+            response.message = 'No models are loaded'
+            return response
+        response.success = self.reloader.start()
+        response.message = ('Reloading models in the background' if response.success
+                            else 'A reload is already running')
+        return response
+
+    def profile_callback(self, request, response):
+        """
+        Profile the frame callbacks and return the top entries.
+
+        The call waits for the result while frames can run meanwhile; when
+        they share the only executor thread with this service it returns
+        at once and the result is logged.
+        """
+        mode = request.mode or Profile.Request.CPROFILE
+        response.success = False
+        if not self.running:
+            response.message = 'Not processing frames'
+            return response
+        if self.profile_thread is not None and self.profile_thread.is_alive():
+            response.message = 'A profile is already running'
+            return response
+        if mode not in (Profile.Request.CPROFILE, Profile.Request.SAMPLING):
+            response.message = 'Unknown mode %r, expected %r or %r' % (
+                mode, Profile.Request.CPROFILE, Profile.Request.SAMPLING)
+            return response
+        top = request.top or 20
+        os.makedirs(self.profile_dir, exist_ok=True)
+        stem = os.path.join(self.profile_dir, time.strftime('hgr_%Y%m%d_%H%M%S'))
+
+        if mode == Profile.Request.CPROFILE:
+            try:
+                self.profiler = CallbackProfiler(request.frames, request.duration)
+            except ValueError as e:
+                response.message = str(e)
+                return response
+            response.path = stem + '.pstats'
+            self.patch_frame_callbacks(self.profiler)
+            job = functools.partial(self.run_cprofile, self.profiler, response.path, top)
+        else:
+            if request.duration <= 0:
+                response.message = 'Sampling needs a duration'
+                return response
+            response.path = stem + '.collapsed'
+            job = functools.partial(self.run_sampling, response.path,
+                                    min(request.duration, self.profile_timeout), top)
+
+        result = {}
+        self.profile_thread = threading.Thread(target=self.run_profile, args=(job, result),
+                                               name='hgr-profile', daemon=True)
+        self.profile_thread.start()
+        frames_keep_running = (self.threads.executor_threads > 1 or
+                               (self.pipeline is not None and not self.source.push))
+        if not frames_keep_running:
+            response.success = True
+            response.message = ('Profiling in the background (the frame callbacks run on '
+                                'the only executor thread); the top entries will be logged')
+            return response
+        self.profile_thread.join()
+        response.success = result['success']
+        response.message = result['message']
+        response.entries = result.get('entries', [])
+        return response
+
+    def patch_frame_callbacks(self, profiler):
+        """Wrap the callbacks that process frames in ``profiler`` until it ends."""
+        if self.pipeline is not None:
+            for stage in self.pipeline.stages:
+                profiler.patch(stage, 'func', count=stage.stage_name == 'publish')
+            return
+        if self.tmr is not None:
+            profiler.patch(self.tmr, 'callback')
+        else:
+            profiler.patch(self.source, 'on_frame')
+        profiler.patch(self, 'publish', profile=False, count=True)
+
+    def run_profile(self, job, result):
+        """Profile thread: run ``job`` and log its result."""
+        try:
+            result['message'], result['entries'] = job()
+            result['success'] = True
+            self.get_logger().info('Profile: %s\n%s'
+                                   % (result['message'], '\n'.join(result['entries'])))
+        except Exception as e:  # reported to the caller, the node keeps running
+            result['success'] = False
+            result['message'] = 'Profiling failed: %s' % e
+            self.get_logger().error(result['message'])
+
+    def run_cprofile(self, profiler, path, top):
+        profiler.wait(self.profile_timeout)
+        profiler.restore()
+        self.profiler = None
+        stats = profiler.stats()
+        if stats is None:
+            raise RuntimeError('no frame was profiled (%s)' % profiler.format())
+        stats.dump_stats(path)
+        return '%s, written to %s' % (profiler.format(), path), top_pstats(stats, top)
+
+    def run_sampling(self, path, duration, top):
+        py_spy_record(path, duration)
+        return 'Sampled %.0f s, written to %s' % (duration, path), top_collapsed(path, top)
+
+    def dump_trace(self, seconds, reason):
+        """Write the frames of the last ``seconds`` to trace_dir; return the path and count."""
+        path = os.path.join(self.trace_dir, time.strftime('hgr_%Y%m%d_%H%M%S_') + reason +
+                            '.hgrtrace')
+        frames = self.trace.dump(path, seconds, reason)
+        self.get_logger().info('Trace: %d frames written to %s' % (frames, path))
+        return path, frames
+
+    def dump_trace_callback(self, request, response):
+        if self.trace is None:
+            response.success = False
+            response.message = ('Trace recording is disabled' if self.trace_capacity <= 0
+                                else 'No models are loaded')
+            return response
+        try:
+            response.path, response.frames = self.dump_trace(request.seconds, 'request')
+        except OSError as e:
+            response.success = False
+            response.message = 'Could not write the trace: %s' % e
+            return response
+        response.success = True
+        response.message = 'Wrote %d frames' % response.frames
+        return response
+
+    def metrics_callback(self):
+        self.get_logger().info('Frame time (low jitter %s) %s | GC %s' % (
+            self.jitter.format(), self.frame_times.format_jitter(), self.gc_monitor.format()))
+        if self.pipeline is not None:
+            self.get_logger().info('Pipeline %s' % self.pipeline.format_metrics())
+        if self.keypoint_cache is not None:
+            self.get_logger().info('Keypoint cache %s' % self.keypoint_cache.format_stats())
+        if self.debug_image is not None and self.debug_image.published:
+            self.get_logger().info('Debug image published=%d render+encode %s'
+                                   % (self.debug_image.published,
+                                      self.debug_image.latency.format()))
+
+    def destroy_node(self):
+        if self.running:
+            self.stop()
+        if self.trace is not None and self.trace.recorded:
+            try:
+                self.dump_trace(self.trace_dump_seconds,
+                                'crash' if self.crashed else 'shutdown')
+            except OSError as e:
+                self.get_logger().error('Could not write the trace: %s' % e)
+        self.unload()
+        self.gc_monitor.remove()
+        super().destroy_node()
 
 
 def select_mode(key, mode):
@@ -329,358 +825,45 @@ def select_mode(key, mode):
     return number, mode
 
 
-def calc_bounding_rect(image, landmarks):
-    image_width, image_height = image.shape[1], image.shape[0]
-
-    landmark_array = np.empty((0, 2), int)
-
-    for _, landmark in enumerate(landmarks.landmark):
-        landmark_x = min(int(landmark.x * image_width), image_width - 1)
-        landmark_y = min(int(landmark.y * image_height), image_height - 1)
-
-        landmark_point = [np.array((landmark_x, landmark_y))]
-
-        landmark_array = np.append(landmark_array, landmark_point, axis=0)
-
-    x, y, w, h = cv.boundingRect(landmark_array)
-
-    return [x, y, x + w, y + h]
-
-
-def calc_landmark_list(image, landmarks):
-    image_width, image_height = image.shape[1], image.shape[0]
-
-    landmark_point = []
-
-    # Keypoint
-    for _, landmark in enumerate(landmarks.landmark):
-        landmark_x = min(int(landmark.x * image_width), image_width - 1)
-        landmark_y = min(int(landmark.y * image_height), image_height - 1)
-        # landmark_z = landmark.z
-
-        landmark_point.append([landmark_x, landmark_y])
-
-    return landmark_point
-
-
-def pre_process_landmark(landmark_list):
-    temp_landmark_list = copy.deepcopy(landmark_list)
-
-    # Convert to relative coordinates
-    base_x, base_y = 0, 0
-    for index, landmark_point in enumerate(temp_landmark_list):
-        if index == 0:
-            base_x, base_y = landmark_point[0], landmark_point[1]
-
-        temp_landmark_list[index][0] = temp_landmark_list[index][0] - base_x
-        temp_landmark_list[index][1] = temp_landmark_list[index][1] - base_y
-
-    # Convert to a one-dimensional list
-    temp_landmark_list = list(
-        itertools.chain.from_iterable(temp_landmark_list))
-
-    # Normalization
-    max_value = max(list(map(abs, temp_landmark_list)))
-
-    def normalize_(n):
-        return n / max_value
-
-    temp_landmark_list = list(map(normalize_, temp_landmark_list))
-
-    return temp_landmark_list
-
-
-def pre_process_point_history(image, point_history):
-    image_width, image_height = image.shape[1], image.shape[0]
-
-    temp_point_history = copy.deepcopy(point_history)
-
-    # Convert to relative coordinates
-    base_x, base_y = 0, 0
-    for index, point in enumerate(temp_point_history):
-        if index == 0:
-            base_x, base_y = point[0], point[1]
-
-        temp_point_history[index][0] = (temp_point_history[index][0] -
-                                        base_x) / image_width
-        temp_point_history[index][1] = (temp_point_history[index][1] -
-                                        base_y) / image_height
-
-    # Convert to a one-dimensional list
-    temp_point_history = list(
-        itertools.chain.from_iterable(temp_point_history))
-
-    return temp_point_history
+def spin(node):
+    """Spin ``node`` on an executor sized and pinned by its thread budget."""
+    node.stage_started('executor')
+    if node.threads.executor_threads > 1:
+        executor = MultiThreadedExecutor(num_threads=node.threads.executor_threads)
+    else:
+        executor = SingleThreadedExecutor()
+    executor.add_node(node)
+    try:
+        executor.spin()
+    except ExternalShutdownException:
+        pass
+    except Exception:
+        # destroy_node() dumps the frame trace as a crash trace
+        node.crashed = True
+        raise
+    finally:
+        executor.shutdown()
 
 
-def logging_csv(number, mode, landmark_list, point_history_list, path_prefix):
-    if mode == 0:
+def run(args=None, **defaults):
+    """Spin an HGR node whose parameter defaults are overridden by ``defaults``."""
+    rclpy.init(args=args)
+    node = HGR(**defaults)
+    try:
+        spin(node)
+    except KeyboardInterrupt:
         pass
-    if mode == 1 and (0 <= number <= 9):
-        # csv_path = 'model/keypoint_classifier/keypoint.csv'
-        csv_path = logging_prefix+'model/keypoint_classifier/keypoint.csv'
-        with open(csv_path, 'a', newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([number, *landmark_list])
-    if mode == 2 and (0 <= number <= 9):
-        # csv_path = 'model/point_history_classifier/point_history.csv'
-        csv_path = logging_prefix+'model/point_history_classifier/point_history.csv'
-        with open(csv_path, 'a', newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([number, *point_history_list])
-    return
-
-
-def draw_landmarks(image, landmark_point):
-    if len(landmark_point) > 0:
-        # Thumb
-        cv.line(image, tuple(landmark_point[2]), tuple(landmark_point[3]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[2]), tuple(landmark_point[3]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[3]), tuple(landmark_point[4]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[3]), tuple(landmark_point[4]),
-                (255, 255, 255), 2)
-
-        # Index finger
-        cv.line(image, tuple(landmark_point[5]), tuple(landmark_point[6]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[5]), tuple(landmark_point[6]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[6]), tuple(landmark_point[7]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[6]), tuple(landmark_point[7]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[7]), tuple(landmark_point[8]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[7]), tuple(landmark_point[8]),
-                (255, 255, 255), 2)
-
-        # Middle finger
-        cv.line(image, tuple(landmark_point[9]), tuple(landmark_point[10]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[9]), tuple(landmark_point[10]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[10]), tuple(landmark_point[11]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[10]), tuple(landmark_point[11]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[11]), tuple(landmark_point[12]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[11]), tuple(landmark_point[12]),
-                (255, 255, 255), 2)
-
-        # Ring finger
-        cv.line(image, tuple(landmark_point[13]), tuple(landmark_point[14]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[13]), tuple(landmark_point[14]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[14]), tuple(landmark_point[15]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[14]), tuple(landmark_point[15]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[15]), tuple(landmark_point[16]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[15]), tuple(landmark_point[16]),
-                (255, 255, 255), 2)
-
-        # Little finger
-        cv.line(image, tuple(landmark_point[17]), tuple(landmark_point[18]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[17]), tuple(landmark_point[18]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[18]), tuple(landmark_point[19]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[18]), tuple(landmark_point[19]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[19]), tuple(landmark_point[20]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[19]), tuple(landmark_point[20]),
-                (255, 255, 255), 2)
-
-        # Palm
-        cv.line(image, tuple(landmark_point[0]), tuple(landmark_point[1]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[0]), tuple(landmark_point[1]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[1]), tuple(landmark_point[2]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[1]), tuple(landmark_point[2]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[2]), tuple(landmark_point[5]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[2]), tuple(landmark_point[5]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[5]), tuple(landmark_point[9]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[5]), tuple(landmark_point[9]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[9]), tuple(landmark_point[13]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[9]), tuple(landmark_point[13]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[13]), tuple(landmark_point[17]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[13]), tuple(landmark_point[17]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[17]), tuple(landmark_point[0]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[17]), tuple(landmark_point[0]),
-                (255, 255, 255), 2)
-
-    # Key Points
-    for index, landmark in enumerate(landmark_point):
-        if index == 0:  # 手首1
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 1:  # 手首2
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 2:  # 親指：付け根
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 3:  # 親指：第1関節
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 4:  # 親指：指先
-            cv.circle(image, (landmark[0], landmark[1]), 8, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 8, (0, 0, 0), 1)
-        if index == 5:  # 人差指：付け根
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 6:  # 人差指：第2関節
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 7:  # 人差指：第1関節
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 8:  # 人差指：指先
-            cv.circle(image, (landmark[0], landmark[1]), 8, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 8, (0, 0, 0), 1)
-        if index == 9:  # 中指：付け根
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 10:  # 中指：第2関節
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 11:  # 中指：第1関節
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 12:  # 中指：指先
-            cv.circle(image, (landmark[0], landmark[1]), 8, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 8, (0, 0, 0), 1)
-        if index == 13:  # 薬指：付け根
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 14:  # 薬指：第2関節
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 15:  # 薬指：第1関節
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 16:  # 薬指：指先
-            cv.circle(image, (landmark[0], landmark[1]), 8, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 8, (0, 0, 0), 1)
-        if index == 17:  # 小指：付け根
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 18:  # 小指：第2関節
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 19:  # 小指：第1関節
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 20:  # 小指：指先
-            cv.circle(image, (landmark[0], landmark[1]), 8, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 8, (0, 0, 0), 1)
-
-    return image
-
-
-def draw_bounding_rect(use_brect, image, brect):
-    if use_brect:
-        # Outer rectangle
-        cv.rectangle(image, (brect[0], brect[1]), (brect[2], brect[3]),
-                     (0, 0, 0), 1)
-
-    return image
-
-
-def draw_info_text(image, brect, handedness, hand_sign_text,
-                   finger_gesture_text):
-    cv.rectangle(image, (brect[0], brect[1]), (brect[2], brect[1] - 22),
-                 (0, 0, 0), -1)
-
-    info_text = handedness.classification[0].label[0:]
-    if hand_sign_text != "":
-        info_text = info_text + ':' + hand_sign_text
-    cv.putText(image, info_text, (brect[0] + 5, brect[1] - 4),
-               cv.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1, cv.LINE_AA)
-
-    # if finger_gesture_text != "":
-    #     cv.putText(image, "Finger Gesture:" + finger_gesture_text, (10, 60),
-    #                cv.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 0), 4, cv.LINE_AA)
-    #     cv.putText(image, "Finger Gesture:" + finger_gesture_text, (10, 60),
-    #                cv.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2,
-    #                cv.LINE_AA)
-
-    return image
-
-
-def draw_point_history(image, point_history):
-    for index, point in enumerate(point_history):
-        if point[0] != 0 and point[1] != 0:
-            cv.circle(image, (point[0], point[1]), 1 + int(index / 2),
-                      (152, 251, 152), 2)
-
-    return image
-
-
-def draw_info(image, fps, mode, number):
-    cv.putText(image, "FPS:" + str(fps), (10, 30), cv.FONT_HERSHEY_SIMPLEX,
-               1.0, (0, 0, 0), 4, cv.LINE_AA)
-    cv.putText(image, "FPS:" + str(fps), (10, 30), cv.FONT_HERSHEY_SIMPLEX,
-               1.0, (255, 255, 255), 2, cv.LINE_AA)
-
-    mode_string = ['Logging Key Point', 'Logging Point History']
-    if 1 <= mode <= 2:
-        cv.putText(image, "MODE:" + mode_string[mode - 1], (10, 90),
-                   cv.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1,
-                   cv.LINE_AA)
-        if 0 <= number <= 9:
-            cv.putText(image, "NUM:" + str(number), (10, 110),
-                       cv.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1,
-                       cv.LINE_AA)
-    return image
+    finally:
+        # Stops the detector worker process when that backend is used
+        node.destroy_node()
+        if rclpy.ok():
+            rclpy.shutdown()
 
 
 def main(args=None):
-    rclpy.init(args=args)
-    node = HGR()
-    rclpy.spin(node)
-    rclpy.shutdown()
+    """Built-in webcam through V4L2."""
+    run(args, frame_source='v4l2', frequency=200.0)
+
 
 if __name__ == '__main__':
     main()
@@ -1,906 +1,12 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
-import csv
-import copy
-import argparse
-import itertools
-from collections import Counter
-from collections import deque
-
-# hide TF logger messages for NVidia GPU libraries
-import os
-os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
-
-import cv2 as cv
-import numpy as np
-import mediapipe as mp
-import tensorflow as tf
-from tensorflow import keras
-
-import rclpy
-from rclpy.node import Node
-from std_msgs.msg import Int32
-from sensor_msgs.msg import Image
-from cv_bridge import CvBridge
-
-import pyrealsense2 as rs
-
-# need absolute path of package location for logging new data to train
-logging_prefix = '/home/avaz/courses/w23/winter-project/hgr_go1_ws/src/go1_hgr_ros2/ros2_hgr/'
-
-class KeyPointClassifier(object):
-    def __init__(
-        self,
-        model_path_prefix,
-        num_threads=1,
-    ):
-        model_path=model_path_prefix+'model/keypoint_classifier/keypoint_classifier.tflite'
-
-        self.interpreter = tf.lite.Interpreter(model_path=model_path,
-                                               num_threads=num_threads)
-
-        self.interpreter.allocate_tensors()
-        self.input_details = self.interpreter.get_input_details()
-        self.output_details = self.interpreter.get_output_details()
-
-    def __call__(
-        self,
-        landmark_list,
-    ):
-        input_details_tensor_index = self.input_details[0]['index']
-        self.interpreter.set_tensor(
-            input_details_tensor_index,
-            np.array([landmark_list], dtype=np.float32))
-        self.interpreter.invoke()
-
-        output_details_tensor_index = self.output_details[0]['index']
-
-        result = self.interpreter.get_tensor(output_details_tensor_index)
-
-        result_index = np.argmax(np.squeeze(result))
-
-        return result_index
-
-
-class PointHistoryClassifier(object):
-    def __init__(
-        self,
-        model_path_prefix,
-        score_th=0.5,
-        invalid_value=0,
-        num_threads=1,
-    ):
-        model_path=model_path_prefix+'model/point_history_classifier/point_history_classifier.tflite'
-
-        self.interpreter = tf.lite.Interpreter(model_path=model_path,
-                                               num_threads=num_threads)
-
-        self.interpreter.allocate_tensors()
-        self.input_details = self.interpreter.get_input_details()
-        self.output_details = self.interpreter.get_output_details()
-
-        self.score_th = score_th
-        self.invalid_value = invalid_value
-
-    def __call__(
-        self,
-        point_history,
-    ):
-        input_details_tensor_index = self.input_details[0]['index']
-        self.interpreter.set_tensor(
-            input_details_tensor_index,
-            np.array([point_history], dtype=np.float32))
-        self.interpreter.invoke()
-
-        output_details_tensor_index = self.output_details[0]['index']
-
-        result = self.interpreter.get_tensor(output_details_tensor_index)
-
-        result_index = np.argmax(np.squeeze(result))
-
-        if np.squeeze(result)[result_index] < self.score_th:
-            result_index = self.invalid_value
-
-        return result_index
-
-class CvFpsCalc(object):
-    def __init__(self, buffer_len=1):
-        self._start_tick = cv.getTickCount()
-        self._freq = 1000.0 / cv.getTickFrequency()
-        self._difftimes = deque(maxlen=buffer_len)
-
-    def get(self):
-        current_tick = cv.getTickCount()
-        different_time = (current_tick - self._start_tick) * self._freq
-        self._start_tick = current_tick
-
-        self._difftimes.append(different_time)
-
-        fps = 1000.0 / (sum(self._difftimes) / len(self._difftimes))
-        fps_rounded = round(fps, 2)
-
-        return fps_rounded
-
-def get_args():
-    parser = argparse.ArgumentParser()
-
-    parser.add_argument("--device", type=int, default=0)
-    parser.add_argument("--width", help='cap width', type=int, default=960)
-    parser.add_argument("--height", help='cap height', type=int, default=540)
-
-    parser.add_argument('--use_static_image_mode', action='store_true')
-    parser.add_argument("--min_detection_confidence",
-                        help='min_detection_confidence',
-                        type=float,
-                        default=0.7)
-    parser.add_argument("--min_tracking_confidence",
-                        help='min_tracking_confidence',
-                        type=int,
-                        default=0.5)
-
-    args, unknown = parser.parse_known_args()
-
-    return args
-
-
-class HGR(Node):
-    """
-    Detects and recognizes hand gestures to be published on /hgr_topic topic.
-
-    Publishers:
-    - self.hgr_pub (Int32): publishes to /hgr_topic.
-    """
-
-    def __init__(self):
-        """
-        Init for HGR node class.
-
-        Initialize publisher and timer.
-        """
-        super().__init__('hgr_node')
-        self.frequency = 100 # 200
-        self.period = 1/self.frequency
-        self.count = 0
-
-        self.declare_parameter('path_prefix1', '')
-        self.path_prefix = self.get_parameter('path_prefix1').get_parameter_value().string_value
-        # self.path_prefix = path_prefix
-
-        self.hgr_pub = self.create_publisher(Int32, "/hgr_topic", 10)
-        self.gesture = 0
-        self.hgr_sign = Int32()
-        self.hgr_sign.data = -1     # -1 means no hand gesture detected
-
-        self.bridge = CvBridge()
-        
-        # RealSense image
-        self.rs_sub = self.create_subscription(Image, '/camera/color/image_raw', self.rs_callback, 10)
-
-        self.image = None
-
-        # Argument parsing #################################################################
-        args = get_args()
-
-        cap_device = args.device
-        cap_width = args.width
-        cap_height = args.height
-
-        use_static_image_mode = args.use_static_image_mode
-        min_detection_confidence = args.min_detection_confidence
-        min_tracking_confidence = args.min_tracking_confidence
-
-        self.use_brect = True
-
-        # Camera preparation ###############################################################
-        self.cap = cv.VideoCapture(cap_device)
-        self.cap.set(cv.CAP_PROP_FRAME_WIDTH, cap_width)
-        self.cap.set(cv.CAP_PROP_FRAME_HEIGHT, cap_height)
-
-        # #### Pyrealsense2 ####
-        # # Initiating realsense pipeline
-        # self.pipeline = rs.pipeline()
-        # self.config = rs.config()
-        # self.pipeline_wrapper = rs.pipeline_wrapper(self.pipeline)
-        # self.pipeline_profile = self.config.resolve(self.pipeline_wrapper)
-        # self.device = self.pipeline_profile.get_device()
-
-        # # Enabling color camera streaming at 30 fps and same specs(480x270x30)
-        # self.config.enable_stream(rs.stream.color, 480, 270, rs.format.bgr8, 30)
-        # # Start streaming
-        # # self.profile = self.pipeline.start(self.config)
-        # self.profile = self.pipeline.start()
-        # ######################
-
-        # Model load #############################################################
-        mp_hands = mp.solutions.hands
-        self.hands = mp_hands.Hands(
-            static_image_mode=use_static_image_mode,
-            max_num_hands=1,    # change to 2 for detecting both hands
-            min_detection_confidence=min_detection_confidence,
-            min_tracking_confidence=min_tracking_confidence,
-        )
-
-        self.keypoint_classifier = KeyPointClassifier(model_path_prefix=self.path_prefix)
-
-        self.point_history_classifier = PointHistoryClassifier(model_path_prefix=self.path_prefix)
-
-        # Read labels ###########################################################
-        # with open('model/keypoint_classifier/keypoint_classifier_label.csv',
-        with open(self.path_prefix+'model/keypoint_classifier/keypoint_classifier_label.csv',
-                encoding='utf-8-sig') as f:
-            self.keypoint_classifier_labels = csv.reader(f)
-            self.keypoint_classifier_labels = [
-                row[0] for row in self.keypoint_classifier_labels
-            ]
-
-        # with open('model/point_history_classifier/point_history_classifier_label.csv',
-        with open(self.path_prefix+'model/point_history_classifier/point_history_classifier_label.csv',
-                encoding='utf-8-sig') as f:
-            self.point_history_classifier_labels = csv.reader(f)
-            self.point_history_classifier_labels = [
-                row[0] for row in self.point_history_classifier_labels
-            ]
-
-        # FPS Measurement ########################################################
-        self.cvFpsCalc = CvFpsCalc(buffer_len=10)
-
-        # Coordinate history #################################################################
-        self.history_length = 16
-        self.point_history = deque(maxlen=self.history_length)
-
-        # Finger gesture history ################################################
-        self.finger_gesture_history = deque(maxlen=self.history_length)
-
-        #  ########################################################################
-        self.mode = 0
-
-        # CREATE TIMER (for Pyrealsense2)
-        # self.tmr = self.create_timer(self.period, self.timer_callback)
-
-    def rs_callback(self, data):
-        self.image = self.bridge.imgmsg_to_cv2(data)
-        self.image = cv.flip(self.image, 1)  # Mirror display
-        # self.image = cv.cvtColor(self.image, cv.COLOR_BGR2RGB)
-        self.debug_image = copy.deepcopy(self.image)
-        cv.waitKey(1)
-        ##########
-        fps = self.cvFpsCalc.get()
-
-        # Process Key (ESC: end) #################################################
-        key = cv.waitKey(10)
-        if key == 27:  # ESC
-            self.cap.release()
-            cv.destroyAllWindows()
-        number, self.mode = select_mode(key, self.mode)
-        
-        if self.image is not None:
-            image = self.image
-            debug_image = self.debug_image
-
-            image.flags.writeable = False
-            results = self.hands.process(image)
-            image.flags.writeable = True
-
-            #  ####################################################################
-            if results.multi_hand_landmarks is not None:
-                for hand_landmarks, handedness in zip(results.multi_hand_landmarks,
-                                                    results.multi_handedness):
-                    # Bounding box calculation
-                    brect = calc_bounding_rect(debug_image, hand_landmarks)
-                    # Landmark calculation
-                    landmark_list = calc_landmark_list(debug_image, hand_landmarks)
-
-                    # Conversion to relative coordinates / normalized coordinates
-                    pre_processed_landmark_list = pre_process_landmark(
-                        landmark_list)
-                    pre_processed_point_history_list = pre_process_point_history(
-                    debug_image, self.point_history)
-                    # Write to the dataset file
-                    logging_csv(number, self.mode, pre_processed_landmark_list,
-                                pre_processed_point_history_list, self.path_prefix)
-
-                    # Hand sign classification
-                    hand_sign_id = self.keypoint_classifier(pre_processed_landmark_list)
-                    if hand_sign_id == "N/A":  # Point gesture  # AVA: changed from 2 to "N/A"
-                    # if hand_sign_id == 2:
-                        self.point_history.append(landmark_list[8])
-                    else:
-                        self.point_history.append([0, 0])
-
-                    # Finger gesture classification
-                    finger_gesture_id = 0
-                    point_history_len = len(pre_processed_point_history_list)
-                    if point_history_len == (self.history_length * 2):
-                        finger_gesture_id = self.point_history_classifier(
-                            pre_processed_point_history_list)
-
-                    # Calculates the gesture IDs in the latest detection
-                    self.finger_gesture_history.append(finger_gesture_id)
-                    most_common_fg_id = Counter(
-                        self.finger_gesture_history).most_common()
-
-                    # Drawing part
-                    debug_image = draw_bounding_rect(self.use_brect, debug_image, brect)
-                    debug_image = draw_landmarks(debug_image, landmark_list)
-                    debug_image = draw_info_text(
-                        debug_image,
-                        brect,
-                        handedness,
-                        self.keypoint_classifier_labels[hand_sign_id],
-                        self.point_history_classifier_labels[most_common_fg_id[0][0]],
-                    )
-            else:
-                self.point_history.append([0, 0])
-                hand_sign_id = -1
-
-            debug_image = draw_point_history(debug_image, self.point_history)
-            debug_image = draw_info(debug_image, fps, self.mode, number)
-
-            # Screen reflection #############################################################
-            debug_image = cv.cvtColor(debug_image, cv.COLOR_BGR2RGB)
-            cv.imshow('Hand Gesture Recognition', debug_image)
-
-            self.hgr_sign.data = int(hand_sign_id)
-            self.hgr_pub.publish(self.hgr_sign)
-
-'''
-    def imgL_callback(self, data):
-        # self.get_logger().info("Inside left/rect callback")
-        self.left_image = self.bridge.imgmsg_to_cv2(data)
-        self.image = self.bridge.imgmsg_to_cv2(data)
-        # self.get_logger().info(f"self.image is none? {self.image}")
-        image = self.image
-        # cv.imshow("camera", self.image)
-        cv.waitKey(1)
-
-        fps = self.cvFpsCalc.get()
-
-        # Process Key (ESC: end) #################################################
-        key = cv.waitKey(10)
-        if key == 27:  # ESC
-            self.cap.release()
-            cv.destroyAllWindows()
-        number, self.mode = select_mode(key, self.mode)
-
-        # Camera capture #####################################################
-        # ret, image = self.cap.read()
-        # if not ret:
-        #     self.cap.release()
-        #     cv.destroyAllWindows()
-
-        image = cv.flip(image, 1)  # Mirror display
-
-        # # Detection implementation #############################################################
-        image = cv.cvtColor(image, cv.COLOR_BGR2RGB)
-        debug_image = copy.deepcopy(image)
-
-        image.flags.writeable = False
-        results = self.hands.process(image)
-        image.flags.writeable = True
-
-        #  ####################################################################
-        if results.multi_hand_landmarks is not None:
-            for hand_landmarks, handedness in zip(results.multi_hand_landmarks,
-                                                results.multi_handedness):
-                # Bounding box calculation
-                brect = calc_bounding_rect(debug_image, hand_landmarks)
-                # Landmark calculation
-                landmark_list = calc_landmark_list(debug_image, hand_landmarks)
-
-                # Conversion to relative coordinates / normalized coordinates
-                pre_processed_landmark_list = pre_process_landmark(
-                    landmark_list)
-                pre_processed_point_history_list = pre_process_point_history(
-                debug_image, self.point_history)
-                # Write to the dataset file
-                logging_csv(number, self.mode, pre_processed_landmark_list,
-                            pre_processed_point_history_list, self.path_prefix)
-
-                # Hand sign classification
-                hand_sign_id = self.keypoint_classifier(pre_processed_landmark_list)
-                # if hand_sign_id == "N/A":  # Point gesture  # AVA: changed from 2 to "N/A"
-                if hand_sign_id == 2:
-                    self.point_history.append(landmark_list[8])
-                else:
-                    self.point_history.append([0, 0])
-
-                # Finger gesture classification
-                finger_gesture_id = 0
-                point_history_len = len(pre_processed_point_history_list)
-                if point_history_len == (self.history_length * 2):
-                    finger_gesture_id = self.point_history_classifier(
-                        pre_processed_point_history_list)
-
-                # Calculates the gesture IDs in the latest detection
-                self.finger_gesture_history.append(finger_gesture_id)
-                most_common_fg_id = Counter(
-                    self.finger_gesture_history).most_common()
-
-                # Drawing part
-                debug_image = draw_bounding_rect(self.use_brect, debug_image, brect)
-                debug_image = draw_landmarks(debug_image, landmark_list)
-                debug_image = draw_info_text(
-                    debug_image,
-                    brect,
-                    handedness,
-                    self.keypoint_classifier_labels[hand_sign_id],
-                    self.point_history_classifier_labels[most_common_fg_id[0][0]],
-                )
-        else:
-            self.point_history.append([0, 0])
-            hand_sign_id = -1
-
-        debug_image = draw_point_history(debug_image, self.point_history)
-        debug_image = draw_info(debug_image, fps, self.mode, number)
-
-        cv.imshow('Hand Gesture Recognition', debug_image)
-
-        self.hgr_sign.data = int(hand_sign_id)
-        self.hgr_pub.publish(self.hgr_sign)
-
-
-    def imgR_callback(self, data):
-        self.right_image = self.bridge.imgmsg_to_cv2(data)
-        cv.waitKey(1)
-
-
-    def timer_callback(self):
-        # self.get_logger("in timer callback")
-
-        # self.get_logger().info(f"self.image\n {self.image}\n")
-
-        # #### Pyrealsense2 ####
-        # frame = self.pipeline.wait_for_frames()
-        # self.image = frame.get_color_frame()
-        # self.image = np.asanyarray(self.image.get_data())
-        # self.image = cv.flip(self.image, 1)  # Mirror display
-        # self.image = cv.cvtColor(self.image, cv.COLOR_BGR2RGB)
-        # self.debug_image = copy.deepcopy(self.image)
-        # ######################
-
-
-        fps = self.cvFpsCalc.get()
-
-        # Process Key (ESC: end) #################################################
-        key = cv.waitKey(10)
-        if key == 27:  # ESC
-            self.cap.release()
-            cv.destroyAllWindows()
-        number, self.mode = select_mode(key, self.mode)
-        
-        if self.image is not None:
-            image = self.image
-            debug_image = self.debug_image
-
-            image.flags.writeable = False
-            results = self.hands.process(image)
-            # self.get_logger().info(f"results: {results.multi_hand_landmarks}")
-            image.flags.writeable = True
-
-            #  ####################################################################
-            if results.multi_hand_landmarks is not None:
-                self.get_logger().info("detecting hands")
-                for hand_landmarks, handedness in zip(results.multi_hand_landmarks,
-                                                    results.multi_handedness):
-                    # Bounding box calculation
-                    brect = calc_bounding_rect(debug_image, hand_landmarks)
-                    # Landmark calculation
-                    landmark_list = calc_landmark_list(debug_image, hand_landmarks)
-
-                    # Conversion to relative coordinates / normalized coordinates
-                    pre_processed_landmark_list = pre_process_landmark(
-                        landmark_list)
-                    pre_processed_point_history_list = pre_process_point_history(
-                    debug_image, self.point_history)
-                    # Write to the dataset file
-                    logging_csv(number, self.mode, pre_processed_landmark_list,
-                                pre_processed_point_history_list, self.path_prefix)
-
-                    # Hand sign classification
-                    hand_sign_id = self.keypoint_classifier(pre_processed_landmark_list)
-                    if hand_sign_id == "N/A":  # Point gesture  # AVA: changed from 2 to "N/A"
-                    # if hand_sign_id == 2:
-                        self.point_history.append(landmark_list[8])
-                    else:
-                        self.point_history.append([0, 0])
-
-                    # Finger gesture classification
-                    finger_gesture_id = 0
-                    point_history_len = len(pre_processed_point_history_list)
-                    if point_history_len == (self.history_length * 2):
-                        finger_gesture_id = self.point_history_classifier(
-                            pre_processed_point_history_list)
-
-                    # Calculates the gesture IDs in the latest detection
-                    self.finger_gesture_history.append(finger_gesture_id)
-                    most_common_fg_id = Counter(
-                        self.finger_gesture_history).most_common()
-
-                    # Drawing part
-                    debug_image = draw_bounding_rect(self.use_brect, debug_image, brect)
-                    debug_image = draw_landmarks(debug_image, landmark_list)
-                    debug_image = draw_info_text(
-                        debug_image,
-                        brect,
-                        handedness,
-                        self.keypoint_classifier_labels[hand_sign_id],
-                        self.point_history_classifier_labels[most_common_fg_id[0][0]],
-                    )
-            else:
-                self.point_history.append([0, 0])
-                hand_sign_id = -1
-
-            debug_image = draw_point_history(debug_image, self.point_history)
-            debug_image = draw_info(debug_image, fps, self.mode, number)
-
-            # Screen reflection #############################################################
-            cv.imshow('Hand Gesture Recognition', debug_image)
-
-            self.hgr_sign.data = int(hand_sign_id)
-            self.hgr_pub.publish(self.hgr_sign)
-            # if self.count%10 == 0:
-            #     self.hgr_pub.publish(self.hgr_sign)
-            # self.count += 1
-'''
-
-def select_mode(key, mode):
-    number = -1
-    if 48 <= key <= 57:  # 0 ~ 9
-        number = key - 48
-    if key == 110:  # n
-        mode = 0
-    if key == 107:  # k
-        mode = 1
-    if key == 104:  # h
-        mode = 2
-    return number, mode
-
-
-def calc_bounding_rect(image, landmarks):
-    image_width, image_height = image.shape[1], image.shape[0]
-
-    landmark_array = np.empty((0, 2), int)
-
-    for _, landmark in enumerate(landmarks.landmark):
-        landmark_x = min(int(landmark.x * image_width), image_width - 1)
-        landmark_y = min(int(landmark.y * image_height), image_height - 1)
-
-        landmark_point = [np.array((landmark_x, landmark_y))]
-
-        landmark_array = np.append(landmark_array, landmark_point, axis=0)
-
-    x, y, w, h = cv.boundingRect(landmark_array)
-
-    return [x, y, x + w, y + h]
-
-
-def calc_landmark_list(image, landmarks):
-    image_width, image_height = image.shape[1], image.shape[0]
-
-    landmark_point = []
-
-    # Keypoint
-    for _, landmark in enumerate(landmarks.landmark):
-        landmark_x = min(int(landmark.x * image_width), image_width - 1)
-        landmark_y = min(int(landmark.y * image_height), image_height - 1)
-        # landmark_z = landmark.z
-
-        landmark_point.append([landmark_x, landmark_y])
-
-    return landmark_point
-
-
-def pre_process_landmark(landmark_list):
-    temp_landmark_list = copy.deepcopy(landmark_list)
-
-    # Convert to relative coordinates
-    base_x, base_y = 0, 0
-    for index, landmark_point in enumerate(temp_landmark_list):
-        if index == 0:
-            base_x, base_y = landmark_point[0], landmark_point[1]
-
-        temp_landmark_list[index][0] = temp_landmark_list[index][0] - base_x
-        temp_landmark_list[index][1] = temp_landmark_list[index][1] - base_y
-
-    # Convert to a one-dimensional list
-    temp_landmark_list = list(
-        itertools.chain.from_iterable(temp_landmark_list))
-
-    # Normalization
-    max_value = max(list(map(abs, temp_landmark_list)))
-
-    def normalize_(n):
-        return n / max_value
-
-    temp_landmark_list = list(map(normalize_, temp_landmark_list))
-
-    return temp_landmark_list
-
-
-def pre_process_point_history(image, point_history):
-    image_width, image_height = image.shape[1], image.shape[0]
-
-    temp_point_history = copy.deepcopy(point_history)
-
-    # Convert to relative coordinates
-    base_x, base_y = 0, 0
-    for index, point in enumerate(temp_point_history):
-        if index == 0:
-            base_x, base_y = point[0], point[1]
-
-        temp_point_history[index][0] = (temp_point_history[index][0] -
-                                        base_x) / image_width
-        temp_point_history[index][1] = (temp_point_history[index][1] -
-                                        base_y) / image_height
-
-    # Convert to a one-dimensional list
-    temp_point_history = list(
-        itertools.chain.from_iterable(temp_point_history))
-
-    return temp_point_history
-
-
-def logging_csv(number, mode, landmark_list, point_history_list, path_prefix):
-    if mode == 0:
-        pass
-    if mode == 1 and (0 <= number <= 9):
-        # csv_path = 'model/keypoint_classifier/keypoint.csv'
-        csv_path = logging_prefix+'model/keypoint_classifier/keypoint.csv'
-        with open(csv_path, 'a', newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([number, *landmark_list])
-    if mode == 2 and (0 <= number <= 9):
-        # csv_path = 'model/point_history_classifier/point_history.csv'
-        csv_path = logging_prefix+'model/point_history_classifier/point_history.csv'
-        with open(csv_path, 'a', newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([number, *point_history_list])
-    return
-
-
-def draw_landmarks(image, landmark_point):
-    if len(landmark_point) > 0:
-        # Thumb
-        cv.line(image, tuple(landmark_point[2]), tuple(landmark_point[3]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[2]), tuple(landmark_point[3]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[3]), tuple(landmark_point[4]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[3]), tuple(landmark_point[4]),
-                (255, 255, 255), 2)
-
-        # Index finger
-        cv.line(image, tuple(landmark_point[5]), tuple(landmark_point[6]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[5]), tuple(landmark_point[6]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[6]), tuple(landmark_point[7]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[6]), tuple(landmark_point[7]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[7]), tuple(landmark_point[8]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[7]), tuple(landmark_point[8]),
-                (255, 255, 255), 2)
-
-        # Middle finger
-        cv.line(image, tuple(landmark_point[9]), tuple(landmark_point[10]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[9]), tuple(landmark_point[10]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[10]), tuple(landmark_point[11]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[10]), tuple(landmark_point[11]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[11]), tuple(landmark_point[12]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[11]), tuple(landmark_point[12]),
-                (255, 255, 255), 2)
-
-        # Ring finger
-        cv.line(image, tuple(landmark_point[13]), tuple(landmark_point[14]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[13]), tuple(landmark_point[14]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[14]), tuple(landmark_point[15]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[14]), tuple(landmark_point[15]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[15]), tuple(landmark_point[16]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[15]), tuple(landmark_point[16]),
-                (255, 255, 255), 2)
-
-        # Little finger
-        cv.line(image, tuple(landmark_point[17]), tuple(landmark_point[18]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[17]), tuple(landmark_point[18]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[18]), tuple(landmark_point[19]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[18]), tuple(landmark_point[19]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[19]), tuple(landmark_point[20]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[19]), tuple(landmark_point[20]),
-                (255, 255, 255), 2)
-
-        # Palm
-        cv.line(image, tuple(landmark_point[0]), tuple(landmark_point[1]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[0]), tuple(landmark_point[1]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[1]), tuple(landmark_point[2]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[1]), tuple(landmark_point[2]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[2]), tuple(landmark_point[5]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[2]), tuple(landmark_point[5]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[5]), tuple(landmark_point[9]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[5]), tuple(landmark_point[9]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[9]), tuple(landmark_point[13]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[9]), tuple(landmark_point[13]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[13]), tuple(landmark_point[17]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[13]), tuple(landmark_point[17]),
-                (255, 255, 255), 2)
-        cv.line(image, tuple(landmark_point[17]), tuple(landmark_point[0]),
-                (0, 0, 0), 6)
-        cv.line(image, tuple(landmark_point[17]), tuple(landmark_point[0]),
-                (255, 255, 255), 2)
-
-    # Key Points
-    for index, landmark in enumerate(landmark_point):
-        if index == 0:  # 手首1
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 1:  # 手首2
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 2:  # 親指：付け根
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 3:  # 親指：第1関節
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 4:  # 親指：指先
-            cv.circle(image, (landmark[0], landmark[1]), 8, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 8, (0, 0, 0), 1)
-        if index == 5:  # 人差指：付け根
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 6:  # 人差指：第2関節
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 7:  # 人差指：第1関節
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 8:  # 人差指：指先
-            cv.circle(image, (landmark[0], landmark[1]), 8, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 8, (0, 0, 0), 1)
-        if index == 9:  # 中指：付け根
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 10:  # 中指：第2関節
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 11:  # 中指：第1関節
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 12:  # 中指：指先
-            cv.circle(image, (landmark[0], landmark[1]), 8, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 8, (0, 0, 0), 1)
-        if index == 13:  # 薬指：付け根
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 14:  # 薬指：第2関節
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 15:  # 薬指：第1関節
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 16:  # 薬指：指先
-            cv.circle(image, (landmark[0], landmark[1]), 8, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 8, (0, 0, 0), 1)
-        if index == 17:  # 小指：付け根
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 18:  # 小指：第2関節
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 19:  # 小指：第1関節
-            cv.circle(image, (landmark[0], landmark[1]), 5, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 5, (0, 0, 0), 1)
-        if index == 20:  # 小指：指先
-            cv.circle(image, (landmark[0], landmark[1]), 8, (255, 255, 255),
-                      -1)
-            cv.circle(image, (landmark[0], landmark[1]), 8, (0, 0, 0), 1)
-
-    return image
-
-
-def draw_bounding_rect(use_brect, image, brect):
-    if use_brect:
-        # Outer rectangle
-        cv.rectangle(image, (brect[0], brect[1]), (brect[2], brect[3]),
-                     (0, 0, 0), 1)
-
-    return image
-
-
-def draw_info_text(image, brect, handedness, hand_sign_text,
-                   finger_gesture_text):
-    cv.rectangle(image, (brect[0], brect[1]), (brect[2], brect[1] - 22),
-                 (0, 0, 0), -1)
-
-    info_text = handedness.classification[0].label[0:]
-    if hand_sign_text != "":
-        info_text = info_text + ':' + hand_sign_text
-    cv.putText(image, info_text, (brect[0] + 5, brect[1] - 4),
-               cv.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1, cv.LINE_AA)
-
-    return image
-
-
-def draw_point_history(image, point_history):
-    for index, point in enumerate(point_history):
-        if point[0] != 0 and point[1] != 0:
-            cv.circle(image, (point[0], point[1]), 1 + int(index / 2),
-                      (152, 251, 152), 2)
-
-    return image
-
-
-def draw_info(image, fps, mode, number):
-    cv.putText(image, "FPS:" + str(fps), (10, 30), cv.FONT_HERSHEY_SIMPLEX,
-               1.0, (0, 0, 0), 4, cv.LINE_AA)
-    cv.putText(image, "FPS:" + str(fps), (10, 30), cv.FONT_HERSHEY_SIMPLEX,
-               1.0, (255, 255, 255), 2, cv.LINE_AA)
-
-    mode_string = ['Logging Key Point', 'Logging Point History']
-    if 1 <= mode <= 2:
-        cv.putText(image, "MODE:" + mode_string[mode - 1], (10, 90),
-                   cv.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1,
-                   cv.LINE_AA)
-        if 0 <= number <= 9:
-            cv.putText(image, "NUM:" + str(number), (10, 110),
-                       cv.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1,
-                       cv.LINE_AA)
-    return image
+"""HGR node configured for the RealSense color stream."""
+from ros2_hgr.hgr_node import run
 
 
 def main(args=None):
-    rclpy.init(args=args)
-    node = HGR()
-    rclpy.spin(node)
-    rclpy.shutdown()
+    run(args, frame_source='ros', image_topic='/camera/color/image_raw', frequency=100.0)
+
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Hand gesture recognition on several camera streams in one process."""
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+import rclpy
+from rclpy.node import Node
+from std_msgs.msg import Int32
+from sensor_msgs.msg import Image
+from cv_bridge import CvBridge
+
+from hgr_interfaces.msg import HandGestureArray
+
+from ros2_hgr.classifiers import make_classifiers
+from ros2_hgr.classifiers import read_labels
+from ros2_hgr.detectors import make_detector
+from ros2_hgr.engine import FrameResult
+from ros2_hgr.engine import RecognitionEngine
+from ros2_hgr.frame_sources import frame_from_image_msg
+from ros2_hgr.gesture_msgs import make_gesture_array
+from ros2_hgr.node_params import HGRParameters
+
+
+class Stream(object):
+    """Per-camera state: recognition engine, pending message and last result."""
+
+    def __init__(self, name, topic, engine):
+        self.name = name
+        self.topic = topic
+        self.engine = engine
+
+        self.lock = threading.Lock()
+        self.pending = None     # newest unprocessed message
+        self.busy = False
+        self.dropped = 0
+        self.processed = 0
+
+        self.publisher = None
+        self.gestures_publisher = None
+        self.hand_sign_id = -1
+        self.stamp = 0.0
+
+
+class HGRMulti(HGRParameters, Node):
+    """
+    Detects and recognizes hand gestures on a list of image topics.
+
+    The TensorFlow Lite classifiers and label tables are loaded once and
+    shared by all streams; each stream only adds its own detector graph
+    (MediaPipe keeps tracking state per video stream) and point histories.
+    Frames are processed on a worker pool, at most one frame per stream at a
+    time; while a stream is busy only its newest message is kept.
+
+    Publishers:
+    - <output_prefix>/<stream name> (Int32): hand sign per stream.
+    - <output_prefix>/<stream name>/gestures (HandGestureArray): every hand per stream.
+    - /hgr_topic (Int32): fused hand sign over all streams, if fuse is true.
+    """
+
+    def __init__(self):
+        super().__init__('hgr_node_multi')
+
+        self.path_prefix = self.param('path_prefix1', '')
+        topics = list(self.param('image_topics', [
+            '/camera/color/image_raw', '/head/front/cam/image_rect/left']))
+        names = [n for n in self.param('stream_names', ['']) if n]
+        if len(names) != len(topics):
+            names = [t.strip('/').replace('/', '_') for t in topics]
+        output_prefix = self.param('output_prefix', '/hgr_topic')
+        workers = self.param('workers', 0)
+        self.fuse = self.param('fuse', True)
+        self.fuse_window = self.param('fuse_window', 0.5)
+        # Classifiers, hand sign cache and hand detector, as in hgr_node
+        self.declare_model_params()
+        min_detection_confidence = self.param('min_detection_confidence', 0.7)
+        min_tracking_confidence = self.param('min_tracking_confidence', 0.5)
+
+        # Shared model stack ###################################################
+        self.classifiers = make_classifiers(self.classifier_backend, self.point_history_model,
+                                            self.path_prefix)
+        # TFLite interpreters are not thread-safe
+        self.classifier_lock = threading.Lock()
+        self.keypoint_classifier_labels = read_labels(
+            self.path_prefix + 'model/keypoint_classifier/keypoint_classifier_label.csv')
+        self.point_history_classifier_labels = read_labels(
+            self.path_prefix +
+            'model/point_history_classifier/point_history_classifier_label.csv')
+
+        # Per-stream state #####################################################
+        self.bridge = CvBridge()
+        self.streams = []
+        for name, topic in zip(names, topics):
+            detector = make_detector(
+                self.detector_backend,
+                model_path=self.hand_landmarker_model,
+                max_num_hands=1,
+                min_detection_confidence=min_detection_confidence,
+                min_tracking_confidence=min_tracking_confidence,
+            )
+            classifiers = dict(self.classifiers)
+            # The motion gate follows one hand, so each stream gets its own
+            cache = self.make_keypoint_cache(classifiers['keypoint_classifier'])
+            if cache is not None:
+                classifiers['keypoint_classifier'] = cache
+            stream = Stream(name, topic, RecognitionEngine(
+                detector,
+                keypoint_classifier_labels=self.keypoint_classifier_labels,
+                point_history_classifier_labels=self.point_history_classifier_labels,
+                point_history_sign_id=self.point_history_sign_id,
+                path_prefix=self.path_prefix,
+                classifier_lock=self.classifier_lock,
+                **classifiers,
+            ))
+            stream.publisher = self.create_publisher(
+                Int32, '%s/%s' % (output_prefix, name), 10)
+            stream.gestures_publisher = self.create_publisher(
+                HandGestureArray, '%s/%s/gestures' % (output_prefix, name), 10)
+            self.create_subscription(
+                Image, topic, lambda msg, s=stream: self.image_callback(s, msg), 10)
+            self.streams.append(stream)
+            self.get_logger().info('Stream %s <- %s' % (name, topic))
+
+        self.fused_lock = threading.Lock()
+        self.fused_pub = self.create_publisher(Int32, '/hgr_topic', 10) if self.fuse else None
+
+        workers = workers or len(self.streams)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='hgr-stream')
+
+    def image_callback(self, stream, msg):
+        with stream.lock:
+            if stream.pending is not None:
+                stream.dropped += 1
+            stream.pending = msg
+            if stream.busy:
+                return
+            stream.busy = True
+        self.pool.submit(self.process_stream, stream)
+
+    def process_stream(self, stream):
+        """Worker: process the newest frame of ``stream`` until none is pending."""
+        while True:
+            with stream.lock:
+                msg, stream.pending = stream.pending, None
+                if msg is None:
+                    stream.busy = False
+                    return
+            try:
+                self.process_frame(stream, msg)
+            except Exception as e:
+                self.get_logger().error('Stream %s: %r' % (stream.name, e))
+
+    def process_frame(self, stream, msg):
+        # Mirror like the single-camera nodes
+        frame = FrameResult.from_frame(frame_from_image_msg(self.bridge, msg))
+        frame = stream.engine.detect(frame)
+        if frame is None:
+            return
+        frame = stream.engine.classify(frame)
+        hand_sign_id = frame.hand_sign_id
+
+        stream.hand_sign_id = int(hand_sign_id)
+        stream.stamp = time.monotonic()
+        stream.processed += 1
+        stream.publisher.publish(Int32(data=stream.hand_sign_id))
+        if stream.gestures_publisher.get_subscription_count() > 0:
+            stream.gestures_publisher.publish(make_gesture_array(
+                frame, self.keypoint_classifier_labels, self.point_history_classifier_labels,
+                msg.header.stamp))
+        if self.fused_pub is not None:
+            self.publish_fused()
+
+    def publish_fused(self):
+        """
+        Publish the newest hand sign seen by any stream within fuse_window.
+
+        -1 is published only when no stream has seen a hand recently.
+        """
+        now = time.monotonic()
+        with self.fused_lock:
+            recent = [s for s in self.streams
+                      if s.hand_sign_id != -1 and now - s.stamp <= self.fuse_window]
+            sign = max(recent, key=lambda s: s.stamp).hand_sign_id if recent else -1
+            self.fused_pub.publish(Int32(data=sign))
+
+    def destroy_node(self):
+        self.pool.shutdown(wait=True)
+        for stream in self.streams:
+            stream.engine.detector.close()
+        super().destroy_node()
+
+
+def main(args=None):
+    rclpy.init(args=args)
+    node = HGRMulti()
+    try:
+        rclpy.spin(node)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        node.destroy_node()
+        if rclpy.ok():
+            rclpy.shutdown()
+
+
+if __name__ == '__main__':
+    main()
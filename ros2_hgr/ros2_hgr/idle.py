@@ -0,0 +1,137 @@
+"""Idle low-power governor shared by the HGR nodes."""
+import time
+
+ACTIVE = 'active'
+IDLE = 'idle'
+
+
+class IdleGovernor(object):
+    """
+    Track whether a hand is present and pick the processing rate accordingly.
+
+    The governor starts ACTIVE. After ``idle_timeout`` seconds without a
+    detected hand it drops to IDLE, where frames are only probed at
+    ``idle_rate`` Hz and downscaled by ``idle_scale`` before detection. The
+    first probe that sees a hand switches straight back to ACTIVE, so that
+    frame is classified as usual and the next one already runs at full rate.
+
+    Wall and CPU time are accumulated per state so the nodes can report how
+    long they idled and how much CPU that saved.
+    """
+
+    def __init__(
+        self,
+        active_rate,
+        idle_rate=2.0,
+        idle_timeout=5.0,
+        idle_scale=0.5,
+        enabled=True,
+        clock=time.monotonic,
+        cpu_clock=time.process_time,
+    ):
+        self.active_rate = float(active_rate)
+        self.idle_rate = float(idle_rate)
+        self.idle_timeout = float(idle_timeout)
+        self.idle_scale = float(idle_scale)
+        self.enabled = enabled
+
+        self._clock = clock
+        self._cpu_clock = cpu_clock
+
+        now = self._clock()
+        self.state = ACTIVE
+        self._last_hand = now
+        self._last_probe = None
+        self._state_since = now
+        self._cpu_since = self._cpu_clock()
+
+        self.wall_time = {ACTIVE: 0.0, IDLE: 0.0}
+        self.cpu_time = {ACTIVE: 0.0, IDLE: 0.0}
+
+    @property
+    def period(self):
+        """Timer period in seconds for the current state."""
+        if self.state == IDLE:
+            return 1.0 / self.idle_rate
+        return 1.0 / self.active_rate
+
+    @property
+    def scale(self):
+        """Resize factor to apply to the detector input."""
+        if self.state == IDLE:
+            return self.idle_scale
+        return 1.0
+
+    def should_process(self, now=None):
+        """
+        Rate-limit frames pushed to the node (subscription callbacks).
+
+        Always True while ACTIVE. While IDLE, True at most once per idle
+        period so only probe frames get converted and run through detection.
+        """
+        if self.state == ACTIVE:
+            return True
+        if now is None:
+            now = self._clock()
+        if self._last_probe is None or now - self._last_probe >= 1.0 / self.idle_rate:
+            self._last_probe = now
+            return True
+        return False
+
+    def update(self, hand_present, now=None):
+        """Feed the detection outcome of a frame; return True if the state changed."""
+        if now is None:
+            now = self._clock()
+        if hand_present:
+            self._last_hand = now
+            if self.state == IDLE:
+                self._switch(ACTIVE, now)
+                return True
+        elif (self.enabled and self.state == ACTIVE and
+                now - self._last_hand >= self.idle_timeout):
+            self._switch(IDLE, now)
+            return True
+        return False
+
+    def _switch(self, state, now):
+        self._accumulate(now)
+        self.state = state
+        self._last_probe = now
+
+    def _accumulate(self, now):
+        cpu_now = self._cpu_clock()
+        self.wall_time[self.state] += now - self._state_since
+        self.cpu_time[self.state] += cpu_now - self._cpu_since
+        self._state_since = now
+        self._cpu_since = cpu_now
+
+    def report(self, now=None):
+        """
+        Return per-state wall/CPU time and an estimate of CPU seconds saved.
+
+        The saving is what the idle period would have cost at the CPU rate
+        measured while active, minus what it actually cost.
+        """
+        if now is None:
+            now = self._clock()
+        self._accumulate(now)
+
+        active_wall = self.wall_time[ACTIVE]
+        active_cpu_rate = self.cpu_time[ACTIVE] / active_wall if active_wall > 0 else 0.0
+        cpu_saved = max(0.0, active_cpu_rate * self.wall_time[IDLE] - self.cpu_time[IDLE])
+
+        return {
+            'state': self.state,
+            'active_wall': active_wall,
+            'idle_wall': self.wall_time[IDLE],
+            'active_cpu': self.cpu_time[ACTIVE],
+            'idle_cpu': self.cpu_time[IDLE],
+            'cpu_saved': cpu_saved,
+        }
+
+    def format_report(self, now=None):
+        """Format :meth:`report` as a single log line."""
+        r = self.report(now)
+        return ('state=%s active=%.1fs (cpu %.1fs) idle=%.1fs (cpu %.1fs) cpu_saved=%.1fs'
+                % (r['state'], r['active_wall'], r['active_cpu'],
+                   r['idle_wall'], r['idle_cpu'], r['cpu_saved']))
@@ -0,0 +1,128 @@
+"""Landmark extraction and preprocessing for the classifiers."""
+import copy
+import csv
+import itertools
+
+import cv2 as cv
+import numpy as np
+
+# need absolute path of package location for logging new data to train
+logging_prefix = '/home/avaz/courses/w23/winter-project/hgr_go1_ws/src/go1_hgr_ros2/ros2_hgr/'
+
+
+def calc_bounding_rect(image, landmarks):
+    image_width, image_height = image.shape[1], image.shape[0]
+
+    landmark_array = np.empty((0, 2), int)
+
+    for _, landmark in enumerate(landmarks.landmark):
+        landmark_x = min(int(landmark.x * image_width), image_width - 1)
+        landmark_y = min(int(landmark.y * image_height), image_height - 1)
+
+        landmark_point = [np.array((landmark_x, landmark_y))]
+
+        landmark_array = np.append(landmark_array, landmark_point, axis=0)
+
+    x, y, w, h = cv.boundingRect(landmark_array)
+
+    return [x, y, x + w, y + h]
+
+
+def calc_landmark_list(image, landmarks):
+    image_width, image_height = image.shape[1], image.shape[0]
+
+    landmark_point = []
+
+    # Keypoint
+    for _, landmark in enumerate(landmarks.landmark):
+        landmark_x = min(int(landmark.x * image_width), image_width - 1)
+        landmark_y = min(int(landmark.y * image_height), image_height - 1)
+        # landmark_z = landmark.z
+
+        landmark_point.append([landmark_x, landmark_y])
+
+    return landmark_point
+
+
+def pre_process_landmark(landmark_list):
+    temp_landmark_list = copy.deepcopy(landmark_list)
+
+    # Convert to relative coordinates
+    base_x, base_y = 0, 0
+    for index, landmark_point in enumerate(temp_landmark_list):
+        if index == 0:
+            base_x, base_y = landmark_point[0], landmark_point[1]
+
+        temp_landmark_list[index][0] = temp_landmark_list[index][0] - base_x
+        temp_landmark_list[index][1] = temp_landmark_list[index][1] - base_y
+
+    # Convert to a one-dimensional list
+    temp_landmark_list = list(
+        itertools.chain.from_iterable(temp_landmark_list))
+
+    # Normalization (a degenerate hand with every landmark on the wrist stays zero)
+    max_value = max(list(map(abs, temp_landmark_list))) or 1
+
+    def normalize_(n):
+        return n / max_value
+
+    temp_landmark_list = list(map(normalize_, temp_landmark_list))
+
+    return temp_landmark_list
+
+
+def pre_process_point_history(image, point_history):
+    image_width, image_height = image.shape[1], image.shape[0]
+
+    temp_point_history = copy.deepcopy(point_history)
+
+    # Convert to relative coordinates
+    base_x, base_y = 0, 0
+    for index, point in enumerate(temp_point_history):
+        if index == 0:
+            base_x, base_y = point[0], point[1]
+
+        temp_point_history[index][0] = (temp_point_history[index][0] -
+                                        base_x) / image_width
+        temp_point_history[index][1] = (temp_point_history[index][1] -
+                                        base_y) / image_height
+
+    # Convert to a one-dimensional list
+    temp_point_history = list(
+        itertools.chain.from_iterable(temp_point_history))
+
+    return temp_point_history
+
+
+def pre_process_landmark_batch(landmarks):
+    """Vectorised pre_process_landmark() for [N, 21, 2] pixel landmarks; returns [N, 42]."""
+    landmarks = np.asarray(landmarks, dtype=np.float64)
+    relative = (landmarks - landmarks[:, :1]).reshape(len(landmarks), -1)
+    max_value = np.abs(relative).max(axis=1, keepdims=True)
+    # Degenerate hands stay zero, like pre_process_landmark()
+    return (relative / np.where(max_value == 0, 1, max_value)).astype(np.float32)
+
+
+def pre_process_point_history_batch(point_histories, image_width, image_height):
+    """Vectorised pre_process_point_history() for [N, 16, 2] pixel histories; returns [N, 32]."""
+    point_histories = np.asarray(point_histories, dtype=np.float64)
+    relative = (point_histories - point_histories[:, :1]) / (image_width, image_height)
+    return relative.reshape(len(point_histories), -1).astype(np.float32)
+
+
+def logging_csv(number, mode, landmark_list, point_history_list, path_prefix):
+    if mode == 0:
+        pass
+    if mode == 1 and (0 <= number <= 9):
+        # csv_path = 'model/keypoint_classifier/keypoint.csv'
+        csv_path = logging_prefix+'model/keypoint_classifier/keypoint.csv'
+        with open(csv_path, 'a', newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow([number, *landmark_list])
+    if mode == 2 and (0 <= number <= 9):
+        # csv_path = 'model/point_history_classifier/point_history.csv'
+        csv_path = logging_prefix+'model/point_history_classifier/point_history.csv'
+        with open(csv_path, 'a', newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow([number, *point_history_list])
+    return
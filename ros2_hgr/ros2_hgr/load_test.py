@@ -0,0 +1,149 @@
+"""
+Load-test everything after the hand detector with synthetic hands.
+
+Moving hands from ros2_hgr.synthetic_hands are run through the detect
+(synthetic backend) -> classify (-> render) path of the node, one rate of
+``--rates`` at a time; rate 0 runs frames back to back to find the
+maximum. Frames are scheduled at fixed times and never skipped, so a
+rate the pipeline cannot keep up with shows as a lower achieved rate and
+a growing latency, measured from when a frame was due. A rate counts as
+sustained when at least 98% of it is achieved. Hand signs are scored
+against the generated ones, finger gestures (single hand only) once the
+gesture has filled the point and gesture histories.
+
+    ros2 run ros2_hgr hgr_load_test --rates 100 500 1000 2000 0 --seconds 5
+
+To load ROS consumers of /hgr_topic and /hgr_gestures instead, run the node
+itself with ``frame_source:=synthetic detector_backend:=synthetic`` and
+``source_rate`` set to the rate to offer.
+"""
+import argparse
+import time
+
+import cv2 as cv
+import numpy as np
+
+from ros2_hgr.classifiers import make_classifiers
+from ros2_hgr.classifiers import read_labels
+from ros2_hgr.engine import FrameResult
+from ros2_hgr.engine import RecognitionEngine
+from ros2_hgr.frame_sources import RGB
+from ros2_hgr.metrics import LatencyStats
+from ros2_hgr.synthetic_hands import SyntheticHandsDetector
+
+
+def build_engine(args):
+    detector = SyntheticHandsDetector(max_num_hands=args.hands, noise=args.noise,
+                                      seed=args.seed)
+    models = make_classifiers(args.classifier_backend, args.point_history_model,
+                              args.path_prefix, args.tflite_threads)
+    return RecognitionEngine(
+        detector,
+        keypoint_classifier_labels=read_labels(
+            args.path_prefix + 'model/keypoint_classifier/keypoint_classifier_label.csv'),
+        point_history_classifier_labels=read_labels(
+            args.path_prefix +
+            'model/point_history_classifier/point_history_classifier_label.csv'),
+        point_history_sign_id=args.point_history_sign_id,
+        path_prefix=args.path_prefix,
+        **models,
+    )
+
+
+def run_rate(engine, image, rate, seconds, render=False):
+    """Run frames at ``rate`` (0: back to back) for ``seconds``; return the statistics."""
+    generator = engine.detector.generator
+    frames = int(rate * seconds) if rate > 0 else None
+    latency = LatencyStats(window=frames or 100000)
+    signs = [0, 0]          # correct, scored
+    gestures = [0, 0]
+    settle = 2 * engine.history_length
+    period = 1.0 / rate if rate > 0 else 0.0
+    count = 0
+
+    start = time.perf_counter()
+    deadline = start + seconds
+    while (count < frames) if frames is not None else (time.perf_counter() < deadline):
+        if period:
+            due = start + count * period
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        else:
+            due = time.perf_counter()
+        frame = engine.classify(engine.detect(FrameResult(image, count, RGB)))
+        if render:
+            # Drawn on a copy, as the render stage draws on its own frame
+            frame.image = image.copy()
+            cv.imencode('.jpg', engine.render(frame))
+        latency.add(time.perf_counter() - due)
+        count += 1
+
+        for hand, (sign, gesture), age in zip(frame.hands, generator.truth, generator.ages):
+            signs[0] += engine.keypoint_classifier_labels[hand[3]] == sign
+            signs[1] += 1
+            if generator.hands == 1 and sign == 'Pointer' and age >= settle:
+                gestures[0] += engine.point_history_classifier_labels[hand[4]] == gesture
+                gestures[1] += 1
+    elapsed = time.perf_counter() - start
+
+    summary = latency.summary()
+    achieved = count / elapsed if elapsed > 0 else 0.0
+    return {
+        'frames': count,
+        'achieved': achieved,
+        'sustained': None if rate <= 0 else achieved >= 0.98 * rate,
+        'p50': summary['p50'],
+        'p99': summary['p99'],
+        'max': summary['max'],
+        'sign_accuracy': signs[0] / signs[1] if signs[1] else float('nan'),
+        'gesture_accuracy': gestures[0] / gestures[1] if gestures[1] else float('nan'),
+    }
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rates', type=float, nargs='+', default=[30, 100, 300, 1000, 0],
+                        help='frames per second to offer (0: as fast as possible)')
+    parser.add_argument('--seconds', type=float, default=5.0, help='duration per rate')
+    parser.add_argument('--hands', type=int, default=1)
+    parser.add_argument('--noise', type=float, default=0.01,
+                        help='landmark jitter as a fraction of the hand length')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--width', type=int, default=960)
+    parser.add_argument('--height', type=int, default=540)
+    parser.add_argument('--classifier-backend', default='tflite', choices=('tflite', 'fused'))
+    parser.add_argument('--point-history-model', default='window',
+                        choices=('window', 'streaming'))
+    parser.add_argument('--point-history-sign-id', type=int, default=2,
+                        help='hand sign whose fingertip is tracked (default: Pointer)')
+    parser.add_argument('--path-prefix', default='')
+    parser.add_argument('--tflite-threads', type=int, default=1)
+    parser.add_argument('--render', action='store_true',
+                        help='also draw and JPEG-encode every frame')
+    args = parser.parse_args(args)
+
+    engine = build_engine(args)
+    image = np.zeros((args.height, args.width, 3), dtype=np.uint8)
+    # Warm-up, also fills the histories
+    run_rate(engine, image, 0, 0.5)
+
+    print('%d hand(s), noise %.3f, %dx%d%s'
+          % (args.hands, args.noise, args.width, args.height, ', rendered' if args.render else ''))
+    print('%8s %9s %9s %8s %8s %8s %7s %7s'
+          % ('target', 'achieved', 'sustained', 'p50 ms', 'p99 ms', 'max ms', 'sign', 'finger'))
+    for rate in args.rates:
+        stats = run_rate(engine, image, rate, args.seconds, args.render)
+        print('%8s %9.1f %9s %8.2f %8.2f %8.2f %7s %7s'
+              % ('max' if rate <= 0 else '%g' % rate, stats['achieved'],
+                 {None: '-', True: 'yes', False: 'NO'}[stats['sustained']],
+                 stats['p50'], stats['p99'], stats['max'],
+                 _percent(stats['sign_accuracy']), _percent(stats['gesture_accuracy'])))
+
+
+def _percent(fraction):
+    return 'n/a' if np.isnan(fraction) else '%.1f%%' % (100 * fraction)
+
+
+if __name__ == '__main__':
+    main()
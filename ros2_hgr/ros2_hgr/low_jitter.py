@@ -0,0 +1,155 @@
+"""
+Opt-in low-jitter mode: garbage collection between frames and real-time scheduling.
+
+Every frame allocates (FrameResult copies, landmark lists, the finger
+gesture Counter), so CPython's cyclic collector runs at whatever point
+the allocation count happens to cross its threshold, in the middle of a
+detection or a classifier invoke. In low-jitter mode:
+
+- everything allocated during start-up (TensorFlow, MediaPipe, the
+  models) is moved out of the collector's reach with ``gc.freeze()``,
+  so a full collection only scans what was allocated since;
+- automatic collection is disabled and :meth:`LowJitter.between_frames`
+  runs it once a frame has been published: the youngest generation when
+  its count is over the threshold, the middle one every tenth time and
+  a full collection every ``full_period`` seconds;
+- the recognition threads ask for ``SCHED_FIFO`` at ``priority``, or,
+  where that is not permitted, for niceness ``nice``.
+
+:class:`GcMonitor` times every collection, with the mode on or off, so
+the two can be compared.
+"""
+import gc
+import os
+import threading
+import time
+
+from ros2_hgr.metrics import LatencyStats
+
+# Threads that carry a frame from the camera to /hgr_topic; rendering and
+# the debug image worker keep the default policy
+RECOGNITION_STAGES = ('executor', 'acquire', 'detect', 'classify', 'publish')
+
+
+class GcMonitor(object):
+    """Record the duration and generation of every garbage collection."""
+
+    def __init__(self):
+        self.pauses = LatencyStats()
+        self.collections = [0, 0, 0]
+        self._start = None
+
+    def install(self):
+        if self._callback not in gc.callbacks:
+            gc.callbacks.append(self._callback)
+
+    def remove(self):
+        if self._callback in gc.callbacks:
+            gc.callbacks.remove(self._callback)
+
+    def _callback(self, phase, info):
+        if phase == 'start':
+            self._start = time.perf_counter()
+        elif self._start is not None:
+            self.pauses.add(time.perf_counter() - self._start)
+            self.collections[info['generation']] += 1
+            self._start = None
+
+    def format(self):
+        return 'gen0/1/2=%d/%d/%d pauses %s' % (
+            self.collections[0], self.collections[1], self.collections[2],
+            self.pauses.format())
+
+
+class LowJitter(object):
+    """
+    GC deferral and thread scheduling of the low-jitter mode.
+
+    Does nothing unless ``enabled``. ``engage()`` freezes and disables the
+    collector, ``release()`` restores it; ``priority`` 0 skips
+    ``SCHED_FIFO`` and ``nice`` 0 skips the niceness fallback.
+    """
+
+    def __init__(self, enabled=False, gen0_threshold=700, full_period=10.0, priority=10,
+                 nice=-5, logger=None):
+        self.enabled = enabled
+        self.gen0_threshold = gen0_threshold
+        self.full_period = full_period
+        self.priority = priority
+        self.nice = nice
+        self.logger = logger
+
+        self.engaged = False
+        self.policies = {}
+        self._young_collections = 0
+        self._next_full = 0.0
+        self._lock = threading.Lock()
+
+    def engage(self):
+        """Freeze what start-up allocated and take over collection scheduling."""
+        if not self.enabled or self.engaged:
+            return
+        gc.collect()
+        gc.freeze()
+        gc.disable()
+        self._next_full = time.monotonic() + self.full_period
+        self.engaged = True
+
+    def release(self):
+        """Give collection back to the interpreter."""
+        if not self.engaged:
+            return
+        self.engaged = False
+        gc.enable()
+        gc.unfreeze()
+
+    def between_frames(self):
+        """Run the collection that is due, if any; called after a frame is published."""
+        if not self.engaged or not self._lock.acquire(blocking=False):
+            return
+        try:
+            generation = -1
+            if gc.get_count()[0] >= self.gen0_threshold:
+                self._young_collections += 1
+                generation = 1 if self._young_collections % 10 == 0 else 0
+            if self.full_period > 0 and time.monotonic() >= self._next_full:
+                self._next_full = time.monotonic() + self.full_period
+                generation = 2
+            if generation >= 0:
+                gc.collect(generation)
+        finally:
+            self._lock.release()
+
+    def apply_thread(self, stage):
+        """Give the calling thread the real-time policy if it runs a recognition stage."""
+        if not self.enabled or stage not in RECOGNITION_STAGES:
+            return None
+        policy = 'default'
+        if self.priority > 0 and hasattr(os, 'sched_setscheduler'):
+            try:
+                os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(self.priority))
+                policy = 'SCHED_FIFO %d' % self.priority
+            except OSError as e:
+                self._log('warning', '%s: SCHED_FIFO not permitted (%s)' % (stage, e.strerror))
+        if policy == 'default' and self.nice != 0 and hasattr(os, 'setpriority'):
+            try:
+                # On Linux the niceness of a thread id only applies to that thread
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), self.nice)
+                policy = 'nice %d' % self.nice
+            except OSError as e:
+                self._log('warning', '%s: nice %d not permitted (%s)'
+                          % (stage, self.nice, e.strerror))
+        self.policies[stage] = policy
+        return policy
+
+    def format(self):
+        if not self.enabled:
+            return 'off'
+        text = 'on' if self.engaged else 'released'
+        if self.policies:
+            text += ' (%s)' % ', '.join('%s: %s' % item for item in sorted(self.policies.items()))
+        return text
+
+    def _log(self, level, message):
+        if self.logger is not None:
+            getattr(self.logger, level)(message)
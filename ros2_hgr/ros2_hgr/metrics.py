@@ -0,0 +1,107 @@
+"""Lightweight latency/throughput bookkeeping for the HGR nodes and tools."""
+from collections import deque
+import time
+
+import cv2 as cv
+import numpy as np
+
+
+class LatencyStats(object):
+    """Rolling window of durations (seconds) with percentile summaries in ms."""
+
+    def __init__(self, window=1000):
+        self._samples = deque(maxlen=window)
+        self.count = 0
+
+    def add(self, seconds):
+        self._samples.append(seconds)
+        self.count += 1
+
+    def __len__(self):
+        return len(self._samples)
+
+    def percentile(self, q):
+        """Return the q-th percentile of the window in milliseconds."""
+        if not self._samples:
+            return 0.0
+        return float(np.percentile(np.fromiter(self._samples, dtype=np.float64), q)) * 1000.0
+
+    def summary(self):
+        """Return count, mean, p50, p90, p99 and max of the window in milliseconds."""
+        if not self._samples:
+            return {'count': self.count, 'mean': 0.0, 'p50': 0.0, 'p90': 0.0,
+                    'p99': 0.0, 'max': 0.0}
+        samples = np.fromiter(self._samples, dtype=np.float64) * 1000.0
+        p50, p90, p99 = np.percentile(samples, [50, 90, 99])
+        return {
+            'count': self.count,
+            'mean': float(samples.mean()),
+            'p50': float(p50),
+            'p90': float(p90),
+            'p99': float(p99),
+            'max': float(samples.max()),
+        }
+
+    def format(self):
+        s = self.summary()
+        return ('n=%d mean=%.2fms p50=%.2fms p90=%.2fms p99=%.2fms max=%.2fms'
+                % (s['count'], s['mean'], s['p50'], s['p90'], s['p99'], s['max']))
+
+    def jitter(self):
+        """Return count, mean, standard deviation, p99, p99.9 and max in milliseconds."""
+        if not self._samples:
+            return {'count': self.count, 'mean': 0.0, 'std': 0.0, 'p99': 0.0,
+                    'p99.9': 0.0, 'max': 0.0}
+        samples = np.fromiter(self._samples, dtype=np.float64) * 1000.0
+        p99, p999 = np.percentile(samples, [99, 99.9])
+        return {
+            'count': self.count,
+            'mean': float(samples.mean()),
+            'std': float(samples.std()),
+            'p99': float(p99),
+            'p99.9': float(p999),
+            'max': float(samples.max()),
+        }
+
+    def format_jitter(self):
+        s = self.jitter()
+        return ('n=%d mean=%.2fms std=%.2fms p99=%.2fms p99.9=%.2fms max=%.2fms'
+                % (s['count'], s['mean'], s['std'], s['p99'], s['p99.9'], s['max']))
+
+
+class RateCounter(object):
+    """Count events and report the average rate since the last reset."""
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self._since = self._clock()
+
+    def tick(self, n=1):
+        self.count += n
+
+    def rate(self):
+        elapsed = self._clock() - self._since
+        return self.count / elapsed if elapsed > 0 else 0.0
+
+
+class CvFpsCalc(object):
+    def __init__(self, buffer_len=1):
+        self._start_tick = cv.getTickCount()
+        self._freq = 1000.0 / cv.getTickFrequency()
+        self._difftimes = deque(maxlen=buffer_len)
+
+    def get(self):
+        current_tick = cv.getTickCount()
+        different_time = (current_tick - self._start_tick) * self._freq
+        self._start_tick = current_tick
+
+        self._difftimes.append(different_time)
+
+        fps = 1000.0 / (sum(self._difftimes) / len(self._difftimes))
+        fps_rounded = round(fps, 2)
+
+        return fps_rounded
@@ -0,0 +1,157 @@
+"""
+Hot-reload of the classifier models.
+
+A :class:`ModelReloader` loads a new model set on a background thread,
+warms it up and validates it, and only then hands it to the engine, which
+swaps it in between two frames. If loading or validation fails the running
+models stay in place, so the node keeps publishing throughout.
+"""
+import os
+import threading
+import time
+
+import numpy as np
+
+
+class ModelReloader(object):
+    """
+    Run ``load()`` -> ``validate(models)`` -> ``apply(models)`` off the main thread.
+
+    ``load`` returns a new model set (any object), ``validate`` raises
+    (e.g. ValueError) to reject it and ``apply`` hands it over. ``watch()``
+    polls the modification times of ``paths`` and reloads once a change has
+    been stable for one poll, so a model that is still being copied is not
+    picked up half-written.
+    """
+
+    def __init__(self, load, validate, apply, paths=(), logger=None):
+        self.load = load
+        self.validate = validate
+        self.apply = apply
+        self.paths = list(paths)
+        self.logger = logger
+
+        self._lock = threading.Lock()
+        self._thread = None
+        self._mtimes = self._stat()
+        self._changed = None
+
+        self.reloads = 0
+        self.failures = 0
+        self.last_error = None
+
+    def _stat(self):
+        mtimes = {}
+        for path in self.paths:
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                mtimes[path] = None
+        return mtimes
+
+    @property
+    def busy(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def watch(self):
+        """Poll the watched files; start a reload once a change has settled."""
+        mtimes = self._stat()
+        if mtimes == self._mtimes:
+            self._changed = None
+            return False
+        if mtimes != self._changed:
+            # Changed since the last poll: wait until it stops changing
+            self._changed = mtimes
+            return False
+        if self.start('changed on disk'):
+            self._mtimes = mtimes
+            self._changed = None
+            return True
+        return False
+
+    def start(self, reason='requested'):
+        """Start a reload in the background; False if one is already running."""
+        with self._lock:
+            if self.busy:
+                return False
+            self._thread = threading.Thread(target=self._run, args=(reason,),
+                                            name='hgr-model-reload', daemon=True)
+            self._thread.start()
+        return True
+
+    def _run(self, reason):
+        start = time.monotonic()
+        try:
+            models = self.load()
+            loaded = time.monotonic()
+            self.validate(models)
+        except Exception as e:
+            self.failures += 1
+            self.last_error = e
+            self._log('error', 'Model reload (%s) failed, keeping the current models: %r'
+                      % (reason, e))
+            return
+        self.apply(models)
+        self.reloads += 1
+        self.last_error = None
+        self._log('info', 'Models reloaded (%s): load %.0f ms, warm-up and validation %.0f ms'
+                  % (reason, (loaded - start) * 1000, (time.monotonic() - loaded) * 1000))
+
+    def join(self, timeout=None):
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _log(self, level, message):
+        if self.logger is not None:
+            getattr(self.logger, level)(message)
+
+
+def validate_models(models, history_length=16):
+    """
+    Warm up a model set with dummy inputs and check it against its labels.
+
+    ``models`` holds the engine's classifier and label keyword arguments.
+    Raises ValueError if an output does not match the label table or is
+    not finite, or if a streaming model would change the history length.
+    """
+    keypoint_labels = models['keypoint_classifier_labels']
+    point_history_labels = models['point_history_classifier_labels']
+
+    def check(name, scores, labels):
+        scores = np.asarray(scores)
+        if scores.shape != (len(labels),):
+            raise ValueError('%s returns %s scores for %d labels'
+                             % (name, scores.shape, len(labels)))
+        if not np.all(np.isfinite(scores)):
+            raise ValueError('%s returns non-finite scores' % name)
+
+    keypoint = models.get('keypoint_classifier')
+    if keypoint is not None:
+        features = np.linspace(-1.0, 1.0, 42)
+        check('Keypoint classifier', keypoint.scores(features), keypoint_labels)
+
+    point_history = models.get('point_history_classifier')
+    if point_history is not None:
+        if getattr(point_history, 'streaming', False):
+            if point_history.window != history_length:
+                raise ValueError('Streaming model window %d != history length %d'
+                                 % (point_history.window, history_length))
+            point_history(np.zeros(2, dtype=np.float32), point_history.empty_state)
+            scores = point_history.interpreter.get_tensor(point_history.scores_index)
+            check('Point history classifier', np.squeeze(scores), point_history_labels)
+        else:
+            check('Point history classifier', point_history.scores([0.0] * history_length * 2),
+                  point_history_labels)
+
+    fused = models.get('fused_classifier')
+    if fused is not None:
+        # Only the ids come out of the fused graph, so check they index the labels
+        landmarks = np.stack([np.arange(21) * 3.0, np.arange(21) * 2.0], axis=1)
+        hand_sign_id, finger_gesture_id, hand_sign_score, finger_gesture_score = fused(
+            landmarks, [[0, 0]] * history_length, (960, 540))
+        if not (0 <= hand_sign_id < len(keypoint_labels) and
+                0 <= finger_gesture_id < len(point_history_labels)):
+            raise ValueError('Fused classifier ids outside the label tables')
+        if not np.isfinite([hand_sign_score, finger_gesture_score]).all():
+            raise ValueError('Fused classifier returns non-finite scores')
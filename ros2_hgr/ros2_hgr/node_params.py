@@ -0,0 +1,69 @@
+"""Parameters shared by hgr_node and hgr_node_multi, declared with the same defaults."""
+import os
+
+from ros2_hgr.classifier_cache import CachedClassifier
+
+
+class HGRParameters(object):
+    """
+    Parameter helpers for the HGR nodes, mixed into an rclpy Node.
+
+    ``defaults`` maps parameter names to the defaults that replace those
+    given to param(), which is how the per-camera entry points configure
+    hgr_node. Set ``path_prefix`` before declare_model_params().
+    """
+
+    defaults = {}
+
+    def param(self, name, default):
+        """Declare parameter ``name`` and return its value."""
+        self.declare_parameter(name, self.defaults.get(name, default))
+        return self.get_parameter(name).value
+
+    def package_path(self, path):
+        """Return ``path`` relative to path_prefix, unless it is absolute."""
+        if os.path.isabs(path):
+            return path
+        return self.path_prefix + path
+
+    def declare_model_params(self):
+        """Declare the classifier, hand sign cache and hand detector parameters."""
+        # Hand sign whose index fingertip feeds the finger gesture classifier
+        # (-1 disables point history tracking)
+        self.point_history_sign_id = self.param('point_history_sign_id', -1)
+        # Finger gesture model: 'window' (re-classifies the whole history every
+        # frame) or 'streaming' (one timestep per frame, explicit state)
+        self.point_history_model = self.param('point_history_model', 'window')
+        # Classifier execution: 'tflite' (two interpreters, Python preprocessing)
+        # or 'fused' (preprocessing and both classifiers in one invoke)
+        self.classifier_backend = self.param('classifier_backend', 'tflite')
+        # Reuse the hand sign while the normalised landmarks move less than
+        # keypoint_cache_threshold ('linf' or 'l2' norm, 0 disables), plus an
+        # LRU of keypoint_cache_size results (0 disables) keyed on landmarks
+        # quantised to keypoint_cache_quantum (0 also disables the LRU). Off
+        # by default: a reused result can differ from classifying the frame
+        self.keypoint_cache_threshold = self.param('keypoint_cache_threshold', 0.0)
+        self.keypoint_cache_norm = self.param('keypoint_cache_norm', 'linf')
+        self.keypoint_cache_size = self.param('keypoint_cache_size', 0)
+        self.keypoint_cache_quantum = self.param('keypoint_cache_quantum', 0.05)
+
+        # Hand detector backend: 'legacy' (blocking mp.solutions.hands),
+        # 'tasks' (HandLandmarker in LIVE_STREAM mode, needs a .task model) or
+        # 'process' (mp.solutions.hands in a worker process, shared-memory frames)
+        # or 'synthetic' (generated moving hands, ignores the image; for load tests)
+        self.detector_backend = self.param('detector_backend', 'legacy')
+        self.hand_landmarker_model = self.package_path(self.param(
+            'hand_landmarker_model', 'model/hand_landmarker/hand_landmarker.task'))
+
+    def make_keypoint_cache(self, classifier):
+        """Return a CachedClassifier around ``classifier``, or None if the cache is off."""
+        if classifier is None or not (self.keypoint_cache_threshold > 0 or
+                                      self.keypoint_cache_size > 0):
+            return None
+        return CachedClassifier(
+            classifier,
+            threshold=self.keypoint_cache_threshold,
+            norm=self.keypoint_cache_norm,
+            cache_size=self.keypoint_cache_size,
+            quantum=self.keypoint_cache_quantum,
+        )
@@ -0,0 +1,185 @@
+"""
+Staged executor for the recognition loop.
+
+A :class:`Pipeline` is a linear chain of stages, each running on its own
+thread and connected by bounded :class:`DropOldestQueue` s. When a stage
+falls behind, its input queue discards the oldest item instead of blocking
+the stage before it, so latency stays bounded and throughput is set by the
+slowest stage instead of the sum of all stages.
+
+Stages that are limited by the GIL rather than by native code (OpenCV,
+TFLite and MediaPipe release it) can move their work to another process,
+e.g. the detect stage with the out-of-process detector backend.
+"""
+from collections import deque
+import threading
+import time
+
+from ros2_hgr.metrics import LatencyStats
+
+
+class DropOldestQueue(object):
+    """Bounded FIFO that evicts the oldest item when full."""
+
+    def __init__(self, maxsize=1, name=''):
+        self.maxsize = maxsize
+        self.name = name
+        self.put_count = 0
+        self.dropped = 0
+        self._items = deque()
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self.put_count += 1
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Return the oldest item, or None on timeout or once closed and empty."""
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout)
+            if self._items:
+                return self._items.popleft()
+            return None
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def depth(self):
+        with self._cond:
+            return len(self._items)
+
+
+class Stage(threading.Thread):
+    """
+    One pipeline stage.
+
+    A source stage (no ``inbox``) calls ``func()`` in a loop; other stages call
+    ``func(item)`` for every item from ``inbox``. Non-None return values are
+    forwarded to ``outbox``.
+    """
+
+    def __init__(self, name, func, inbox=None, outbox=None, on_start=None):
+        super().__init__(name='hgr-' + name, daemon=True)
+        self.stage_name = name
+        self.func = func
+        self.inbox = inbox
+        self.outbox = outbox
+        self.on_start = on_start
+        self.latency = LatencyStats()
+        self.processed = 0
+        self.errors = 0
+        self.last_error = None
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        if self.on_start is not None:
+            self.on_start(self.stage_name)
+        while not self._stop_event.is_set():
+            if self.inbox is None:
+                args = ()
+            else:
+                item = self.inbox.get(timeout=0.1)
+                if item is None:
+                    continue
+                args = (item,)
+            start = time.perf_counter()
+            try:
+                out = self.func(*args)
+            except Exception as e:  # keep the stage alive, surface through metrics
+                self.errors += 1
+                self.last_error = repr(e)
+                continue
+            self.latency.add(time.perf_counter() - start)
+            if out is None:
+                continue
+            self.processed += 1
+            if self.outbox is not None:
+                self.outbox.put(out)
+
+
+class Pipeline(object):
+    """
+    Linear chain of :class:`Stage` threads.
+
+    The first stage added is the source; every following stage gets its own
+    input queue of ``queue_size`` items fed by the stage before it.
+    ``on_start(stage_name)`` runs at the start of each stage thread and can be
+    used to pin threads or set their scheduling policy.
+    """
+
+    def __init__(self, on_start=None):
+        self.on_start = on_start
+        self.stages = []
+        self.queues = []
+
+    def add_stage(self, name, func, queue_size=1):
+        inbox = None
+        if self.stages:
+            inbox = DropOldestQueue(queue_size, name=name)
+            self.queues.append(inbox)
+            self.stages[-1].outbox = inbox
+        self.stages.append(Stage(name, func, inbox=inbox, on_start=self.on_start))
+        return self
+
+    def put(self, name, item):
+        """Feed ``item`` to the input queue of stage ``name``, e.g. from a callback."""
+        for stage in self.stages:
+            if stage.stage_name == name and stage.inbox is not None:
+                stage.inbox.put(item)
+                return
+        raise KeyError('No stage %r with an input queue' % name)
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+
+    def stop(self, timeout=1.0):
+        for stage in self.stages:
+            stage.stop()
+        for queue in self.queues:
+            queue.close()
+        for stage in self.stages:
+            if stage.is_alive():
+                stage.join(timeout)
+
+    def metrics(self):
+        """Return per-queue depth/drop counts and per-stage throughput/latency."""
+        return {
+            'queues': {
+                q.name: {'depth': q.depth, 'maxsize': q.maxsize,
+                         'put': q.put_count, 'dropped': q.dropped}
+                for q in self.queues
+            },
+            'stages': {
+                s.stage_name: {'processed': s.processed, 'errors': s.errors,
+                               'last_error': s.last_error,
+                               'latency': s.latency.summary()}
+                for s in self.stages
+            },
+        }
+
+    def format_metrics(self):
+        parts = []
+        for s in self.stages:
+            lat = s.latency.summary()
+            part = '%s: n=%d p50=%.1fms p99=%.1fms' % (
+                s.stage_name, s.processed, lat['p50'], lat['p99'])
+            if s.inbox is not None:
+                part += ' q=%d/%d drop=%d' % (s.inbox.depth, s.inbox.maxsize, s.inbox.dropped)
+            if s.errors:
+                part += ' err=%d (%s)' % (s.errors, s.last_error)
+            parts.append(part)
+        return ' | '.join(parts)
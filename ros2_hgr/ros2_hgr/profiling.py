@@ -0,0 +1,190 @@
+"""
+On-demand profiling of the frame callbacks.
+
+A :class:`CallbackProfiler` session replaces callbacks (attributes such as
+a timer's ``callback`` or a pipeline stage's ``func``) with wrappers that
+run them under cProfile, one profile per thread, until ``frames`` frames
+were published or ``duration`` seconds passed. The originals are put back
+when the session ends, so nothing is measured, or checked, while no
+session runs. The profiles are merged into one ``.pstats`` file.
+
+With ``py-spy`` installed, :func:`py_spy_record` samples every thread of
+the process instead and writes collapsed stacks (``flamegraph.pl`` or
+speedscope input). py-spy needs ptrace permission on the process.
+"""
+import cProfile
+from collections import Counter
+import functools
+import math
+import os
+import pstats
+import shutil
+import subprocess
+import threading
+import time
+
+
+class CallbackProfiler(object):
+    """cProfile session over patched callbacks; stops after ``frames`` frames or ``duration`` s."""
+
+    def __init__(self, frames=0, duration=0.0):
+        if frames <= 0 and duration <= 0:
+            raise ValueError('Profile a number of frames or seconds')
+        self.frames = frames
+        self.duration = duration
+        self.profiled = 0           # calls run under the profiler
+        self.skipped = 0            # calls another profiler was active for
+        self.published = 0
+        self.done = threading.Event()
+
+        self._profiles = {}
+        self._active = 0
+        self._lock = threading.Lock()
+        self._patched = []
+        self._start = time.perf_counter()
+        self._deadline = self._start + duration if duration > 0 else None
+
+    def patch(self, owner, name, profile=True, count=False):
+        """
+        Wrap ``owner.name`` until restore().
+
+        ``profile`` runs it under the profiler, ``count`` counts every call
+        as a published frame.
+        """
+        original = getattr(owner, name)
+        wrapper = original
+        if count:
+            wrapper = self._counted(wrapper)
+        if profile:
+            wrapper = self._profiled(wrapper)
+        self._patched.append((owner, name, name in vars(owner), original))
+        setattr(owner, name, wrapper)
+
+    def restore(self):
+        """Put the original callbacks back."""
+        for owner, name, own, original in reversed(self._patched):
+            if own:
+                setattr(owner, name, original)
+            else:
+                delattr(owner, name)
+        self._patched = []
+
+    def wait(self, timeout=None):
+        """Block until the session is over, at most ``timeout`` seconds, then end it."""
+        if self._deadline is not None:
+            remaining = max(self._deadline - time.perf_counter(), 0.0)
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        self.done.wait(timeout)
+        self.done.set()
+
+    def _profiled(self, func):
+        @functools.wraps(func)
+        def profiled(*args, **kwargs):
+            if self.done.is_set():
+                return func(*args, **kwargs)
+            profile = self._thread_profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Python 3.12+ allows one active profiler per interpreter
+                self.skipped += 1
+                return func(*args, **kwargs)
+            with self._lock:
+                self._active += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.disable()
+                with self._lock:
+                    self._active -= 1
+                    self.profiled += 1
+        return profiled
+
+    def _counted(self, func):
+        @functools.wraps(func)
+        def counted(*args, **kwargs):
+            result = func(*args, **kwargs)
+            with self._lock:
+                self.published += 1
+            if ((self.frames > 0 and self.published >= self.frames) or
+                    (self._deadline is not None and time.perf_counter() >= self._deadline)):
+                self.done.set()
+            return result
+        return counted
+
+    def _thread_profile(self):
+        ident = threading.get_ident()
+        profile = self._profiles.get(ident)
+        if profile is None:
+            profile = self._profiles[ident] = cProfile.Profile()
+        return profile
+
+    def stats(self, timeout=1.0):
+        """Return the merged pstats.Stats once running calls have left, or None without data."""
+        deadline = time.monotonic() + timeout
+        while self._active and time.monotonic() < deadline:
+            time.sleep(0.001)
+        stats = None
+        for profile in self._profiles.values():
+            try:
+                if stats is None:
+                    stats = pstats.Stats(profile)
+                else:
+                    stats.add(profile)
+            except TypeError:
+                # A profile that never recorded a call
+                continue
+        return stats
+
+    def format(self):
+        text = '%d frames, %d profiled calls in %.1f s' % (
+            self.published, self.profiled, time.perf_counter() - self._start)
+        if self.skipped:
+            text += ', %d calls skipped (another profiler was active)' % self.skipped
+        return text
+
+
+def top_pstats(stats, top=20, sort='cumulative'):
+    """Return the ``top`` functions of ``stats`` as one line each."""
+    stats.sort_stats(sort)
+    entries = []
+    for function in stats.fcn_list[:top]:
+        primitive_calls, calls, self_time, cumulative, _ = stats.stats[function]
+        filename, line, name = function
+        entries.append('%9.2f ms cum %9.2f ms self %8d calls  %s:%d(%s)' % (
+            cumulative * 1000, self_time * 1000, calls, os.path.basename(filename), line, name))
+    return entries
+
+
+def py_spy_record(path, duration, rate=100, pid=None):
+    """
+    Sample process ``pid`` (default: this one) for ``duration`` seconds with py-spy.
+
+    Writes collapsed stacks to ``path``. Raises RuntimeError if py-spy is
+    not installed or fails, e.g. without ptrace permission.
+    """
+    executable = shutil.which('py-spy')
+    if executable is None:
+        raise RuntimeError('py-spy is not installed (pip install py-spy)')
+    command = [executable, 'record', '--pid', str(pid or os.getpid()),
+               '--duration', str(max(1, int(math.ceil(duration)))), '--rate', str(rate),
+               '--format', 'raw', '--output', path, '--nonblocking']
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            timeout=duration + 30)
+    if result.returncode != 0:
+        raise RuntimeError('py-spy failed: %s' % result.stdout.decode(errors='replace').strip())
+
+
+def top_collapsed(path, top=20):
+    """Return the ``top`` leaf frames of a collapsed-stack file by share of samples."""
+    leaves = Counter()
+    total = 0
+    with open(path) as f:
+        for line in f:
+            stack, _, count = line.rstrip('\n').rpartition(' ')
+            if not stack or not count.isdigit():
+                continue
+            leaves[stack.rpartition(';')[2]] += int(count)
+            total += int(count)
+    return ['%5.1f%% self  %s' % (100.0 * count / total, frame)
+            for frame, count in leaves.most_common(top)]
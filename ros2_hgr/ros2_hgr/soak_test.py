@@ -0,0 +1,338 @@
+"""
+Soak test: run the pipeline for hours and check memory and latency for drift.
+
+Frames from a recording (``--input``, looped) or from synthetic hands
+(``--input synthetic``) go through the acquire -> detect -> classify
+(-> render) -> publish stages of the pipelined node for ``--duration``
+seconds. Every ``--interval`` seconds a :class:`SoakMonitor` samples the
+RSS, the number of memory blocks allocated by the interpreter, the memory
+traced by tracemalloc, and the frame latency percentiles and publish rate
+of the interval. The samples are written as CSV to ``--report``. A text
+summary goes next to it, with the allocators and the object types that
+grew most between start and end. Trends are straight-line fits over the samples after ``--settle``
+seconds. The run fails (exit status 1) if the RSS grows by more than
+``--max-memory-growth`` MB or the p99 latency by more than
+``--max-p99-growth`` percent over the fitted span.
+
+    ros2 run ros2_hgr hgr_soak_test --input synthetic --duration 7200 --interval 30 \\
+        --report soak.csv
+"""
+import argparse
+from collections import Counter
+import csv
+import gc
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+
+import cv2 as cv
+import numpy as np
+
+from ros2_hgr.classifiers import make_classifiers
+from ros2_hgr.classifiers import read_labels
+from ros2_hgr.detector_bench import load_frames
+from ros2_hgr.detectors import BACKENDS
+from ros2_hgr.detectors import make_detector
+from ros2_hgr.detectors import warm_up
+from ros2_hgr.engine import FrameResult
+from ros2_hgr.engine import RecognitionEngine
+from ros2_hgr.frame_sources import RGB
+from ros2_hgr.metrics import LatencyStats
+from ros2_hgr.pipeline import Pipeline
+
+COLUMNS = ('elapsed_s', 'frames', 'rate_hz', 'p50_ms', 'p99_ms', 'max_ms', 'rss_mb',
+           'traced_mb', 'blocks')
+
+
+def rss_bytes():
+    """Return the resident set size of the process (the peak where /proc is missing)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def object_counts():
+    """
+    Return the number of objects tracked by the garbage collector, per type name.
+
+    Only call this while no TFLite interpreter is invoked: the list of all
+    objects holds references to their output arrays, which makes invoke() fail.
+    """
+    return Counter(type(obj).__name__ for obj in gc.get_objects())
+
+
+def trend(times, values):
+    """Return the fitted first value and the fitted growth over the span of a series."""
+    if len(times) < 3:
+        return (values[0] if values else 0.0), 0.0
+    slope, intercept = np.polyfit(times, values, 1)
+    return float(intercept + slope * times[0]), float(slope * (times[-1] - times[0]))
+
+
+class SoakMonitor(object):
+    """
+    Periodic samples of memory use, object counts and frame latency.
+
+    Call start() before and finish() after the pipeline runs, frame() for
+    every published frame (from any thread) and sample() every interval.
+    ``trace`` starts tracemalloc with ``trace_frames`` frames per traceback;
+    the allocators that grew most since start() are kept in ``allocators``,
+    the object types that grew most in ``object_growth``.
+    """
+
+    def __init__(self, trace=True, trace_frames=1, top=10):
+        self.trace = trace
+        self.trace_frames = trace_frames
+        self.top = top
+        self.samples = []
+        self.allocators = []
+        self.object_growth = []
+
+        self._latency = LatencyStats(window=1000000)
+        self._frames = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        if self.trace:
+            tracemalloc.start(self.trace_frames)
+        self._objects = object_counts()
+        self._snapshot = self._take_snapshot()
+        self._start = self._last = time.perf_counter()
+        self._last_frames = 0
+
+    def finish(self):
+        """Count the objects per type, once the pipeline has stopped, and stop tracing."""
+        self.object_growth = (object_counts() - self._objects).most_common(self.top)
+        if self.trace:
+            tracemalloc.stop()
+
+    def frame(self, seconds):
+        """Record a published frame that took ``seconds`` from acquisition."""
+        with self._lock:
+            self._latency.add(seconds)
+            self._frames += 1
+
+    def sample(self):
+        """Take a sample of the interval since the last one and return it."""
+        now = time.perf_counter()
+        with self._lock:
+            latency, self._latency = self._latency, LatencyStats(window=1000000)
+            frames = self._frames
+        summary = latency.summary()
+        row = {
+            'elapsed_s': now - self._start,
+            'frames': frames,
+            'rate_hz': (frames - self._last_frames) / (now - self._last),
+            'p50_ms': summary['p50'],
+            'p99_ms': summary['p99'],
+            'max_ms': summary['max'],
+            'rss_mb': rss_bytes() / 1e6,
+            'traced_mb': tracemalloc.get_traced_memory()[0] / 1e6 if self.trace else 0.0,
+            'blocks': sys.getallocatedblocks(),
+        }
+        self._last, self._last_frames = now, frames
+
+        if self.trace:
+            snapshot = self._take_snapshot()
+            self.allocators = snapshot.compare_to(self._snapshot, 'lineno')[:self.top]
+        self.samples.append(row)
+        return row
+
+    def _take_snapshot(self):
+        if not self.trace:
+            return None
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)])
+
+    def check(self, settle=0.0, max_memory_growth=20.0, max_p99_growth=25.0):
+        """
+        Fit the samples after ``settle`` seconds and return (trends, failures).
+
+        Memory growth is in MB of RSS, p99 growth in percent of its fitted
+        first value.
+        """
+        samples = [row for row in self.samples if row['elapsed_s'] >= settle]
+        times = [row['elapsed_s'] for row in samples]
+        trends = {name: trend(times, [row[name] for row in samples])
+                  for name in ('rss_mb', 'traced_mb', 'blocks', 'p99_ms', 'rate_hz')}
+        failures = []
+        if len(samples) < 3:
+            failures.append('only %d samples after %.0f s, too few to fit a trend'
+                            % (len(samples), settle))
+            return trends, failures
+        rss_growth = trends['rss_mb'][1]
+        if rss_growth > max_memory_growth:
+            failures.append('RSS grew by %.1f MB (limit %.1f MB)'
+                            % (rss_growth, max_memory_growth))
+        p99_start, p99_growth = trends['p99_ms']
+        if p99_start > 0 and 100 * p99_growth / p99_start > max_p99_growth:
+            failures.append('p99 latency grew by %.1f%% (%.2f -> %.2f ms, limit %.1f%%)'
+                            % (100 * p99_growth / p99_start, p99_start,
+                               p99_start + p99_growth, max_p99_growth))
+        return trends, failures
+
+    def write_csv(self, path):
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, COLUMNS)
+            writer.writeheader()
+            for row in self.samples:
+                writer.writerow({name: value if isinstance(value, int) else '%.6g' % value
+                                 for name, value in row.items()})
+
+    def format_report(self, trends, failures):
+        lines = ['Trends after settling (fitted start -> end):']
+        for name, (start, growth) in trends.items():
+            lines.append('  %-10s %12.2f -> %12.2f  (%+.2f)'
+                         % (name, start, start + growth, growth))
+        if self.allocators:
+            lines.append('Top allocators by growth:')
+            lines.extend('  %s' % stat for stat in self.allocators)
+        if self.object_growth:
+            lines.append('Object types by growth:')
+            lines.extend('  %-30s %+d' % item for item in self.object_growth)
+        lines.append('FAILED: ' + '; '.join(failures) if failures else 'PASSED')
+        return '\n'.join(lines)
+
+
+def build_engine(args):
+    if args.input == 'synthetic':
+        detector = make_detector('synthetic', max_num_hands=args.hands)
+    else:
+        detector = make_detector(args.backend, model_path=args.model, max_num_hands=args.hands)
+    warm_up(detector, args.width, args.height)
+    models = make_classifiers(args.classifier_backend, args.point_history_model,
+                              args.path_prefix)
+    return RecognitionEngine(
+        detector,
+        keypoint_classifier_labels=read_labels(
+            args.path_prefix + 'model/keypoint_classifier/keypoint_classifier_label.csv'),
+        point_history_classifier_labels=read_labels(
+            args.path_prefix +
+            'model/point_history_classifier/point_history_classifier_label.csv'),
+        point_history_sign_id=args.point_history_sign_id,
+        path_prefix=args.path_prefix,
+        **models,
+    )
+
+
+def build_pipeline(engine, frames, monitor, args):
+    """Return the node's pipeline stages over ``frames``, offered at ``args.rate``."""
+    period = 1.0 / args.rate if args.rate > 0 else 0.0
+    state = {'index': 0, 'next': time.perf_counter()}
+
+    def acquire():
+        if period:
+            delay = state['next'] - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            state['next'] = max(state['next'] + period, time.perf_counter() - period)
+        else:
+            while pipeline.queues[0].depth > 0:
+                time.sleep(0.0005)
+        image = frames[state['index'] % len(frames)]
+        state['index'] += 1
+        return FrameResult(image.copy(), int(time.monotonic() * 1000), RGB)
+
+    def render(frame):
+        cv.imencode('.jpg', engine.render(frame))
+        return frame
+
+    def publish(frame):
+        monitor.frame(time.perf_counter() - frame.created)
+        return frame
+
+    pipeline = Pipeline()
+    pipeline.add_stage('acquire', acquire)
+    pipeline.add_stage('detect', engine.detect, args.queue_size)
+    pipeline.add_stage('classify', engine.classify, args.queue_size)
+    if args.render:
+        pipeline.add_stage('render', render, args.queue_size)
+    pipeline.add_stage('publish', publish, args.queue_size)
+    return pipeline
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--input', default='synthetic',
+                        help="'synthetic', camera index, video file or image (default: synthetic)")
+    parser.add_argument('--frames', type=int, default=300,
+                        help='frames of --input to load and loop')
+    parser.add_argument('--duration', type=float, default=600.0, help='seconds to run')
+    parser.add_argument('--interval', type=float, default=10.0, help='seconds between samples')
+    parser.add_argument('--settle', type=float, default=60.0,
+                        help='seconds of start-up left out of the trends')
+    parser.add_argument('--rate', type=float, default=30.0,
+                        help='frames offered per second (0: as soon as detect is free)')
+    parser.add_argument('--report', default='soak.csv', help='CSV file of the samples')
+    parser.add_argument('--max-memory-growth', type=float, default=20.0,
+                        help='MB of RSS growth that fails the run')
+    parser.add_argument('--max-p99-growth', type=float, default=25.0,
+                        help='percent of p99 latency growth that fails the run')
+    parser.add_argument('--no-tracemalloc', dest='tracemalloc', action='store_false',
+                        help='do not trace allocations (they slow every allocation down)')
+    parser.add_argument('--top', type=int, default=10,
+                        help='allocators and object types listed in the summary')
+    parser.add_argument('--width', type=int, default=960)
+    parser.add_argument('--height', type=int, default=540)
+    parser.add_argument('--hands', type=int, default=1)
+    parser.add_argument('--backend', default='legacy', choices=BACKENDS)
+    parser.add_argument('--model', default='model/hand_landmarker/hand_landmarker.task',
+                        help='HandLandmarker .task file for the tasks backend')
+    parser.add_argument('--classifier-backend', default='tflite', choices=('tflite', 'fused'))
+    parser.add_argument('--point-history-model', default='window',
+                        choices=('window', 'streaming'))
+    parser.add_argument('--point-history-sign-id', type=int, default=2)
+    parser.add_argument('--path-prefix', default='')
+    parser.add_argument('--queue-size', type=int, default=1)
+    parser.add_argument('--render', action='store_true',
+                        help='also draw and JPEG-encode every frame')
+    args = parser.parse_args(args)
+
+    if args.input == 'synthetic':
+        frames = [np.zeros((args.height, args.width, 3), dtype=np.uint8)]
+    else:
+        frames = load_frames(args.input, args.frames, args.width, args.height)
+    engine = build_engine(args)
+    monitor = SoakMonitor(trace=args.tracemalloc, top=args.top)
+    pipeline = build_pipeline(engine, frames, monitor, args)
+
+    print('%s for %.0f s at %s, sampling every %.0f s'
+          % (args.input, args.duration, '%g fps' % args.rate if args.rate > 0 else 'max rate',
+             args.interval))
+    print('%9s %9s %8s %8s %8s %8s %9s %9s %9s' % COLUMNS)
+    monitor.start()
+    pipeline.start()
+    start = time.perf_counter()
+    try:
+        for index in range(1, int(args.duration / args.interval) + 1):
+            time.sleep(max(0.0, start + index * args.interval - time.perf_counter()))
+            row = monitor.sample()
+            print('%9.0f %9d %8.1f %8.2f %8.2f %8.2f %9.1f %9.1f %9d'
+                  % tuple(row[name] for name in COLUMNS))
+    except KeyboardInterrupt:
+        print('Interrupted, reporting the samples so far')
+    finally:
+        pipeline.stop()
+        engine.detector.close()
+    monitor.finish()
+
+    trends, failures = monitor.check(args.settle, args.max_memory_growth, args.max_p99_growth)
+    report = monitor.format_report(trends, failures)
+    print(pipeline.format_metrics())
+    print(report)
+    monitor.write_csv(args.report)
+    summary_path = os.path.splitext(args.report)[0] + '.txt'
+    with open(summary_path, 'w') as f:
+        f.write(report + '\n')
+    print('Wrote %s and %s' % (args.report, summary_path))
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
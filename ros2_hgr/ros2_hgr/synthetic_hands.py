@@ -0,0 +1,211 @@
+"""
+Synthetic hand landmark streams for load-testing everything after the detector.
+
+A :class:`SyntheticHands` generator poses a simple kinematic hand model
+(palm facing the camera, each finger flexing towards it) for every hand
+sign of keypoint_classifier_label.csv, and moves it along the finger
+gesture trajectories of point_history_classifier_label.csv: a Pointer
+hand circles clockwise or counter-clockwise, moves back and forth or
+holds still. Gestures change every ``hold`` seconds of stream time, which
+advances ``1 / frame_rate`` per frame however fast frames are requested,
+so a 2 kHz load test sees the same motion per frame as a 30 fps camera.
+
+:class:`SyntheticHandsDetector` (``detector_backend:=synthetic``) returns
+the generated hands in the format of ``mp.solutions.hands``, so the rest
+of the node runs unchanged without a camera or MediaPipe.
+"""
+from collections import namedtuple
+import time
+
+import numpy as np
+
+from ros2_hgr.detectors import make_hand_results
+from ros2_hgr.metrics import LatencyStats
+
+# Hand sign pose: flexion of index, middle, ring and little finger (0 straight,
+# 1 curled), thumb flexion and adduction, finger spread and roll (radians)
+HandPose = namedtuple('HandPose', ['flexion', 'thumb', 'spread', 'roll'])
+
+HAND_SIGNS = {
+    'Open': HandPose((0.0, 0.0, 0.0, 0.0), (0.0, 0.0), 0.3, 0.0),
+    'Close': HandPose((1.0, 1.0, 1.0, 1.0), (0.8, 1.0), 0.0, 0.0),
+    'Pointer': HandPose((0.0, 1.0, 1.0, 1.0), (0.8, 1.0), 0.0, 0.0),
+    'OK': HandPose((0.7, 0.4, 0.2, 0.4), (0.55, 1.05), 0.4, -0.9),
+    'Peace': HandPose((0.0, 0.0, 1.0, 1.0), (0.8, 1.0), 0.6, 0.0),
+    'Thumbs Up': HandPose((1.0, 1.0, 1.0, 1.0), (0.0, 0.0), 0.0, 1.2),
+    'Thumbs Down': HandPose((1.0, 1.0, 1.0, 1.0), (0.0, 0.0), 0.0, 0.8 + np.pi),
+    'Quiet Coyote': HandPose((0.0, 1.0, 1.0, 0.0), (0.6, 0.8), 0.2, 0.0),
+}
+
+FINGER_GESTURES = ('Stop', 'Clockwise', 'Counter Clockwise', 'Move')
+
+# Right hand model in units of about half a hand length: wrist at the
+# origin, x to the little finger, y up the image (negative), z away from
+# the camera
+_MCP = ((-0.32, -0.95), (-0.08, -1.0), (0.15, -0.93), (0.36, -0.8))
+_BONES = ((0.38, 0.23, 0.19), (0.42, 0.26, 0.2), (0.39, 0.25, 0.2), (0.3, 0.19, 0.17))
+_JOINT_FLEXION = (1.4, 1.7, 1.2)
+_THUMB_CMC = (-0.25, -0.15)
+_THUMB_BONES = (0.32, 0.27, 0.24)
+_THUMB_FLEXION = (0.0, 0.7, 0.9)
+HAND_LENGTH = 1.9
+
+
+def _rotate(v, axis, angle):
+    """Rotate vector ``v`` by ``angle`` about ``axis`` (Rodrigues)."""
+    axis = axis / np.linalg.norm(axis)
+    return (v * np.cos(angle) + np.cross(axis, v) * np.sin(angle) +
+            axis * np.dot(axis, v) * (1.0 - np.cos(angle)))
+
+
+def hand_pose(pose):
+    """Return the (21, 3) landmarks of a right hand in ``pose``, wrist at the origin."""
+    points = np.zeros((21, 3))
+    z_axis = np.array([0.0, 0.0, 1.0])
+
+    # Thumb: adduction swings it over the palm, flexion curls it
+    thumb_flexion, adduction = pose.thumb
+    direction = np.array([-0.55, -0.6, 0.0]) / np.hypot(0.55, 0.6)
+    direction = _rotate(direction, z_axis, adduction * 1.1)
+    direction = _rotate(direction, np.array([direction[1], -direction[0], 0.0]),
+                        -adduction * 0.5)
+    point = np.array(_THUMB_CMC + (0.0,))
+    points[1] = point
+    for joint, (length, flexion) in enumerate(zip(_THUMB_BONES, _THUMB_FLEXION)):
+        axis = np.array([direction[1], -direction[0], 0.0])
+        direction = _rotate(direction, axis, -thumb_flexion * flexion)
+        point = point + length * direction
+        points[2 + joint] = point
+
+    # Fingers: spread fans them out, flexion bends every joint towards the camera
+    for finger, (mcp, bones, flexion) in enumerate(zip(_MCP, _BONES, pose.flexion)):
+        point = np.array(mcp + (0.0,))
+        points[5 + 4 * finger] = point
+        direction = point.copy()
+        direction[0] += (finger - 1.5) * pose.spread * 0.3
+        direction /= np.linalg.norm(direction)
+        axis = np.array([-direction[1], direction[0], 0.0])
+        for joint, (length, joint_flexion) in enumerate(zip(bones, _JOINT_FLEXION)):
+            direction = _rotate(direction, axis, flexion * joint_flexion)
+            point = point + length * direction
+            points[6 + 4 * finger + joint] = point
+
+    c, s = np.cos(pose.roll), np.sin(pose.roll)
+    points[:, :2] = points[:, :2] @ np.array([[c, s], [-s, c]])
+    return points
+
+
+class SyntheticHands(object):
+    """
+    Generator of ``hands`` moving hands, one frame per step() call.
+
+    ``hand_signs`` and ``finger_gestures`` restrict the gestures drawn at
+    random (default: all). Finger gestures only move Pointer hands, the
+    only sign the point history is tracked for; other signs drift slowly.
+    ``noise`` is the landmark jitter as a fraction of the hand length and
+    ``hand_size`` the hand length as a fraction of the image height.
+    ``truth`` holds the (hand sign, finger gesture) name of every hand of
+    the last frame and ``ages`` the number of frames each has been held.
+    """
+
+    def __init__(self, hands=1, noise=0.01, hand_signs=None, finger_gestures=None,
+                 hold=2.0, frame_rate=30.0, hand_size=0.35, seed=0):
+        self.hands = hands
+        self.noise = noise
+        self.hand_signs = list(hand_signs or HAND_SIGNS)
+        self.finger_gestures = list(finger_gestures or FINGER_GESTURES)
+        for name in self.hand_signs:
+            if name not in HAND_SIGNS:
+                raise ValueError('Unknown hand sign %r, expected one of %s'
+                                 % (name, ', '.join(HAND_SIGNS)))
+        for name in self.finger_gestures:
+            if name not in FINGER_GESTURES:
+                raise ValueError('Unknown finger gesture %r, expected one of %s'
+                                 % (name, ', '.join(FINGER_GESTURES)))
+        self.hold = hold
+        self.frame_rate = frame_rate
+        self.hand_size = hand_size
+        self.frames = 0
+        self.truth = []
+        self.ages = []
+
+        self._rng = np.random.default_rng(seed)
+        # Centred on the middle of their bounding box, so that every sign stays in view
+        self._poses = {}
+        for name, pose in HAND_SIGNS.items():
+            points = hand_pose(pose)
+            points[:, :2] -= (points[:, :2].min(axis=0) + points[:, :2].max(axis=0)) / 2
+            self._poses[name] = points
+        self._segments = [None] * hands
+
+    def _new_segment(self, hand, t):
+        sign = self._rng.choice(self.hand_signs)
+        gesture = 'Stop'
+        if sign == 'Pointer':
+            gesture = self._rng.choice(self.finger_gestures)
+        phase = self._rng.uniform(0, 2 * np.pi)
+        self._segments[hand] = (t + self.hold, str(sign), str(gesture), phase, self.frames)
+
+    def _offset(self, gesture, t, phase):
+        """Hand displacement in hand units at stream time ``t``."""
+        if gesture in ('Clockwise', 'Counter Clockwise'):
+            # Image y points down, so an increasing angle turns clockwise
+            angle = phase + (1 if gesture == 'Clockwise' else -1) * 2 * np.pi * t / 0.8
+            return 0.6 * np.array([np.cos(angle), np.sin(angle)])
+        if gesture == 'Move':
+            return np.array([1.2 * np.sin(2 * np.pi * t / 2.0 + phase), 0.0])
+        # Held still, up to a slow sway
+        return 0.05 * np.array([np.sin(t * 1.3 + phase), np.cos(t * 0.9 + phase)])
+
+    def step(self, width, height):
+        """Advance one frame; return the landmarks normalised to a ``width`` x ``height`` image."""
+        t = self.frames / self.frame_rate
+        self.frames += 1
+        unit = self.hand_size * height / HAND_LENGTH
+        landmarks = []
+        labels = []
+        self.truth = []
+        self.ages = []
+        for hand in range(self.hands):
+            if self._segments[hand] is None or t >= self._segments[hand][0]:
+                self._new_segment(hand, t)
+            _, sign, gesture, phase, first = self._segments[hand]
+
+            points = self._poses[sign] + self._rng.normal(0.0, self.noise * HAND_LENGTH, (21, 3))
+            offset = self._offset(gesture, t, phase)
+            right = hand % 2 == 0
+            if not right:
+                # A left hand is the mirror image of the right one
+                points = points * np.array([-1.0, 1.0, 1.0])
+                offset = offset * np.array([-1.0, 1.0])
+            centre = np.array([(hand + 0.5) / self.hands * width, 0.5 * height])
+            pixels = (points[:, :2] + offset) * unit + centre
+            normalised = np.empty((21, 3))
+            normalised[:, 0] = pixels[:, 0] / width
+            normalised[:, 1] = pixels[:, 1] / height
+            normalised[:, 2] = points[:, 2] * unit / width
+            landmarks.append(normalised)
+            labels.append('Right' if right else 'Left')
+            self.truth.append((sign, gesture))
+            self.ages.append(self.frames - first)
+        return landmarks, labels
+
+
+class SyntheticHandsDetector(object):
+    """Detector backend that returns SyntheticHands instead of looking at the image."""
+
+    asynchronous = False
+
+    def __init__(self, max_num_hands=1, noise=0.01, seed=0, **options):
+        self.generator = SyntheticHands(hands=max_num_hands, noise=noise, seed=seed, **options)
+        self.latency = LatencyStats()
+
+    def process(self, image, timestamp_ms=None):
+        start = time.perf_counter()
+        landmarks, labels = self.generator.step(image.shape[1], image.shape[0])
+        results = make_hand_results(landmarks, labels)
+        self.latency.add(time.perf_counter() - start)
+        return results
+
+    def close(self):
+        pass
@@ -0,0 +1,143 @@
+"""
+Thread counts and CPU affinity of the compute stages.
+
+TFLite, OpenCV and MediaPipe each size their own thread pools, and by
+default they all spread over every core. A :class:`ThreadBudget` sets them
+from one place:
+
+- ``tflite_threads``: threads per TFLite interpreter (XNNPACK included)
+- ``opencv_threads``: ``cv.setNumThreads`` for the whole process
+  (negative: OpenCV's default, 0: single-threaded)
+- ``executor_threads``: threads of the ROS executor
+- ``affinity``: CPUs per stage, e.g. ``'detect=2-3;classify=1;executor=0'``
+
+Affinity is per thread on Linux and inherited by threads (and processes)
+created afterwards, so a stage is pinned when its thread starts, and the
+models are created while pinned to the CPUs of the stage that runs them.
+That is also how MediaPipe is bounded: its Python API has no thread count,
+but the graph threads it starts stay on the CPUs of the detect stage.
+"""
+from contextlib import contextmanager
+import os
+
+import cv2 as cv
+
+STAGES = ('executor', 'acquire', 'detect', 'classify', 'publish', 'render', 'debug_image')
+
+
+def parse_cpus(spec):
+    """Return the CPU set of a list like ``'0-2,5'``."""
+    cpus = set()
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition('-')
+        try:
+            first = int(first)
+            last = int(last) if last else first
+        except ValueError:
+            raise ValueError('Bad CPU list %r' % spec)
+        if first < 0 or last < first:
+            raise ValueError('Bad CPU range %r in %r' % (part, spec))
+        cpus.update(range(first, last + 1))
+    if not cpus:
+        raise ValueError('Empty CPU list %r' % spec)
+    return frozenset(cpus)
+
+
+def parse_affinity(spec):
+    """Return ``{stage: cpus}`` of a spec like ``'detect=2-3;classify=1'``."""
+    affinity = {}
+    for item in spec.split(';'):
+        item = item.strip()
+        if not item:
+            continue
+        stage, sep, cpus = item.partition('=')
+        stage = stage.strip()
+        if not sep or stage not in STAGES:
+            raise ValueError('Bad stage affinity %r, expected <stage>=<cpus> with stage one '
+                             'of %s' % (item, ', '.join(STAGES)))
+        affinity[stage] = parse_cpus(cpus)
+    return affinity
+
+
+def format_cpus(cpus):
+    """Inverse of parse_cpus(): ``{0, 1, 2, 5}`` -> ``'0-2,5'``."""
+    ranges = []
+    for cpu in sorted(cpus):
+        if ranges and cpu == ranges[-1][1] + 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ','.join('%d' % a if a == b else '%d-%d' % (a, b) for a, b in ranges)
+
+
+class ThreadBudget(object):
+    """
+    Thread counts of the libraries plus optional CPU pinning per stage.
+
+    ``affinity`` is a ``{stage: cpus}`` dict or a spec string for
+    parse_affinity(). Raises ValueError if a pinned CPU is not available
+    to the process, or if pinning is requested on a platform without
+    ``os.sched_setaffinity``.
+    """
+
+    def __init__(self, tflite_threads=1, opencv_threads=-1, executor_threads=1, affinity=''):
+        if tflite_threads < 1 or executor_threads < 1:
+            raise ValueError('tflite_threads and executor_threads must be at least 1')
+        self.tflite_threads = tflite_threads
+        self.opencv_threads = opencv_threads
+        self.executor_threads = executor_threads
+        if isinstance(affinity, str):
+            affinity = parse_affinity(affinity)
+        self.affinity = dict(affinity)
+
+        if self.affinity:
+            if not hasattr(os, 'sched_setaffinity'):
+                raise ValueError('CPU affinity is not supported on this platform')
+            available = os.sched_getaffinity(0)
+            for stage, cpus in self.affinity.items():
+                if not cpus <= available:
+                    raise ValueError('%s pinned to CPUs %s, but only %s are available'
+                                     % (stage, format_cpus(cpus), format_cpus(available)))
+
+    def apply_process(self):
+        """Set the process-wide thread counts (OpenCV)."""
+        # A negative count restores OpenCV's default
+        cv.setNumThreads(self.opencv_threads)
+
+    def pin(self, stage):
+        """Pin the calling thread to the CPUs of ``stage``; False if it has none."""
+        cpus = self.affinity.get(stage)
+        if cpus is None:
+            return False
+        os.sched_setaffinity(0, cpus)
+        return True
+
+    @contextmanager
+    def pinned(self, stage):
+        """Run the block on the CPUs of ``stage``, then restore the thread's CPUs."""
+        if stage not in self.affinity:
+            yield
+            return
+        previous = os.sched_getaffinity(0)
+        self.pin(stage)
+        try:
+            yield
+        finally:
+            os.sched_setaffinity(0, previous)
+
+    def format(self):
+        text = 'tflite=%d opencv=%s executor=%d' % (
+            self.tflite_threads,
+            self.opencv_threads if self.opencv_threads >= 0 else 'default',
+            self.executor_threads)
+        if self.affinity:
+            text += ' affinity=' + self.format_affinity()
+        return text
+
+    def format_affinity(self):
+        """Return the affinity as a spec string for parse_affinity()."""
+        return ';'.join('%s=%s' % (stage, format_cpus(self.affinity[stage]))
+                        for stage in STAGES if stage in self.affinity)
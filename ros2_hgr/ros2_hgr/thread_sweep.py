@@ -0,0 +1,188 @@
+"""
+Find the thread budget that suits this host best.
+
+Runs recorded frames through the detect -> classify (-> render) pipeline
+once per combination of TFLite threads, OpenCV threads and stage affinity,
+and reports throughput and end-to-end latency. Frames are offered at
+``--rate``, or with ``--rate 0`` whenever the detect stage is free; a
+later stage that falls behind drops the oldest frame, as in the node.
+Latency is from offering a frame to the end of its last stage.
+Combinations are ranked by throughput, then by p99 latency, and the best
+one is printed as node parameters.
+
+    ros2 run ros2_hgr hgr_thread_sweep --input hand.mp4 --tflite-threads 1 2 4 \\
+        --opencv-threads -1 0 2 --affinity '' 'detect=1-3;classify=0'
+"""
+import argparse
+import itertools
+import time
+
+import cv2 as cv
+
+from ros2_hgr.classifiers import make_classifiers
+from ros2_hgr.classifiers import read_labels
+from ros2_hgr.detector_bench import load_frames
+from ros2_hgr.detectors import BACKENDS
+from ros2_hgr.detectors import make_detector
+from ros2_hgr.detectors import warm_up
+from ros2_hgr.engine import FrameResult
+from ros2_hgr.engine import RecognitionEngine
+from ros2_hgr.frame_sources import RGB
+from ros2_hgr.metrics import LatencyStats
+from ros2_hgr.pipeline import Pipeline
+from ros2_hgr.thread_budget import ThreadBudget
+
+
+def build_engine(budget, args):
+    """Create the detector and classifiers on the CPUs of their stages."""
+    with budget.pinned('detect'):
+        detector = make_detector(args.backend, model_path=args.model)
+        warm_up(detector, args.width, args.height)
+    with budget.pinned('classify'):
+        models = make_classifiers(args.classifier_backend, args.point_history_model,
+                                  args.path_prefix, budget.tflite_threads)
+    return RecognitionEngine(
+        detector,
+        keypoint_classifier_labels=read_labels(
+            args.path_prefix + 'model/keypoint_classifier/keypoint_classifier_label.csv'),
+        point_history_classifier_labels=read_labels(
+            args.path_prefix +
+            'model/point_history_classifier/point_history_classifier_label.csv'),
+        point_history_sign_id=args.point_history_sign_id,
+        path_prefix=args.path_prefix,
+        **models,
+    )
+
+
+def run_combination(budget, frames, args):
+    """Run ``frames`` through a pinned pipeline and return its statistics."""
+    budget.apply_process()
+    engine = build_engine(budget, args)
+    latency = LatencyStats(window=len(frames))
+    offered = iter(frames)
+    finished = []
+    skipped = [0]
+    period = 1.0 / args.rate if args.rate > 0 else 0.0
+    next_time = [time.perf_counter()]
+
+    def acquire():
+        image = next(offered, None)
+        if image is None:
+            time.sleep(0.01)
+            return None
+        if period:
+            delay = next_time[0] - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            next_time[0] += period
+        else:
+            while pipeline.queues[0].depth > 0:
+                time.sleep(0.0005)
+        frame = FrameResult(image.copy(), int(time.monotonic() * 1000), RGB)
+        frame.offered = time.perf_counter()
+        return frame
+
+    def detect(frame):
+        frame = engine.detect(frame)
+        if frame is None:
+            # Asynchronous backend without a new result
+            skipped[0] += 1
+        return frame
+
+    def render(frame):
+        cv.imencode('.jpg', engine.render(frame))
+        return frame
+
+    def publish(frame):
+        now = time.perf_counter()
+        latency.add(now - frame.offered)
+        finished.append(now)
+        return frame
+
+    pipeline = Pipeline(on_start=budget.pin)
+    pipeline.add_stage('acquire', acquire)
+    pipeline.add_stage('detect', detect, args.queue_size)
+    pipeline.add_stage('classify', engine.classify, args.queue_size)
+    if args.render:
+        pipeline.add_stage('render', render, args.queue_size)
+    pipeline.add_stage('publish', publish, args.queue_size)
+
+    def accounted():
+        # Every frame ends up published, dropped by a queue, skipped or failed
+        return (len(finished) + skipped[0] + sum(q.dropped for q in pipeline.queues) +
+                sum(stage.errors for stage in pipeline.stages))
+
+    start = time.perf_counter()
+    pipeline.start()
+    deadline = start + args.timeout
+    while accounted() < len(frames) and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    pipeline.stop()
+    engine.detector.close()
+
+    elapsed = (finished[-1] if finished else time.perf_counter()) - start
+    summary = latency.summary()
+    return {
+        'results': len(finished),
+        'dropped': sum(q.dropped for q in pipeline.queues),
+        'throughput': len(finished) / elapsed if elapsed > 0 else 0.0,
+        'p50': summary['p50'],
+        'p99': summary['p99'],
+        'stages': pipeline.format_metrics(),
+    }
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--input', default='0',
+                        help='camera index, video file or image (default: 0)')
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--width', type=int, default=960)
+    parser.add_argument('--height', type=int, default=540)
+    parser.add_argument('--backend', default='legacy', choices=BACKENDS)
+    parser.add_argument('--model', default='model/hand_landmarker/hand_landmarker.task',
+                        help='HandLandmarker .task file for the tasks backend')
+    parser.add_argument('--classifier-backend', default='tflite', choices=('tflite', 'fused'))
+    parser.add_argument('--point-history-model', default='window',
+                        choices=('window', 'streaming'))
+    parser.add_argument('--point-history-sign-id', type=int, default=-1)
+    parser.add_argument('--path-prefix', default='')
+    parser.add_argument('--tflite-threads', type=int, nargs='+', default=[1, 2])
+    parser.add_argument('--opencv-threads', type=int, nargs='+', default=[-1, 1],
+                        help='cv.setNumThreads values (-1: OpenCV default)')
+    parser.add_argument('--affinity', nargs='+', default=[''],
+                        help="stage affinity specs, e.g. 'detect=1-3;classify=0' ('' = none)")
+    parser.add_argument('--rate', type=float, default=0.0,
+                        help='frames offered per second (0: as soon as detect is free)')
+    parser.add_argument('--queue-size', type=int, default=1)
+    parser.add_argument('--render', action='store_true',
+                        help='also draw and JPEG-encode every frame')
+    parser.add_argument('--timeout', type=float, default=60.0,
+                        help='seconds per combination')
+    args = parser.parse_args(args)
+
+    frames = load_frames(args.input, args.frames, args.width, args.height)
+    print('Loaded %d frames of %dx%d' % (len(frames), frames[0].shape[1], frames[0].shape[0]))
+
+    results = []
+    for tflite_threads, opencv_threads, affinity in itertools.product(
+            args.tflite_threads, args.opencv_threads, args.affinity):
+        budget = ThreadBudget(tflite_threads=tflite_threads, opencv_threads=opencv_threads,
+                              affinity=affinity)
+        stats = run_combination(budget, frames, args)
+        results.append((budget, stats))
+        print('%-50s %6.1f fps  p50 %6.1f ms  p99 %6.1f ms  %d dropped'
+              % (budget.format(), stats['throughput'], stats['p50'], stats['p99'],
+                 stats['dropped']))
+        print('    %s' % stats['stages'])
+
+    best, stats = max(results, key=lambda item: (round(item[1]['throughput'], 1),
+                                                 -item[1]['p99']))
+    print('\nBest: %s (%.1f fps, p99 %.1f ms)' % (best.format(), stats['throughput'],
+                                                  stats['p99']))
+    print('    -p tflite_threads:=%d -p opencv_threads:=%d -p stage_affinity:="%s"'
+          % (best.tflite_threads, best.opencv_threads, best.format_affinity()))
+
+
+if __name__ == '__main__':
+    main()
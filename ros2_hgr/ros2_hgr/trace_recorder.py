@@ -0,0 +1,211 @@
+"""
+Always-on frame trace for post-mortem analysis.
+
+:class:`TraceRecorder` keeps the last ``capacity`` published frames in a
+ring of fixed-size NumPy records: when the frame was captured and
+published, the time between stages, the pixel landmarks, handedness,
+hand sign and its scores, the smoothed finger gesture of every hand, and
+the value sent on /hgr_topic. A frame is written in place into arrays
+allocated once, so the recorder can stay on all the time.
+
+dump() writes the records of the last seconds to a ``.hgrtrace`` file:
+the magic ``HGRTRACE``, the length of a JSON header (little-endian
+uint32), the header (record dtype, label tables, why the dump was made)
+and the raw records. load_trace() reads it back as a structured NumPy
+array, and ``hgr_trace_read`` summarises or exports it:
+
+    ros2 run ros2_hgr hgr_trace_read /tmp/hgr_traces/hgr_20240101_120000_crash.hgrtrace \\
+        --npz trace.npz
+"""
+import argparse
+from collections import Counter
+import json
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+MAGIC = b'HGRTRACE'
+VERSION = 1
+
+# Intervals in ``latency_ms``: acquire -> detected -> classified -> published,
+# and the whole frame
+LATENCY_STAGES = ('detect', 'classify', 'publish', 'total')
+
+HANDEDNESS = {'Left': 0, 'Right': 1}
+
+
+def record_dtype(max_hands, num_signs):
+    """Return the record layout for ``max_hands`` hands and ``num_signs`` hand signs."""
+    return np.dtype([
+        ('sequence', '<u8'),                        # published frames before this one
+        ('time', '<f8'),                            # wall clock at publish, seconds
+        ('stamp_ms', '<i8'),                        # capture stamp of the frame source
+        ('latency_ms', '<f4', (len(LATENCY_STAGES),)),
+        ('image_size', '<u2', (2,)),                # width, height
+        ('hands', 'u1'),
+        ('handedness', 'i1', (max_hands,)),         # 0 left, 1 right, -1 no hand
+        ('landmarks', '<i2', (max_hands, 21, 2)),   # pixels
+        ('hand_sign', 'i1', (max_hands,)),
+        ('hand_sign_score', '<f4', (max_hands,)),
+        ('hand_sign_scores', '<f4', (max_hands, num_signs)),  # NaN if not computed
+        ('finger_gesture', 'i1', (max_hands,)),     # smoothed over the history
+        ('published', '<i2'),                       # value sent on /hgr_topic
+    ])
+
+
+class TraceRecorder(object):
+    """Ring buffer of the last ``capacity`` frames, written to disk on demand."""
+
+    def __init__(self, capacity=3600, max_hands=2, sign_labels=(), finger_labels=()):
+        self.capacity = capacity
+        self.max_hands = max_hands
+        self.sign_labels = list(sign_labels)
+        self.finger_labels = list(finger_labels)
+        self.dtype = record_dtype(max_hands, len(self.sign_labels))
+        self.records = np.zeros(capacity, dtype=self.dtype)
+        self.recorded = 0
+        self._lock = threading.Lock()
+        # Field views of the ring, so that record() writes in place
+        self._fields = {name: self.records[name] for name in self.dtype.names}
+
+    def record(self, frame, published):
+        """Store a classified FrameResult and the value published for it."""
+        now = time.perf_counter()
+        fields = self._fields
+        with self._lock:
+            i = self.recorded % self.capacity
+            fields['sequence'][i] = self.recorded
+            fields['time'][i] = time.time()
+            fields['stamp_ms'][i] = frame.stamp_ms
+            latency = fields['latency_ms'][i]
+            detected = frame.detected or now
+            classified = frame.classified or now
+            latency[0] = (detected - frame.created) * 1000
+            latency[1] = (classified - detected) * 1000
+            latency[2] = (now - classified) * 1000
+            latency[3] = (now - frame.created) * 1000
+            fields['image_size'][i] = frame.image.shape[1], frame.image.shape[0]
+
+            hands = min(len(frame.hands), self.max_hands)
+            fields['hands'][i] = hands
+            fields['handedness'][i] = -1
+            fields['landmarks'][i] = 0
+            fields['hand_sign'][i] = -1
+            fields['hand_sign_score'][i] = 0.0
+            fields['hand_sign_scores'][i] = np.nan
+            fields['finger_gesture'][i] = -1
+            for h in range(hands):
+                _, landmark_list, handedness, sign, finger = frame.hands[h]
+                score, scores = frame.hand_scores[h]
+                fields['handedness'][i, h] = HANDEDNESS.get(
+                    handedness.classification[0].label, -1)
+                fields['landmarks'][i, h] = landmark_list
+                fields['hand_sign'][i, h] = sign
+                fields['hand_sign_score'][i, h] = score
+                if scores is not None:
+                    # A reloaded model may have a different number of classes
+                    width = min(len(scores), self.dtype['hand_sign_scores'].shape[1])
+                    fields['hand_sign_scores'][i, h, :width] = scores[:width]
+                fields['finger_gesture'][i, h] = finger
+            fields['published'][i] = published
+            self.recorded += 1
+
+    def last(self, seconds=0.0):
+        """Return a copy of the records of the last ``seconds`` (0: all), oldest first."""
+        with self._lock:
+            count = min(self.recorded, self.capacity)
+            start = self.recorded - count
+            order = np.arange(start, self.recorded) % self.capacity
+            records = self.records[order]
+        if seconds > 0 and len(records):
+            records = records[records['time'] >= records['time'][-1] - seconds]
+        return records
+
+    def dump(self, path, seconds=0.0, reason=''):
+        """Write the records of the last ``seconds`` (0: all) to ``path``; return their count."""
+        records = self.last(seconds)
+        header = json.dumps({
+            'version': VERSION,
+            'dtype': self.dtype.descr,
+            'latency_stages': LATENCY_STAGES,
+            'sign_labels': self.sign_labels,
+            'finger_labels': self.finger_labels,
+            'reason': reason,
+            'dumped': time.time(),
+            'recorded': self.recorded,
+        }).encode()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack('<I', len(header)))
+            f.write(header)
+            f.write(records.tobytes())
+        return len(records)
+
+
+def load_trace(path):
+    """Return the records (structured array) and the header of a ``.hgrtrace`` file."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError('%s is not an HGR trace' % path)
+    offset = len(MAGIC) + 4
+    (length,) = struct.unpack('<I', data[len(MAGIC):offset])
+    header = json.loads(data[offset:offset + length].decode())
+    if header['version'] != VERSION:
+        raise ValueError('Unsupported trace version %r' % header['version'])
+    # JSON turned the subarray shapes of the dtype description into lists
+    dtype = np.dtype([(name, fmt, tuple(shape[0])) if shape else (name, fmt)
+                      for name, fmt, *shape in header['dtype']])
+    records = np.frombuffer(data, dtype=dtype, offset=offset + length)
+    return records, header
+
+
+def format_summary(records, header):
+    """Return a text summary of a loaded trace."""
+    lines = ['%d frames (%d recorded in total), dumped on %s'
+             % (len(records), header['recorded'], header['reason'] or 'request')]
+    if not len(records):
+        return '\n'.join(lines)
+    span = records['time'][-1] - records['time'][0]
+    lines.append('%s -> %s (%.1f s, %.1f fps)' % (
+        time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(records['time'][0])),
+        time.strftime('%H:%M:%S', time.localtime(records['time'][-1])),
+        span, (len(records) - 1) / span if span > 0 else 0.0))
+    for stage, column in zip(header['latency_stages'], records['latency_ms'].T):
+        p50, p99 = np.percentile(column, [50, 99])
+        lines.append('  %-9s p50 %7.2f ms  p99 %7.2f ms  max %7.2f ms'
+                     % (stage, p50, p99, column.max()))
+    signs = Counter(int(value) for value in records['published'])
+    labels = header['sign_labels']
+    lines.append('Published: ' + ', '.join(
+        '%s %d' % (labels[value] if 0 <= value < len(labels) else 'none', count)
+        for value, count in signs.most_common()))
+    changes = np.count_nonzero(np.diff(records['published']))
+    lines.append('Published value changed %d times, frames with hands: %d'
+                 % (changes, np.count_nonzero(records['hands'])))
+    return '\n'.join(lines)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Summarise or export an HGR frame trace.')
+    parser.add_argument('trace', help='.hgrtrace file')
+    parser.add_argument('--npz', default='', help='also save every field as an array')
+    args = parser.parse_args(args)
+
+    records, header = load_trace(args.trace)
+    print(format_summary(records, header))
+    if args.npz:
+        np.savez(args.npz, sign_labels=header['sign_labels'],
+                 finger_labels=header['finger_labels'],
+                 **{name: records[name] for name in records.dtype.names})
+        print('Wrote %s' % args.npz)
+
+
+if __name__ == '__main__':
+    main()
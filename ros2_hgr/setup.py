@@ -14,6 +14,8 @@ setup(
         ('share/' + package_name, ['package.xml', 'launch/hgr.launch.xml']),
         (os.path.join('share', package_name, 'model/keypoint_classifier'), glob('model/keypoint_classifier/*')),
         (os.path.join('share', package_name, 'model/point_history_classifier'), glob('model/point_history_classifier/*')),
+        (os.path.join('share', package_name, 'model/fused_classifier'), glob('model/fused_classifier/*')),
+        (os.path.join('share', package_name, 'model/hand_landmarker'), glob('model/hand_landmarker/*.task')),
     ],
     install_requires=['setuptools'],
     zip_safe=True,
@@ -26,7 +28,17 @@ setup(
         'console_scripts': [
             "hgr_node = ros2_hgr.hgr_node:main",
             "hgr_node_cam = ros2_hgr.hgr_node_cam:main",
-            "hgr_node_dogcam = ros2_hgr.hgr_node_dogcam:main"
+            "hgr_node_dogcam = ros2_hgr.hgr_node_dogcam:main",
+            "hgr_node_multi = ros2_hgr.hgr_node_multi:main",
+            "hgr_lifecycle_node = ros2_hgr.hgr_lifecycle_node:main",
+            "hgr_detector_bench = ros2_hgr.detector_bench:main",
+            "hgr_draw_bench = ros2_hgr.draw_bench:main",
+            "hgr_thread_sweep = ros2_hgr.thread_sweep:main",
+            "hgr_load_test = ros2_hgr.load_test:main",
+            "hgr_soak_test = ros2_hgr.soak_test:main",
+            "hgr_trace_read = ros2_hgr.trace_recorder:main",
+            "hgr_classify_server = ros2_hgr.classify_server:main",
+            "hgr_evaluate = ros2_hgr.evaluate:main"
         ],
     },
 )
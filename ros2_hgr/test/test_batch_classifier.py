@@ -0,0 +1,66 @@
+"""Parity of the batch classifiers with the per-sample classifiers."""
+from collections import deque
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip('tensorflow')
+
+from ros2_hgr.batch_classifier import make_batch_classifiers  # noqa: E402
+from ros2_hgr.classifiers import KeyPointClassifier  # noqa: E402
+from ros2_hgr.classifiers import PointHistoryClassifier  # noqa: E402
+from ros2_hgr.landmarks import pre_process_landmark  # noqa: E402
+from ros2_hgr.landmarks import pre_process_landmark_batch  # noqa: E402
+from ros2_hgr.landmarks import pre_process_point_history  # noqa: E402
+
+package_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..') + '/'
+image = np.zeros((540, 960, 3), dtype=np.uint8)
+
+
+def recorded_histories():
+    """Pixel point histories rebuilt from the windows of point_history.csv."""
+    windows = np.loadtxt(package_dir + 'model/point_history_classifier/point_history.csv',
+                         delimiter=',', dtype='float64', usecols=list(range(1, 33)))
+    points = windows.reshape(-1, 16, 2) * (image.shape[1], image.shape[0]) + (480, 270)
+    return np.rint(points).astype(int).tolist()
+
+
+def random_hands(n, seed=0):
+    """Pixel landmark lists of a random hand shape at a random place and size."""
+    rng = np.random.default_rng(seed)
+    for _ in range(n):
+        wrist = rng.integers(100, 400, 2)
+        offsets = rng.normal(0, rng.uniform(10, 120), (21, 2))
+        offsets[0] = 0
+        yield np.rint(wrist + offsets).astype(int).tolist()
+
+
+@pytest.fixture(scope='module')
+def classifiers():
+    return (make_batch_classifiers(package_dir), KeyPointClassifier(package_dir),
+            PointHistoryClassifier(package_dir))
+
+
+def test_keypoint_batch_matches_per_sample(classifiers):
+    batch, keypoint, _ = classifiers
+    hands = list(random_hands(500))
+    result = batch['keypoint'].classify_raw(hands)
+    expected = [keypoint(pre_process_landmark(hand)) for hand in hands]
+    assert result.class_ids.tolist() == expected
+
+
+def test_point_history_batch_matches_per_sample(classifiers):
+    batch, _, point_history = classifiers
+    histories = recorded_histories()
+    result = batch['point_history'].classify_raw(histories, image.shape[1], image.shape[0])
+    expected = [point_history(pre_process_point_history(image, deque(history, maxlen=16)))
+                for history in histories]
+    assert result.class_ids.tolist() == expected
+
+
+def test_degenerate_hand_matches_per_sample():
+    hand = [[200, 150] for _ in range(21)]
+    features = pre_process_landmark_batch([hand, next(random_hands(1))])
+    assert np.isfinite(features).all()
+    np.testing.assert_array_equal(features[0], pre_process_landmark(hand))
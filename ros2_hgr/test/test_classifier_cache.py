@@ -0,0 +1,35 @@
+"""CachedClassifier reuses results only for nearby landmark vectors."""
+import numpy as np
+
+from ros2_hgr.classifier_cache import CachedClassifier
+
+
+class SignOfFirst(object):
+    """Classifier whose class is 1 when the first feature is positive."""
+
+    def __init__(self):
+        self.invokes = 0
+
+    def scores(self, features):
+        self.invokes += 1
+        return np.array([0.0, 1.0] if features[0] > 0 else [1.0, 0.0], dtype=np.float32)
+
+
+def test_gate_and_lru_reuse_results():
+    classifier = SignOfFirst()
+    cache = CachedClassifier(classifier, threshold=0.02, cache_size=4, quantum=0.05)
+    assert cache([0.5, 0.0]) == 1
+    assert cache([0.51, 0.0]) == 1        # within the gate
+    assert cache([-0.5, 0.0]) == 0
+    assert cache([0.5, 0.001]) == 1       # same grid cell as the first vector
+    assert classifier.invokes == 2
+    assert (cache.gate_hits, cache.cache_hits, cache.misses) == (1, 1, 2)
+
+
+def test_zero_quantum_disables_the_lru():
+    classifier = SignOfFirst()
+    cache = CachedClassifier(classifier, threshold=0.0, cache_size=64, quantum=0.0)
+    results = [cache([value, 0.0]) for value in (0.5, -0.5, 0.5, -0.5)]
+    assert results == [1, 0, 1, 0]
+    assert classifier.invokes == 4
+    assert cache.cache_hits == 0
@@ -0,0 +1,81 @@
+"""Results of the LIVE_STREAM detector stay with the frame they were computed on."""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip('mediapipe')
+
+from mediapipe.tasks.python import vision  # noqa: E402
+
+from ros2_hgr.detectors import TasksHandDetector  # noqa: E402
+from ros2_hgr.engine import FrameResult  # noqa: E402
+from ros2_hgr.engine import RecognitionEngine  # noqa: E402
+from ros2_hgr.frame_sources import RGB  # noqa: E402
+
+
+class FakeLandmarker(object):
+    """HandLandmarker that leaves running the result callback to the test."""
+
+    def __init__(self, options):
+        self.callback = options.result_callback
+        self.submitted = []
+
+    def detect_async(self, image, timestamp_ms):
+        self.submitted.append(timestamp_ms)
+
+    def finish(self, timestamp_ms, x):
+        """Deliver a one-hand result whose landmarks all sit at ``x``."""
+        landmark = SimpleNamespace(x=x, y=0.5, z=0.0)
+        result = SimpleNamespace(
+            hand_landmarks=[[landmark] * 21],
+            handedness=[[SimpleNamespace(category_name='Right', score=0.9)]])
+        self.callback(result, None, timestamp_ms)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def detector(monkeypatch):
+    monkeypatch.setattr(vision.HandLandmarker, 'create_from_options', FakeLandmarker)
+    return TasksHandDetector('hand_landmarker.task')
+
+
+def make_engine(detector):
+    return RecognitionEngine(detector, None, None, [], [])
+
+
+def frame(stamp_ms):
+    return FrameResult(np.zeros((8, 8, 3), dtype=np.uint8), stamp_ms, RGB)
+
+
+def test_poll_returns_each_result_with_its_frame(detector):
+    engine = make_engine(detector)
+    frames = [frame(100 + 10 * i) for i in range(3)]
+    for f in frames:
+        assert engine.detect(f) is None
+    # The graph skipped the first frame and finished the second
+    detector.landmarker.finish(110, 0.25)
+    assert detector.dropped == 1
+
+    detected = engine.detect(frame(130))
+    assert detected is frames[1]
+    assert detected.results.multi_hand_landmarks[0].landmark[0].x == 0.25
+    assert engine.detect(frame(140)) is None
+
+
+def test_on_result_receives_the_frame_of_the_result(detector):
+    engine = make_engine(detector)
+    delivered = []
+    detector.on_result = lambda results, f: delivered.append(
+        engine.attach_results(f, results))
+    frames = [frame(100 + 10 * i) for i in range(3)]
+    for f in frames:
+        engine.detect(f)
+    detector.landmarker.finish(100, 0.1)
+    detector.landmarker.finish(120, 0.3)
+
+    assert delivered == [frames[0], frames[2]]
+    assert [f.results.multi_hand_landmarks[0].landmark[0].x for f in delivered] == [0.1, 0.3]
+    assert detector.poll() is None
@@ -0,0 +1,75 @@
+"""The annotated view must stay pixel-identical to the golden images."""
+from collections import namedtuple
+import os
+
+import cv2 as cv
+import numpy as np
+import pytest
+
+from ros2_hgr.drawing import draw_bounding_rect
+from ros2_hgr.drawing import draw_info
+from ros2_hgr.drawing import draw_info_text
+from ros2_hgr.drawing import draw_landmarks
+from ros2_hgr.drawing import draw_point_history
+
+golden_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden')
+
+Category = namedtuple('Category', ['label', 'score'])
+Handedness = namedtuple('Handedness', ['classification'])
+
+# (landmarks, handedness, hand sign label, mode, number)
+SCENES = {
+    # Open hand, circles apart, label inside its box
+    'open': ([[210, 270], [178, 250], [156, 232], [135, 212], [117, 190], [183, 189],
+              [176, 161], [171, 133], [168, 105], [213, 185], [215, 156], [219, 128],
+              [227, 101], [242, 191], [256, 166], [271, 142], [288, 119], [264, 204],
+              [285, 184], [308, 168], [334, 155]], 'Right', 'Open', 0, -1),
+    # Far away hand: overlapping circles, label wider than its box
+    'small': ([[100, 150], [86, 147], [78, 140], [74, 130], [73, 120], [81, 125],
+               [77, 115], [78, 105], [83, 95], [91, 120], [92, 109], [97, 100],
+               [106, 95], [102, 119], [107, 109], [115, 103], [125, 99], [111, 121],
+               [119, 114], [129, 110], [139, 108]], 'Left', 'Pointer', 1, 3),
+    # Curled fingers crossing each other
+    'curled': ([[200, 190], [164, 172], [177, 145], [204, 132], [226, 152], [165, 107],
+                [177, 80], [206, 84], [210, 114], [195, 100], [214, 77], [240, 91],
+                [235, 121], [226, 104], [256, 103], [262, 132], [242, 154], [251, 116],
+                [279, 126], [271, 155], [249, 175]], 'Right', 'Close', 2, 7),
+    # Partly outside the image
+    'clipped': ([[40, 120], [0, 94], [-26, 69], [-48, 40], [-65, 8], [9, 17], [7, -19],
+                 [11, -55], [24, -89], [46, 12], [54, -23], [68, -56], [88, -86],
+                 [83, 21], [104, -8], [129, -34], [157, -57], [110, 38], [140, 17],
+                 [173, 4], [209, -1]], 'Left', 'OK', 0, -1),
+}
+
+POINT_HISTORY = [[0, 0]] * 4 + [[300 - 12 * i, 60 + 9 * i] for i in range(12)]
+
+
+def render(name):
+    landmarks, label, hand_sign_text, mode, number = SCENES[name]
+    image = np.dstack([np.tile(np.linspace(0, 255, 400, dtype=np.uint8), (300, 1)),
+                       np.tile(np.linspace(255, 0, 300, dtype=np.uint8)[:, None], (1, 400)),
+                       np.full((300, 400), 96, dtype=np.uint8)])
+    x, y, w, h = cv.boundingRect(np.array(landmarks))
+    brect = [x, y, x + w, y + h]
+    handedness = Handedness([Category(label, 0.9)])
+
+    image = draw_bounding_rect(True, image, brect)
+    image = draw_landmarks(image, landmarks)
+    image = draw_info_text(image, brect, handedness, hand_sign_text, '')
+    image = draw_point_history(image, POINT_HISTORY)
+    return draw_info(image, 29.97, mode, number)
+
+
+@pytest.mark.parametrize('name', sorted(SCENES))
+def test_golden_image(name):
+    golden = cv.imread(os.path.join(golden_dir, name + '.png'))
+    assert golden is not None
+    image = render(name)
+    assert np.array_equal(image, golden), '%d pixels differ' % np.count_nonzero(
+        (image != golden).any(axis=2))
+
+
+def test_render_twice():
+    # The cached text layers give the same result as the first, uncached draw
+    for name in sorted(SCENES):
+        assert np.array_equal(render(name), render(name))
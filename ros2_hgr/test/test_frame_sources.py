@@ -0,0 +1,140 @@
+"""Frame sources: V4L2 frame dropping and ROS image stamps."""
+from types import SimpleNamespace
+
+import cv2 as cv
+import numpy as np
+
+from ros2_hgr import frame_sources
+from ros2_hgr.engine import FrameResult
+from ros2_hgr.frame_sources import frame_from_image_msg
+from ros2_hgr.frame_sources import V4L2Source
+
+FPS = 30.0
+PERIOD_MS = 1000.0 / FPS
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.ms = 10000.0
+
+    def __call__(self):
+        return int(self.ms)
+
+
+class FakeCapture(object):
+    """
+    Camera capturing a frame every period into a driver queue of ``buffers`` frames.
+
+    A full queue drops the oldest frame (``keep='newest'``) or the new one
+    (``keep='oldest'``). grab() waits, on the fake clock, for the next frame
+    if none is queued.
+    """
+
+    def __init__(self, clock, buffers=1, keep='newest', timestamps=True):
+        self.clock = clock
+        self.buffers = buffers
+        self.keep = keep
+        self.timestamps = timestamps
+        self.queue = []
+        self.captured = int(np.ceil(clock.ms / PERIOD_MS))  # next frame to take
+        self.stamp = 0.0
+
+    def _capture(self):
+        while self.captured * PERIOD_MS <= self.clock.ms:
+            stamp = self.captured * PERIOD_MS
+            self.captured += 1
+            if len(self.queue) < self.buffers:
+                self.queue.append(stamp)
+            elif self.keep == 'newest':
+                self.queue = self.queue[1:] + [stamp]
+
+    def grab(self):
+        self._capture()
+        if not self.queue:
+            self.clock.ms = self.captured * PERIOD_MS
+            self._capture()
+        self.stamp = self.queue.pop(0)
+        return True
+
+    def retrieve(self):
+        return True, np.full((4, 4, 3), int(self.stamp) % 256, dtype=np.uint8)
+
+    def get(self, prop):
+        if prop == cv.CAP_PROP_FPS:
+            return FPS
+        if prop == cv.CAP_PROP_POS_MSEC:
+            return self.stamp if self.timestamps else 0.0
+        return 0.0
+
+    def set(self, prop, value):
+        return True
+
+    def isOpened(self):
+        return True
+
+
+def make_source(monkeypatch, **options):
+    clock = FakeClock()
+    cap = FakeCapture(clock, **options)
+    monkeypatch.setattr(frame_sources, '_now_ms', clock)
+    monkeypatch.setattr(frame_sources.cv, 'VideoCapture', lambda *args: cap)
+    return V4L2Source(mirror=False), clock, cap
+
+
+def test_fast_consumer_keeps_every_frame(monkeypatch):
+    source, clock, cap = make_source(monkeypatch, buffers=4, keep='oldest')
+    for _ in range(20):
+        frame = source.read()
+        assert clock() - frame.stamp_ms <= source.max_age_ms
+        clock.ms += 0.5 * PERIOD_MS     # processing
+    assert source.drained == 0
+    assert source.grabbed == 20
+
+
+def test_slow_consumer_keeps_a_frame_that_just_arrived(monkeypatch):
+    source, clock, cap = make_source(monkeypatch, buffers=1, keep='newest')
+    for _ in range(20):
+        before = clock.ms
+        frame = source.read()
+        # The queued frame is less than a period old: no drop and no wait
+        assert clock.ms == before
+        assert clock() - frame.stamp_ms <= source.max_age_ms
+        clock.ms += 2.5 * PERIOD_MS
+    assert source.drained == 0
+
+
+def test_slow_consumer_drops_stale_queued_frames(monkeypatch):
+    source, clock, cap = make_source(monkeypatch, buffers=4, keep='oldest')
+    source.read()
+    for _ in range(20):
+        clock.ms += 2.5 * PERIOD_MS
+        frame = source.read()
+        assert clock() - frame.stamp_ms <= source.max_age_ms
+    assert source.drained > 0
+    # Frames are stamped with their capture time
+    assert frame.stamp_ms == int(cap.stamp)
+
+
+def test_no_drain_without_capture_timestamps(monkeypatch):
+    source, clock, cap = make_source(monkeypatch, buffers=4, keep='oldest', timestamps=False)
+    source.read()
+    clock.ms += 2.5 * PERIOD_MS
+    frame = source.read()
+    assert source.drained == 0
+    assert frame.stamp_ms == clock()
+
+
+class FakeBridge(object):
+
+    def imgmsg_to_cv2(self, msg):
+        return msg.data
+
+
+def test_image_msg_keeps_the_exact_header_stamp():
+    stamp = SimpleNamespace(sec=1700000000, nanosec=123456789)
+    msg = SimpleNamespace(header=SimpleNamespace(stamp=stamp), encoding='bgr8',
+                          data=np.zeros((4, 4, 3), dtype=np.uint8))
+    frame = FrameResult.from_frame(frame_from_image_msg(FakeBridge(), msg))
+    assert frame.stamp is stamp
+    assert frame.stamp_ms == 1700000000123
@@ -0,0 +1,62 @@
+"""Parity of the fused classifier graph with the Python preprocessing path."""
+from collections import deque
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip('tensorflow')
+
+from ros2_hgr.classifiers import FusedClassifier  # noqa: E402
+from ros2_hgr.classifiers import KeyPointClassifier  # noqa: E402
+from ros2_hgr.classifiers import PointHistoryClassifier  # noqa: E402
+from ros2_hgr.landmarks import pre_process_landmark  # noqa: E402
+from ros2_hgr.landmarks import pre_process_point_history  # noqa: E402
+
+package_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..') + '/'
+image = np.zeros((540, 960, 3), dtype=np.uint8)
+
+
+def recorded_histories():
+    """Pixel point histories rebuilt from the windows of point_history.csv."""
+    windows = np.loadtxt(package_dir + 'model/point_history_classifier/point_history.csv',
+                         delimiter=',', dtype='float64', usecols=list(range(1, 33)))
+    points = windows.reshape(-1, 16, 2) * (image.shape[1], image.shape[0]) + (480, 270)
+    return np.rint(points).astype(int).tolist()
+
+
+def random_hands(n, seed=0):
+    """Pixel landmark lists of a random hand shape at a random place and size."""
+    rng = np.random.default_rng(seed)
+    for _ in range(n):
+        wrist = rng.integers(100, 400, 2)
+        offsets = rng.normal(0, rng.uniform(10, 120), (21, 2))
+        offsets[0] = 0
+        yield np.rint(wrist + offsets).astype(int).tolist()
+
+
+@pytest.fixture(scope='module')
+def classifiers():
+    return (FusedClassifier(package_dir), KeyPointClassifier(package_dir),
+            PointHistoryClassifier(package_dir))
+
+
+def test_fused_matches_python_preprocessing(classifiers):
+    fused, keypoint, point_history = classifiers
+    histories = recorded_histories()
+    hands = list(random_hands(len(histories)))
+    for landmark_list, history in zip(hands, histories):
+        history = deque(history, maxlen=16)
+        expected = (keypoint(pre_process_landmark(landmark_list)),
+                    point_history(pre_process_point_history(image, history)))
+        hand_sign_id, finger_gesture_id, _, _ = fused(
+            landmark_list, history, (image.shape[1], image.shape[0]))
+        assert (hand_sign_id, finger_gesture_id) == expected
+
+
+def test_fused_placeholder_history(classifiers):
+    fused, keypoint, point_history = classifiers
+    history = deque([[0, 0]] * 16, maxlen=16)
+    landmark_list = next(random_hands(1, seed=1))
+    _, finger_gesture_id, _, _ = fused(landmark_list, history, (960, 540))
+    assert finger_gesture_id == point_history(pre_process_point_history(image, history))
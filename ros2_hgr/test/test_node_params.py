@@ -0,0 +1,42 @@
+"""Both nodes declare the shared parameters through HGRParameters."""
+from types import SimpleNamespace
+
+from ros2_hgr.node_params import HGRParameters
+
+
+class FakeNode(HGRParameters):
+    """Stands in for an rclpy Node with the parameters set on the command line."""
+
+    def __init__(self, overrides=None, **defaults):
+        self.overrides = overrides or {}
+        self.defaults = defaults
+        self.declared = {}
+        self.path_prefix = '/opt/hgr/'
+
+    def declare_parameter(self, name, value):
+        self.declared[name] = self.overrides.get(name, value)
+
+    def get_parameter(self, name):
+        return SimpleNamespace(value=self.declared[name])
+
+
+def test_hand_landmarker_model_path():
+    node = FakeNode()
+    node.declare_model_params()
+    assert node.hand_landmarker_model == '/opt/hgr/model/hand_landmarker/hand_landmarker.task'
+
+    node = FakeNode({'hand_landmarker_model': '/data/hand_landmarker.task'})
+    node.declare_model_params()
+    assert node.hand_landmarker_model == '/data/hand_landmarker.task'
+
+
+def test_entry_point_defaults_and_cache():
+    node = FakeNode(point_history_sign_id=2)
+    node.declare_model_params()
+    assert node.point_history_sign_id == 2
+    assert node.make_keypoint_cache(object()) is None
+
+    node = FakeNode({'keypoint_cache_size': 8})
+    node.declare_model_params()
+    classifier = object()
+    assert node.make_keypoint_cache(classifier).classifier is classifier
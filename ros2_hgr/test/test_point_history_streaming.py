@@ -0,0 +1,66 @@
+"""Parity of the streaming point history model with its window form."""
+import os
+
+import numpy as np
+import pytest
+
+tf = pytest.importorskip('tensorflow')
+
+from ros2_hgr.classifiers import StreamingPointHistoryClassifier  # noqa: E402
+
+package_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+model_dir = os.path.join(package_dir, 'model', 'point_history_classifier')
+
+
+def load_windows():
+    return np.loadtxt(os.path.join(model_dir, 'point_history.csv'), delimiter=',',
+                      dtype='float32', usecols=list(range(1, 33)))
+
+
+def window_scores(windows):
+    interpreter = tf.lite.Interpreter(
+        model_path=os.path.join(model_dir, 'point_history_tcn_window.tflite'))
+    interpreter.allocate_tensors()
+    input_index = interpreter.get_input_details()[0]['index']
+    output_index = interpreter.get_output_details()[0]['index']
+    scores = []
+    for window in windows:
+        interpreter.set_tensor(input_index, window[np.newaxis])
+        interpreter.invoke()
+        scores.append(interpreter.get_tensor(output_index)[0])
+    return np.array(scores)
+
+
+def stream_scores(classifier, windows, state):
+    """Feed the windows back to back as one stream; score at each window end."""
+    scores = []
+    for window in windows:
+        points = window.reshape(-1, 2)
+        for delta in points[1:] - points[:-1]:
+            _, state = classifier(delta, state)
+        scores.append(np.squeeze(classifier.interpreter.get_tensor(classifier.scores_index)))
+    return np.array(scores)
+
+
+def test_stream_matches_window():
+    windows = load_windows()
+    classifier = StreamingPointHistoryClassifier(package_dir + '/', score_th=0.0)
+    assert classifier.window == 16
+
+    # Start from an arbitrary state: after window - 1 steps it must not matter
+    rng = np.random.default_rng(0)
+    state = [rng.normal(size=shape).astype(np.float32) for shape in classifier.state_shapes]
+
+    expected = window_scores(windows)
+    actual = stream_scores(classifier, windows, state)
+    np.testing.assert_allclose(actual, expected, atol=1e-5)
+    assert (actual.argmax(axis=1) == expected.argmax(axis=1)).all()
+
+
+def test_empty_state_matches_placeholder_window():
+    classifier = StreamingPointHistoryClassifier(package_dir + '/')
+    expected = window_scores(np.zeros((1, 32), dtype=np.float32))[0]
+    _, state = classifier(np.zeros(2, dtype=np.float32), classifier.empty_state)
+    scores = np.squeeze(classifier.interpreter.get_tensor(classifier.scores_index))
+    assert classifier.empty_id == int(np.argmax(expected))
+    np.testing.assert_allclose(scores, expected, atol=1e-5)
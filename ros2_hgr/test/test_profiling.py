@@ -0,0 +1,53 @@
+"""The profiler wraps callbacks only while a session runs."""
+import threading
+
+from ros2_hgr.profiling import CallbackProfiler
+from ros2_hgr.profiling import top_collapsed
+from ros2_hgr.profiling import top_pstats
+
+
+class Loop(object):
+
+    def __init__(self):
+        self.callback = self.tick
+
+    def tick(self):
+        sorted(range(1000), key=lambda i: -i)
+        self.publish()
+
+    def publish(self):
+        pass
+
+
+def test_session_profiles_frames_and_restores_callbacks():
+    loop = Loop()
+    original = loop.callback
+    profiler = CallbackProfiler(frames=20)
+    profiler.patch(loop, 'callback')
+    profiler.patch(loop, 'publish', profile=False, count=True)
+
+    stop = threading.Event()
+
+    def run():
+        while not stop.is_set():
+            loop.callback()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    profiler.wait(timeout=10.0)
+    profiler.restore()
+    stop.set()
+    thread.join()
+
+    assert loop.callback == original
+    assert 'publish' not in vars(loop)
+    assert profiler.published >= 20
+    entries = top_pstats(profiler.stats(), top=5)
+    assert len(entries) == 5
+    assert any('(tick)' in entry for entry in entries)
+
+
+def test_top_collapsed(tmp_path):
+    path = tmp_path / 'stacks.collapsed'
+    path.write_text('main;spin;detect 30\nmain;spin;classify 10\nmain;render 10\n')
+    assert top_collapsed(str(path), top=2) == [' 60.0% self  detect', ' 20.0% self  classify']
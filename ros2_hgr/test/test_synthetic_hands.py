@@ -0,0 +1,71 @@
+"""Synthetic hands are recognised as the gestures they were generated as."""
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip('tensorflow')
+
+from ros2_hgr.classifiers import make_classifiers  # noqa: E402
+from ros2_hgr.classifiers import read_labels  # noqa: E402
+from ros2_hgr.engine import FrameResult  # noqa: E402
+from ros2_hgr.engine import RecognitionEngine  # noqa: E402
+from ros2_hgr.frame_sources import RGB  # noqa: E402
+from ros2_hgr.synthetic_hands import SyntheticHands  # noqa: E402
+from ros2_hgr.synthetic_hands import SyntheticHandsDetector  # noqa: E402
+
+package_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..') + '/'
+
+
+def make_engine(detector):
+    return RecognitionEngine(
+        detector,
+        keypoint_classifier_labels=read_labels(
+            package_dir + 'model/keypoint_classifier/keypoint_classifier_label.csv'),
+        point_history_classifier_labels=read_labels(
+            package_dir + 'model/point_history_classifier/point_history_classifier_label.csv'),
+        point_history_sign_id=2,
+        **make_classifiers('tflite', 'window', package_dir),
+    )
+
+
+def test_stream_is_reproducible_and_normalised():
+    first = SyntheticHands(hands=2, seed=3)
+    second = SyntheticHands(hands=2, seed=3)
+    for _ in range(100):
+        landmarks, labels = first.step(960, 540)
+        np.testing.assert_array_equal(landmarks, second.step(960, 540)[0])
+        assert labels == ['Right', 'Left']
+        assert all(0.0 <= hand[:, :2].min() and hand[:, :2].max() <= 1.0 for hand in landmarks)
+
+
+@pytest.mark.parametrize('hands', [1, 2])
+def test_hand_signs_are_recognised(hands):
+    engine = make_engine(SyntheticHandsDetector(max_num_hands=hands, seed=hands))
+    generator = engine.detector.generator
+    image = np.zeros((540, 960, 3), dtype=np.uint8)
+    correct = scored = 0
+    seen = set()
+    for number in range(1500):
+        frame = engine.classify(engine.detect(FrameResult(image, number, RGB)))
+        for hand, (sign, _) in zip(frame.hands, generator.truth):
+            correct += engine.keypoint_classifier_labels[hand[3]] == sign
+            scored += 1
+            seen.add(sign)
+    assert len(seen) == 8
+    assert correct / scored > 0.97
+
+
+def test_finger_gestures_are_recognised():
+    detector = SyntheticHandsDetector(seed=5, hand_signs=['Pointer'], hold=3.0)
+    engine = make_engine(detector)
+    generator = detector.generator
+    image = np.zeros((540, 960, 3), dtype=np.uint8)
+    correct = scored = 0
+    for number in range(1500):
+        frame = engine.classify(engine.detect(FrameResult(image, number, RGB)))
+        (_, gesture), = generator.truth
+        if generator.ages[0] >= 2 * engine.history_length:
+            correct += engine.point_history_classifier_labels[frame.hands[0][4]] == gesture
+            scored += 1
+    assert correct / scored > 0.9
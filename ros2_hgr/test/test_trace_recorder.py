@@ -0,0 +1,52 @@
+"""Frames written to the trace ring come back from a dump in order."""
+from collections import namedtuple
+
+import numpy as np
+
+from ros2_hgr.engine import FrameResult
+from ros2_hgr.trace_recorder import load_trace
+from ros2_hgr.trace_recorder import TraceRecorder
+
+Category = namedtuple('Category', ['label', 'score'])
+Handedness = namedtuple('Handedness', ['classification'])
+
+LABELS = ['Open', 'Close', 'Pointer']
+
+
+def make_frame(number):
+    frame = FrameResult(np.zeros((240, 320, 3), dtype=np.uint8), 1000 + number)
+    if number % 2:
+        landmarks = [[number + i, 2 * i] for i in range(21)]
+        frame.hands.append(([0, 0, 10, 10], landmarks,
+                            Handedness([Category('Right', 0.9)]), number % 3, 1))
+        frame.hand_scores.append((0.5, np.full(len(LABELS), 0.25)))
+        frame.hand_sign_id = number % 3
+    frame.detected = frame.classified = frame.created
+    return frame
+
+
+def test_dump_round_trip(tmp_path):
+    recorder = TraceRecorder(capacity=8, max_hands=2, sign_labels=LABELS,
+                             finger_labels=['Stop', 'Move'])
+    for number in range(13):
+        recorder.record(make_frame(number), make_frame(number).hand_sign_id)
+
+    path = str(tmp_path / 'trace.hgrtrace')
+    assert recorder.dump(path, reason='test') == 8
+    records, header = load_trace(path)
+
+    assert header['reason'] == 'test'
+    assert header['sign_labels'] == LABELS
+    # The ring kept the last 8 of 13 frames, oldest first
+    np.testing.assert_array_equal(records['sequence'], np.arange(5, 13))
+    np.testing.assert_array_equal(records['stamp_ms'], 1000 + np.arange(5, 13))
+    last = records[-1]      # frame 12: no hand
+    assert last['hands'] == 0 and last['published'] == -1
+    assert np.all(last['hand_sign'] == -1)
+    hand = records[-2]      # frame 11: one right hand
+    assert hand['hands'] == 1 and hand['handedness'][0] == 1 and hand['handedness'][1] == -1
+    assert hand['hand_sign'][0] == 2 and hand['published'] == 2
+    np.testing.assert_array_equal(hand['landmarks'][0, :, 0], 11 + np.arange(21))
+    np.testing.assert_allclose(hand['hand_sign_scores'][0], 0.25)
+    assert np.all(np.isnan(hand['hand_sign_scores'][1]))
+    np.testing.assert_array_equal(hand['image_size'], [320, 240])